@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Después de cargar Django: el hilo del outbox solo corre en los procesos que atienden solicitudes.
+from mail_outbox.worker import start_dispatcher  # noqa: E402
+
+start_dispatcher()
@@ -63,11 +63,15 @@ INSTALLED_APPS = [
     'rental',
     'payment',
     'invoice',
+    'mail_outbox',
+    'dashboard',
+    'utilities',
     'cloudinary',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'utilities.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -174,6 +178,98 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'uploads')
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Outbox de correos (mail_outbox): las vistas encolan y un hilo en segundo plano
+# (lo arranca backend/wsgi.py o asgi.py, no los comandos) envía por lotes con
+# conexiones SMTP reutilizadas. Con MAIL_OUTBOX_AUTOSTART=False el envío queda a
+# cargo de `python manage.py process_outbox`.
+MAIL_OUTBOX_AUTOSTART = os.getenv('MAIL_OUTBOX_AUTOSTART', 'True').lower() not in ('false', '0', 'no')
+MAIL_OUTBOX_WORKERS = int(os.getenv('MAIL_OUTBOX_WORKERS', 4))
+MAIL_OUTBOX_BATCH_SIZE = int(os.getenv('MAIL_OUTBOX_BATCH_SIZE', 20))
+MAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('MAIL_OUTBOX_MAX_ATTEMPTS', 5))
+MAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv('MAIL_OUTBOX_BACKOFF_SECONDS', 30))
+MAIL_OUTBOX_MAX_BACKOFF_SECONDS = 3600
+MAIL_OUTBOX_POLL_INTERVAL = 30
+MAIL_OUTBOX_LEASE_SECONDS = 300
+
+# Caché en disco de PDFs de facturas (invoice/pdf.py). Es privada: no debe
+# quedar dentro de MEDIA_ROOT, que se sirve públicamente.
+INVOICE_PDF_CACHE_DIR = os.getenv('INVOICE_PDF_CACHE_DIR') or os.path.join(BASE_DIR, 'cache', 'invoice_pdf')
+INVOICE_PDF_CACHE_MAX_BYTES = int(os.getenv('INVOICE_PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+INVOICE_PDF_CACHE_MAX_AGE = int(os.getenv('INVOICE_PDF_CACHE_MAX_AGE', 30 * 24 * 3600))
+# Procesos usados para renderizar exportaciones masivas de facturas. Cada
+# exportación crea los suyos, así que el valor se multiplica por las descargas
+# simultáneas. Por debajo de INVOICE_EXPORT_POOL_MIN_INVOICES se renderiza en el
+# mismo proceso: arrancar el pool cuesta más que dibujar pocas facturas.
+INVOICE_EXPORT_WORKERS = int(os.getenv('INVOICE_EXPORT_WORKERS', 2))
+INVOICE_EXPORT_POOL_MIN_INVOICES = int(os.getenv('INVOICE_EXPORT_POOL_MIN_INVOICES', 200))
+# Máximo de combinaciones (vehículo, fechas) por cotización en lote.
+RENTAL_BATCH_QUOTE_MAX_ITEMS = int(os.getenv('RENTAL_BATCH_QUOTE_MAX_ITEMS', 50))
+# Barrido de alquileres vencidos (rental/overdue.py). Con AUTOSTART=False se
+# ejecuta con `python manage.py sweep_overdue_rentals`.
+RENTAL_OVERDUE_SWEEP_AUTOSTART = os.getenv('RENTAL_OVERDUE_SWEEP_AUTOSTART', 'False').lower() in ('true', '1', 'yes')
+RENTAL_OVERDUE_SWEEP_INTERVAL = int(os.getenv('RENTAL_OVERDUE_SWEEP_INTERVAL', 300))
+# Segundos que se guarda en caché cada línea de tiempo de vehículos (vehicle/timeline.py).
+VEHICLE_TIMELINE_CACHE_TTL = int(os.getenv('VEHICLE_TIMELINE_CACHE_TTL', 300))
+# Segundos que se guardan en caché los conteos de la búsqueda facetada (vehicle/search.py).
+VEHICLE_SEARCH_CACHE_TTL = int(os.getenv('VEHICLE_SEARCH_CACHE_TTL', 300))
+
+# Filas por bloque en los listados con ?stream=1 (utilities/fast_json.py).
+API_STREAM_CHUNK_SIZE = int(os.getenv('API_STREAM_CHUNK_SIZE', 500))
+# Filas por consulta en las exportaciones CSV/XLSX (dashboard/exports.py).
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+# Caché de Django. Guarda las versiones de catálogos (utilities/catalog_cache.py),
+# de las que dependen el perfil de la empresa, el árbol geográfico y las facetas
+# de vehículos, además de la línea de tiempo de la flota y el avance de las
+# exportaciones. Con más de un proceso (gunicorn, uwsgi) debe ser compartida:
+# CACHE_REDIS_URL=redis://host:6379/1. Sin ella se usa memoria local, válida
+# solo con un proceso: cada worker invalidaría únicamente su copia (el chequeo
+# utilities.W001 lo advierte cuando DEBUG está apagado).
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': 'autorent',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+# Caché de autenticación (utilities/auth_cache.py): tokens decodificados y
+# permisos por usuario. Con CACHE_REDIS_URL los principales van a la caché
+# compartida y la invalidación llega a todos los workers. Sin ella viven en la
+# memoria de cada proceso, que solo se entera de sus propias invalidaciones;
+# por eso el TTL por defecto es corto y acota cuánto tarda en verse un cambio
+# de permisos. AUTH_CACHE_ALIAS permite elegir otro alias de CACHES.
+AUTH_CACHE_ALIAS = os.getenv('AUTH_CACHE_ALIAS') or ('default' if CACHE_REDIS_URL else None)
+AUTH_CACHE_TTL = int(os.getenv('AUTH_CACHE_TTL', 300 if AUTH_CACHE_ALIAS else 30))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv('AUTH_CACHE_MAX_ENTRIES', 1024))
+# Segundos que vive cada respuesta de catálogo en caché (utilities/catalog_cache.py).
+# La invalidación es por versión; el TTL solo limpia entradas viejas.
+CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 3600))
+# Segundos que un proceso reutiliza copias en memoria de catálogos (árbol
+# geográfico, perfil de la empresa) sin volver a la base de datos. Con la caché
+# compartida la versión ya las invalida en todos los workers; el límite acota
+# cuánto puede quedar desactualizado un worker si la caché es local.
+CATALOG_SNAPSHOT_MAX_AGE = int(os.getenv('CATALOG_SNAPSHOT_MAX_AGE', 60))
+# Compresión de respuestas (utilities/compression.py): tamaño mínimo en bytes
+# y calidad de brotli (0-11; 4 equilibra CPU y tamaño en respuestas dinámicas).
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+# Respuestas JSON de DRF con orjson si está instalado (utilities/fast_json.py).
+# ?format= lo usan las exportaciones (zip, pdf, csv, xlsx), no la negociación de DRF.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'utilities.fast_json.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'URL_FORMAT_OVERRIDE': None,
+}
+
 cloudinary.config(
   cloud_name = os.getenv('CLOUDINARY_CLOUD_NAME'), 
   api_key = os.getenv('CLOUDINARY_API_KEY'), 
@@ -40,6 +40,7 @@ urlpatterns = [
     path('api/v1/', include('rental.urls')),
     path('api/v1/', include('payment.urls')),
     path('api/v1/', include('invoice.urls')),
+    path('api/v1/', include('dashboard.urls')),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
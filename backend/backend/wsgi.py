@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Después de cargar Django: el hilo del outbox solo corre en los procesos que atienden solicitudes.
+from mail_outbox.worker import start_dispatcher  # noqa: E402
+
+start_dispatcher()
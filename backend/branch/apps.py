@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BranchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'branch'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import Branch
+
+        connect_catalog(Branch)
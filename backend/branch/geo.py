@@ -0,0 +1,114 @@
+"""
+Jerarquía geográfica (departamento → municipio → distrito) en memoria.
+
+Los datos son pocos y casi nunca cambian, así que cada proceso los carga una
+vez en estructuras inmutables con los cuerpos JSON ya codificados y su ETag:
+el árbol completo (`geo/tree`) y cada nivel por padre
+(`branch/municipalities/<id>`, `branch/districts/<id>`).
+
+El árbol se reconstruye cuando cambia la versión de alguna de las tres tablas
+en la caché de catálogos (utilities/catalog_cache.py), que se incrementa en
+cada guardado, incluidos los de MunicipalityAdmin y DistrictAdmin. Cada copia
+además caduca a los CATALOG_SNAPSHOT_MAX_AGE segundos.
+"""
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from django.conf import settings
+
+from department.models import Department
+from district.models import District
+from municipality.models import Municipality
+from utilities.catalog_cache import body_etag, catalog_cache
+from utilities.fast_json import dumps
+
+GEO_MODELS = (Department, Municipality, District)
+
+# `tree` es (cuerpo, etag); `municipalities` y `districts` mapean el ID del padre a (cuerpo, etag).
+GeoTree = namedtuple('GeoTree', 'versions built tree municipalities districts')
+
+_lock = threading.Lock()
+_geo_tree = None
+
+
+def encoded(data):
+    body = dumps(data)
+    return body, body_etag(body)
+
+
+def current_versions():
+    return tuple(catalog_cache.version(model._meta.label_lower) for model in GEO_MODELS)
+
+
+def is_current(geo_tree, versions):
+    if geo_tree is None or geo_tree.versions != versions:
+        return False
+    return time.monotonic() - geo_tree.built < getattr(settings, 'CATALOG_SNAPSHOT_MAX_AGE', 60)
+
+
+def group_by_parent(rows):
+    groups = {}
+    for parent_id, item in rows:
+        groups.setdefault(parent_id, []).append(item)
+    return groups
+
+
+def build_geo_tree(versions):
+    districts = group_by_parent(
+        (municipality_id, {"id": id, "code": code, "name": name})
+        for id, code, name, municipality_id in District.objects.filter(active=True)
+        .order_by('code').values_list('id', 'code', 'district', 'municipality_id')
+    )
+    municipalities = group_by_parent(
+        (department_id, {"id": id, "code": code, "name": name})
+        for id, code, name, department_id in Municipality.objects.filter(active=True)
+        .order_by('code').values_list('id', 'code', 'municipality', 'department_id')
+    )
+    departments = Department.objects.filter(active=True).order_by('code').values_list('id', 'code', 'department')
+
+    tree = [
+        {
+            "id": id, "code": code, "name": name,
+            "municipalities": [
+                {**municipality, "districts": districts.get(municipality["id"], [])}
+                for municipality in municipalities.get(id, [])
+            ],
+        }
+        for id, code, name in departments
+    ]
+    # Los niveles conservan la forma de las respuestas anteriores: {"id", "name"}.
+    return GeoTree(
+        versions=versions,
+        built=time.monotonic(),
+        tree=encoded({"data": tree}),
+        municipalities=MappingProxyType({
+            department_id: encoded({"data": [{"id": item["id"], "name": item["name"]} for item in items]})
+            for department_id, items in municipalities.items()
+        }),
+        districts=MappingProxyType({
+            municipality_id: encoded({"data": [{"id": item["id"], "name": item["name"]} for item in items]})
+            for municipality_id, items in districts.items()
+        }),
+    )
+
+
+def get_geo_tree(name='geo_tree'):
+    """
+    Árbol vigente del proceso. Cuesta una lectura de versión por tabla en la
+    caché; solo consulta la base de datos si alguna tabla cambió o la copia
+    caducó.
+    """
+    global _geo_tree
+    versions = current_versions()
+    geo_tree = _geo_tree
+    if is_current(geo_tree, versions):
+        catalog_cache.record(name, hit=True)
+        return geo_tree
+
+    with _lock:
+        if not is_current(_geo_tree, versions):
+            _geo_tree = build_geo_tree(versions)
+        catalog_cache.record(name, hit=False)
+        return _geo_tree
@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from branch.models import Branch
-from django.contrib.auth.models import User
+from utilities.audit import AuditUserSerializerMixin, AuditUserListSerializer
 
-class BranchSerializer(serializers.ModelSerializer):
+class BranchSerializer(AuditUserSerializerMixin, serializers.ModelSerializer):
 
     department = serializers.CharField(source='district.municipality.department.department')
     municipality = serializers.CharField(source='district.municipality.municipality')
@@ -15,6 +15,7 @@ class BranchSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Branch
+        list_serializer_class = AuditUserListSerializer
         fields = ("id",
                   "name",
                   "phone",
@@ -32,22 +33,3 @@ class BranchSerializer(serializers.ModelSerializer):
                   "updated_at")
         #fields = '__all__'
         #fields = ('__all__')
-
-
-    def get_created_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
-        
-    def get_modified_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
\ No newline at end of file
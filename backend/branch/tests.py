@@ -1,3 +1,46 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from department.models import Department
+from district.models import District
+from municipality.models import Municipality
+from utilities.testing import auth_headers
+
+
+class GeoTreeTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_superuser(username='geo', password='secreta123')
+        self.headers = auth_headers(user)
+        department = Department.objects.create(code="SM", department="San Miguel")
+        self.municipality = Municipality.objects.create(code="SM01", municipality="San Miguel Centro", department=department)
+        District.objects.create(code="SM0101", district="San Miguel", municipality=self.municipality)
+
+    def test_tree_is_served_from_memory_with_etag(self):
+        response = self.client.get('/api/v1/geo/tree', **self.headers)
+        self.assertEqual(response.status_code, 200)
+        (department,) = response.json()["data"]
+        self.assertEqual(department["municipalities"][0]["districts"][0]["name"], "San Miguel")
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/v1/geo/tree', HTTP_IF_NONE_MATCH=response["ETag"], **self.headers)
+        self.assertEqual(cached.status_code, 304)
+
+    def test_saving_a_district_rebuilds_the_levels(self):
+        url = f'/api/v1/branch/districts/{self.municipality.id}'
+        self.assertEqual(len(self.client.get(url, **self.headers).json()["data"]), 1)
+        District.objects.create(code="SM0102", district="El Tránsito", municipality=self.municipality)
+        self.assertEqual([row["name"] for row in self.client.get(url, **self.headers).json()["data"]], ["San Miguel", "El Tránsito"])
+        self.assertEqual(self.client.get('/api/v1/branch/districts/999', **self.headers).status_code, 404)
+
+    def test_snapshot_expires_without_a_version_change(self):
+        # Un cambio hecho por otro worker con caché local no incrementa la versión de este proceso.
+        url = f'/api/v1/branch/districts/{self.municipality.id}'
+        self.client.get(url, **self.headers)
+        District.objects.filter(municipality=self.municipality).update(district="San Miguel Oriente")
+        self.assertEqual(self.client.get(url, **self.headers).json()["data"][0]["name"], "San Miguel")
+
+        with override_settings(CATALOG_SNAPSHOT_MAX_AGE=0):
+            self.assertEqual(self.client.get(url, **self.headers).json()["data"][0]["name"], "San Miguel Oriente")
@@ -7,4 +7,5 @@ urlpatterns = [
     path('branch/delete/<int:id>', BranchD.as_view()),
     path('branch/municipalities/<int:id>', MunicipalitiesByDepartmentR.as_view()),
     path('branch/districts/<int:id>', DistrictsByMunicipalityR.as_view()),
+    path('geo/tree', GeoTreeR.as_view()),
 ]
\ No newline at end of file
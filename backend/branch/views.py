@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.db import transaction
 
@@ -9,6 +9,10 @@ from municipality.models import Municipality
 from .serializers import BranchSerializer
 from .forms import BranchForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.catalog_cache import catalog_cache
+from .geo import get_geo_tree
+from department.models import Department
 from django.core.exceptions import ValidationError
 
 import json
@@ -25,10 +29,16 @@ class BranchRC(APIView):
                 'district__municipality', 
                 'district__municipality__department'
             ).filter(active=True).order_by('id')
-            serializer = BranchSerializer(data, many=True)
-            return JsonResponse({
-                "data": serializer.data
-            }, status=HTTPStatus.OK)
+            paginator = KeysetPagination(ordering=('id',))
+            response = paginator.respond(request, data, lambda page: BranchSerializer(page, many=True).data)
+            if response is not None:
+                return response
+
+            # El listado muestra distrito, municipio y departamento.
+            return catalog_cache.response(
+                request, 'branch', (Branch, District, Municipality, Department),
+                lambda: ({"data": BranchSerializer(data, many=True).data}, HTTPStatus.OK),
+            )
         except Exception as e:
             return JsonResponse(
                 {"status": "error", "message": f"Ocurrió un error al procesar la solicitud. {e}"},
@@ -299,22 +309,14 @@ class MunicipalitiesByDepartmentR(APIView):
                 "message": "Formato de ID de departamento inválido."
             }, status=HTTPStatus.BAD_REQUEST)
 
-        municipalities = Municipality.objects.filter(department_id=dept_id, active=True).order_by('code')
-
-        if not municipalities.exists():
+        entry = get_geo_tree('municipalities_by_department').municipalities.get(dept_id)
+        if entry is None:
             return JsonResponse({
                 "status": "error",
                 "message": "No se encontraron municipios para este departamento o el departamento no existe."
             }, status=HTTPStatus.NOT_FOUND)
 
-        data = [
-            {"id": m.id, "name": m.municipality}
-            for m in municipalities
-        ]
-
-        return JsonResponse({
-            "data": data
-        }, status=HTTPStatus.OK)
+        return catalog_cache.send(request, 'municipalities_by_department', *entry)
 
 
 
@@ -330,19 +332,22 @@ class DistrictsByMunicipalityR(APIView):
                 "message": "Formato de ID de municipio inválido"
             }, status=HTTPStatus.BAD_REQUEST)
 
-        districts = District.objects.filter(municipality_id=mun_id, active=True).order_by('code')
-
-        if not districts.exists():
+        entry = get_geo_tree('districts_by_municipality').districts.get(mun_id)
+        if entry is None:
             return JsonResponse({
                 "status": "error",
                 "message": "No se encontraron distritos para este municipio o el municipio no existe."
             }, status=HTTPStatus.NOT_FOUND)
 
-        data = [
-            {"id": d.id, "name": d.district}
-            for d in districts
-        ]
+        return catalog_cache.send(request, 'districts_by_municipality', *entry)
+
 
-        return JsonResponse({
-            "data": data
-        }, status=HTTPStatus.OK)
\ No newline at end of file
+class GeoTreeR(APIView):
+    """
+    Árbol completo departamento → municipio → distrito en una sola respuesta,
+    servido desde memoria con ETag (ver branch/geo.py).
+    """
+
+    @authenticate_user(required_permission='district.view_district')
+    def get(self, request):
+        return catalog_cache.send(request, 'geo_tree', *get_geo_tree().tree)
\ No newline at end of file
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BrandConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'brand'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import Brand
+
+        connect_catalog(Brand)
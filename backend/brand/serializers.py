@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from brand.models import Brand
-from django.contrib.auth.models import User
+from utilities.audit import AuditUserSerializerMixin, AuditUserListSerializer
 
-class BrandSerializer(serializers.ModelSerializer):
+class BrandSerializer(AuditUserSerializerMixin, serializers.ModelSerializer):
 
     created_by_name = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(format="%d-%m-%Y") #13/12/2025
@@ -11,6 +11,7 @@ class BrandSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Brand
+        list_serializer_class = AuditUserListSerializer
         fields = (
             "id",
             "name",
@@ -22,21 +23,3 @@ class BrandSerializer(serializers.ModelSerializer):
             "modified_by_name",
             "updated_at"
         )
-
-    def get_created_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
-        
-    def get_modified_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
@@ -1,3 +1,122 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+from django.contrib.auth.models import Permission, User
+
+from brand.models import Brand
+from brand.serializers import BrandSerializer
+from utilities.catalog_cache import catalog_cache
+from utilities.pagination import KeysetPagination
+from utilities.testing import auth_headers
+
+
+class BrandSerializerAuditUserTests(TestCase):
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="x", first_name=f"Usuario {i}")
+            for i in range(3)
+        ]
+
+    def create_brands(self, start, count):
+        for i in range(start, start + count):
+            Brand.objects.create(
+                name=f"Marca {i}",
+                created_by=self.users[i % 3].id,
+                modified_by=self.users[(i + 1) % 3].id,
+            )
+
+    def serialize_active_brands(self):
+        queryset = Brand.objects.filter(active=True).order_by('name')
+        return BrandSerializer(queryset, many=True).data
+
+    def test_audit_names_use_constant_queries(self):
+        self.create_brands(0, 5)
+        with self.assertNumQueries(2):
+            data = self.serialize_active_brands()
+        self.assertEqual(len(data), 5)
+
+        self.create_brands(5, 45)
+        with self.assertNumQueries(2):
+            data = self.serialize_active_brands()
+        self.assertEqual(len(data), 50)
+
+    def test_audit_names_are_resolved(self):
+        brand = Brand.objects.create(name="Toyota", created_by=self.users[0].id, modified_by=999999)
+        data = BrandSerializer(brand).data
+        self.assertEqual(data["created_by_name"], "Usuario 0")
+        self.assertIsNone(data["modified_by_name"])
+
+
+class BrandKeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        for i in range(7):
+            Brand.objects.create(name=f"Marca {i}")
+
+    def test_walks_every_row_once(self):
+        factory = RequestFactory()
+        seen = []
+        url = "/api/v1/brand?limit=3"
+        while url:
+            paginator = KeysetPagination(ordering=('name', 'id'))
+            page = paginator.paginate_queryset(Brand.objects.filter(active=True), factory.get(url))
+            seen.extend(brand.name for brand in page)
+            url = paginator.get_next_link()
+
+        self.assertEqual(seen, sorted(f"Marca {i}" for i in range(7)))
+
+    def test_respond_only_when_requested(self):
+        factory = RequestFactory()
+        brands = Brand.objects.filter(active=True)
+        serialize = lambda page: [brand.name for brand in page]
+        paginator = KeysetPagination(ordering=('name', 'id'))
+
+        self.assertIsNone(paginator.respond(factory.get("/api/v1/brand"), brands, serialize))
+        self.assertEqual(paginator.respond(factory.get("/api/v1/brand?cursor=xyz"), brands, serialize).status_code, 400)
+        response = paginator.respond(factory.get("/api/v1/brand?limit=2"), brands, serialize)
+        self.assertEqual(json.loads(response.content)["data"], ["Marca 0", "Marca 1"])
+
+
+class BrandCatalogCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='catalogo', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='view_brand'))
+        self.headers = auth_headers(user)
+        Brand.objects.create(name="Toyota")
+
+    def get_brands(self, **headers):
+        return self.client.get('/api/v1/brand', **self.headers, **headers)
+
+    def test_etag_and_not_modified(self):
+        first = self.get_brands()
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            second = self.get_brands(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second["ETag"], etag)
+        self.assertGreaterEqual(catalog_cache.stats()["brand"]["hits"], 1)
+
+    def test_writes_bump_the_version(self):
+        etag = self.get_brands()["ETag"]
+        brand = Brand.objects.create(name="Nissan")
+        response = self.get_brands(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), 2)
+
+        brand.active = False
+        brand.save()
+        self.assertEqual(len(self.get_brands().json()["data"]), 1)
+
+    def test_only_catalog_models_bump_versions(self):
+        with mock.patch.object(catalog_cache, 'invalidate') as invalidate:
+            User.objects.create_user(username='otro', password='secreta123')
+            invalidate.assert_not_called()
+            Brand.objects.create(name="Mazda")
+        invalidate.assert_called_once_with('brand.brand')
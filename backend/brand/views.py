@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.db import transaction
 import json
@@ -8,6 +8,8 @@ from .models import Brand
 from .serializers import BrandSerializer
 from .forms import BrandForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.catalog_cache import catalog_cache
 from error_log import utils as error_log_utils
 
 
@@ -20,8 +22,15 @@ class BrandRC(APIView):
     def get(self, request):
         try:
             data = Brand.objects.filter(active=True).order_by('name')
-            serializer = BrandSerializer(data, many=True)
-            return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
+            paginator = KeysetPagination(ordering=('name', 'id'))
+            response = paginator.respond(request, data, lambda page: BrandSerializer(page, many=True).data)
+            if response is not None:
+                return response
+
+            return catalog_cache.response(
+                request, 'brand', (Brand,),
+                lambda: ({"data": BrandSerializer(data, many=True).data}, HTTPStatus.OK),
+            )
         except Exception as e:
             error_log_utils.log_error(user=request.user, exception=e)
             return JsonResponse(
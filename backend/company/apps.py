@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CompanyConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'company'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import Company
+
+        connect_catalog(Company)
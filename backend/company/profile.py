@@ -0,0 +1,97 @@
+"""
+Perfil de la empresa en memoria del proceso.
+
+La empresa es un único registro que casi nunca cambia, pero su nombre y
+dirección aparecen en cada factura y correo. Cada proceso guarda una copia
+inmutable (con la respuesta de `CompanyRU.get` ya serializada) y solo vuelve
+a consultar la base de datos cuando cambia la versión de la tabla en la caché
+de catálogos (utilities/catalog_cache.py), que se incrementa en cada guardado:
+`CompanyRU.patch`, el admin o cualquier otro `save()`. La copia además caduca
+a los CATALOG_SNAPSHOT_MAX_AGE segundos.
+"""
+import threading
+import time
+from collections import namedtuple
+from html import escape
+
+from django.conf import settings
+
+from utilities.catalog_cache import catalog_cache
+
+from .models import Company
+
+COMPANY_LABEL = Company._meta.label_lower
+
+# `data` es la respuesta de CompanyRU.get (None si la empresa no está configurada).
+CompanyProfile = namedtuple(
+    'CompanyProfile',
+    'version built trade_name nrc phone address email website logo data',
+)
+
+# Valores usados mientras no exista el registro de la empresa.
+DEFAULT_TRADE_NAME = "AutoRent León"
+DEFAULT_ADDRESS = "San Miguel Centro"
+
+_lock = threading.Lock()
+_profile = None
+
+
+def is_current(profile, version):
+    if profile is None or profile.version != version:
+        return False
+    return time.monotonic() - profile.built < getattr(settings, 'CATALOG_SNAPSHOT_MAX_AGE', 60)
+
+
+def build_company_profile(version):
+    from .serializers import CompanySerializer
+
+    company = Company.objects.first()
+    if company is None:
+        return CompanyProfile(
+            version=version, built=time.monotonic(), trade_name=DEFAULT_TRADE_NAME, nrc="", phone="", address=DEFAULT_ADDRESS,
+            email="", website="", logo=None, data=None,
+        )
+    return CompanyProfile(
+        version=version,
+        built=time.monotonic(),
+        trade_name=company.trade_name,
+        nrc=company.nrc,
+        phone=company.phone,
+        # La dirección fiscal puede tener saltos de línea; en facturas y correos va en una sola.
+        address=", ".join(line.strip() for line in company.address.splitlines() if line.strip()),
+        email=company.email,
+        website=company.website or "",
+        logo=company.logo,
+        data=CompanySerializer(company).data,
+    )
+
+
+def get_company_profile():
+    """
+    Perfil vigente del proceso. Cuesta una lectura de versión en la caché;
+    solo consulta la base de datos si la empresa cambió o la copia caducó.
+    """
+    global _profile
+    version = catalog_cache.version(COMPANY_LABEL)
+    profile = _profile
+    if is_current(profile, version):
+        catalog_cache.record('company', hit=True)
+        return profile
+
+    with _lock:
+        if not is_current(_profile, version):
+            _profile = build_company_profile(version)
+        catalog_cache.record('company', hit=False)
+        return _profile
+
+
+def mail_signature():
+    """
+    Firma HTML para los correos enviados a clientes y usuarios.
+    """
+    profile = get_company_profile()
+    contact = " · ".join(escape(value) for value in (profile.phone, profile.email, profile.website) if value)
+    lines = [f"<strong>{escape(profile.trade_name)}</strong>", escape(profile.address)]
+    if contact:
+        lines.append(contact)
+    return f'<p style="font-size: 12px; color: #777;">{"<br>".join(lines)}</p>'
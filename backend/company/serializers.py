@@ -1,8 +1,8 @@
 from rest_framework import serializers
-from django.contrib.auth.models import User
 from .models import Company
+from utilities.audit import AuditUserSerializerMixin, AuditUserListSerializer
 
-class CompanySerializer(serializers.ModelSerializer):
+class CompanySerializer(AuditUserSerializerMixin, serializers.ModelSerializer):
 
     created_by_name = serializers.SerializerMethodField()
     modified_by_name = serializers.SerializerMethodField()
@@ -11,6 +11,7 @@ class CompanySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Company
+        list_serializer_class = AuditUserListSerializer
         fields = [
             'id', 'trade_name', 'nrc', 'classification', 'phone', 
             'address', 'logo', 'logo_public_id', 'logo_lqip', 'email', 
@@ -22,17 +23,7 @@ class CompanySerializer(serializers.ModelSerializer):
             'created_at', 'modified_by', 'modified_by_name', 'updated_at'
         ]
 
-    def _get_user_name(self, user_id):
-        if user_id is None:
-            return None
-        try:
-            user = User.objects.get(id=user_id)
-            return user.get_full_name() or user.username
-        except User.DoesNotExist:
-            return "Usuario Desconocido"
+    audit_unknown_user = "Usuario Desconocido"
 
-    def get_created_by_name(self, obj):
-        return self._get_user_name(obj.created_by)
-
-    def get_modified_by_name(self, obj):
-        return self._get_user_name(obj.modified_by)
\ No newline at end of file
+    def format_audit_user(self, user):
+        return user.get_full_name() or user.username
\ No newline at end of file
@@ -1,3 +1,58 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
 
-# Create your tests here.
+from utilities.testing import auth_headers
+
+from .models import Company
+from .profile import get_company_profile
+
+
+class CompanyProfileTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_superuser(username='empresa', password='secreta123')
+        self.headers = auth_headers(user)
+
+    def test_default_profile_until_company_exists(self):
+        self.assertEqual(get_company_profile().trade_name, "AutoRent León")
+        self.assertEqual(self.client.get('/api/v1/company', **self.headers).status_code, 404)
+
+        Company.objects.create(
+            trade_name="Rent León", nrc="12345-6", classification="Pequeña", phone="77778888",
+            address="Calle 1\nSan Miguel", email="info@rentleon.com",
+        )
+        self.assertEqual(get_company_profile().address, "Calle 1, San Miguel")
+
+    def test_get_is_served_from_memory_and_patch_refreshes_it(self):
+        Company.objects.create(
+            trade_name="Rent León", nrc="12345-6", classification="Pequeña", phone="77778888",
+            address="San Miguel", email="info@rentleon.com",
+        )
+        self.client.get('/api/v1/company', **self.headers)
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/company', **self.headers)
+        self.assertEqual(response.json()["data"]["trade_name"], "Rent León")
+
+        response = self.client.patch(
+            '/api/v1/company', encode_multipart(BOUNDARY, {"trade_name": "AutoRent Oriente"}),
+            content_type=MULTIPART_CONTENT, **self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/company', **self.headers).json()["data"]["trade_name"], "AutoRent Oriente")
+        self.assertEqual(get_company_profile().trade_name, "AutoRent Oriente")
+
+    def test_profile_expires_without_a_version_change(self):
+        company = Company.objects.create(
+            trade_name="Rent León", nrc="12345-6", classification="Pequeña", phone="77778888",
+            address="San Miguel", email="info@rentleon.com",
+        )
+        self.assertEqual(get_company_profile().trade_name, "Rent León")
+        # Un cambio hecho por otro worker con caché local no incrementa la versión de este proceso.
+        Company.objects.filter(pk=company.pk).update(trade_name="AutoRent Oriente")
+        self.assertEqual(get_company_profile().trade_name, "Rent León")
+
+        with override_settings(CATALOG_SNAPSHOT_MAX_AGE=0):
+            self.assertEqual(get_company_profile().trade_name, "AutoRent Oriente")
@@ -4,6 +4,7 @@ from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 
 from .models import Company
+from .profile import get_company_profile
 from .serializers import CompanySerializer
 from utilities.decorators import authenticate_user
 
@@ -16,14 +17,13 @@ class CompanyRU(APIView):
 
     @authenticate_user(required_permission='company.view_company')
     def get(self, request):
-        company = Company.objects.first()
-        if not company:
+        profile = get_company_profile()
+        if profile.data is None:
             return Response(
                 {"status": "error", "message": "No se ha configurado la información de la empresa."},
                 status=status.HTTP_404_NOT_FOUND
             )
-        serializer = CompanySerializer(company)
-        return Response({"status": "success", "data": serializer.data})
+        return Response({"status": "success", "data": profile.data})
 
     @authenticate_user(required_permission='company.change_company')
     def patch(self, request, *args, **kwargs):
@@ -56,6 +56,7 @@ class CompanyRU(APIView):
 
         serializer = CompanySerializer(instance, data=request.data, partial=True)
         if serializer.is_valid():
+            # El post_save incrementa la versión de la empresa y cada proceso recarga su perfil.
             updated_company = serializer.save()
 
             return Response({
@@ -0,0 +1,89 @@
+import random
+import statistics
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from customer.models import Customer, CustomerSearchTerm
+from customer.search import customer_terms, search_customer_ids
+
+FIRST_NAMES = ["Ana", "María", "José", "Juan", "Carlos", "Lucía", "Sofía", "Mario", "Marta", "Luis", "Elena", "Jorge"]
+LAST_NAMES = ["Pérez", "López", "Martínez", "Hernández", "García", "Rivas", "Flores", "Ramírez", "Cruz", "Castro", "Mejía", "Ayala"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara customer/search con un filtro icontains sobre N clientes sintéticos. "
+        "Los crea dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=200000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.populate(options['customers'])
+            queries = ["ma", "maría lóp", "mart cru", "0000012", "cliente777@", "7700 01"]
+            for query in queries:
+                indexed = self.measure(options['repeat'], lambda: search_customer_ids(query, options['limit']))
+                naive = self.measure(max(1, options['repeat'] // 10), lambda: self.naive_search(query, options['limit']))
+                self.stdout.write(
+                    f"{query!r:<16} índice {indexed * 1000:8.2f} ms   icontains {naive * 1000:9.2f} ms"
+                )
+            transaction.set_rollback(True)
+
+    def populate(self, count):
+        started = time.perf_counter()
+        rng = random.Random(7)
+        batch = []
+        for number in range(count):
+            batch.append(Customer(
+                first_name=f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)}",
+                last_name=f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}",
+                document_type='DUI', document_number=f"{number:08d}-{number % 10}",
+                address="San Miguel", phone=f"77{number:06d}", email=f"cliente{number}@example.com",
+                customer_type='Nacional', birth_date=date(1990, 1, 1),
+            ))
+            if len(batch) == 5000:
+                self.save_batch(batch)
+                batch = []
+        self.save_batch(batch)
+        self.stdout.write(
+            f"{count:,} clientes y {CustomerSearchTerm.objects.count():,} términos en {time.perf_counter() - started:.1f} s"
+        )
+
+    @staticmethod
+    def save_batch(batch):
+        # bulk_create no dispara post_save: los términos se crean aquí.
+        customers = Customer.objects.bulk_create(batch)
+        if customers and customers[0].pk is None:
+            customers = Customer.objects.filter(email__in=[customer.email for customer in batch])
+        CustomerSearchTerm.objects.bulk_create([
+            CustomerSearchTerm(customer_id=customer.pk, term=term)
+            for customer in customers for term in customer_terms(customer)
+        ])
+
+    @staticmethod
+    def naive_search(query, limit):
+        # Lo que haría un filtro directo sobre `customer`, sin índice utilizable.
+        filters = Q()
+        for word in query.split():
+            filters &= (
+                Q(first_name__icontains=word) | Q(last_name__icontains=word) | Q(document_number__icontains=word)
+                | Q(email__icontains=word) | Q(phone__icontains=word)
+            )
+        return list(Customer.objects.filter(filters, active=True).order_by('last_name', 'first_name').values_list('id', flat=True)[:limit])
+
+    @staticmethod
+    def measure(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
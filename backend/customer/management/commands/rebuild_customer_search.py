@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from customer.search import rebuild
+
+
+class Command(BaseCommand):
+    help = "Reconstruye la tabla customer_search_term a partir de los clientes activos."
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(f"Términos escritos: {total}.")
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 12:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from customer.search import customer_terms
+
+
+def fill_search_terms(apps, schema_editor):
+    """
+    Carga inicial de los términos de búsqueda de los clientes activos.
+    """
+    Customer = apps.get_model('customer', 'Customer')
+    CustomerSearchTerm = apps.get_model('customer', 'CustomerSearchTerm')
+
+    rows = []
+    for customer in Customer.objects.filter(active=True).iterator(chunk_size=2000):
+        rows.extend(CustomerSearchTerm(customer_id=customer.id, term=term) for term in customer_terms(customer))
+    CustomerSearchTerm.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, verbose_name='término')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='customer.customer', verbose_name='cliente')),
+            ],
+            options={
+                'verbose_name': 'Término de búsqueda de cliente',
+                'verbose_name_plural': 'Términos de búsqueda de clientes',
+                'db_table': 'customer_search_term',
+                'indexes': [models.Index(fields=['term', 'customer'], name='customer_search_term_idx')],
+            },
+        ),
+        migrations.RunPython(fill_search_terms, migrations.RunPython.noop),
+    ]
@@ -186,4 +186,28 @@ class Customer(models.Model):
         unique_together = ('document_type', 'document_number')
 
     def __str__(self):
-        return f"{self.first_name} {self.last_name}"
\ No newline at end of file
+        return f"{self.first_name} {self.last_name}"
+
+
+class CustomerSearchTerm(models.Model):
+    """
+    Términos normalizados (minúsculas, sin tildes) de cada cliente activo para
+    la búsqueda por prefijo de `customer/search` (customer/search.py).
+    """
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+        verbose_name="cliente"
+    )
+    term = models.CharField(max_length=100, verbose_name="término")
+
+    class Meta:
+        db_table = 'customer_search_term'
+        verbose_name = 'Término de búsqueda de cliente'
+        verbose_name_plural = 'Términos de búsqueda de clientes'
+        # Índice cubriente: la búsqueda por prefijo no necesita leer la tabla.
+        indexes = [
+            models.Index(fields=['term', 'customer'], name='customer_search_term_idx'),
+        ]
+
@@ -0,0 +1,145 @@
+"""
+Búsqueda de clientes por prefijo para el selector de `customer/search`.
+
+Cada cliente activo tiene en `customer_search_term` un término por palabra
+de su nombre, más su documento y teléfono (solo letras y dígitos) y su
+email, todos en minúsculas y sin tildes. La tabla se sincroniza en cada
+guardado (customer/signals.py).
+
+Las palabras de la consulta se buscan como rangos sobre el índice
+(term, customer): `prefijo <= term < prefijo + U+10FFFF`. A diferencia de
+LIKE, el rango aprovecha el índice en MySQL y en SQLite por igual.
+
+La intersección y el puntaje se resuelven en una sola consulta: se leen
+solo los términos que coinciden con alguna palabra, se agrupan por cliente
+(GROUP BY customer_id) y HAVING exige que cada palabra coincida con al menos
+un término. Cada cliente suma 2 puntos por palabra completa y 1 por prefijo;
+a igual puntaje se ordena por apellido y el límite se aplica al final, así
+que una palabra muy común ("maria") no deja fuera a quien también coincide
+con las demás.
+"""
+import re
+import unicodedata
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Value, When
+
+from customer.models import Customer, CustomerSearchTerm
+
+MAX_QUERY_WORDS = 5
+MIN_QUERY_LENGTH = 2
+TERM_MAX_LENGTH = CustomerSearchTerm._meta.get_field('term').max_length
+# Mayor que cualquier carácter: cierra el rango de un prefijo.
+PREFIX_UPPER_BOUND = '\U0010ffff'
+# Teléfonos locales de 8 dígitos guardados con código de país (+503...).
+LOCAL_PHONE_DIGITS = 8
+
+
+def fold(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    return ''.join(char for char in value if not unicodedata.combining(char)).lower().strip()
+
+
+def alphanumeric(value):
+    return re.sub(r'[^a-z0-9]', '', fold(value))
+
+
+def customer_terms(customer):
+    terms = set(re.findall(r'[a-z0-9]+', fold(f"{customer.first_name} {customer.last_name}")))
+    phone = re.sub(r'\D', '', customer.phone or '')
+    terms.update((alphanumeric(customer.document_number), phone, phone[-LOCAL_PHONE_DIGITS:], fold(customer.email)))
+    return {term[:TERM_MAX_LENGTH] for term in terms if term}
+
+
+def expected_terms(customer):
+    return customer_terms(customer) if customer.active else set()
+
+
+def sync_customer(customer):
+    expected = expected_terms(customer)
+    current = set(CustomerSearchTerm.objects.filter(customer=customer).values_list('term', flat=True))
+    if current == expected:
+        return
+
+    with transaction.atomic():
+        if current - expected:
+            CustomerSearchTerm.objects.filter(customer=customer, term__in=current - expected).delete()
+        CustomerSearchTerm.objects.bulk_create([
+            CustomerSearchTerm(customer=customer, term=term) for term in sorted(expected - current)
+        ])
+
+
+def rebuild(batch_size=2000):
+    """
+    Regenera la tabla completa a partir de los clientes activos. Devuelve
+    el número de términos escritos.
+    """
+    total = 0
+    with transaction.atomic():
+        CustomerSearchTerm.objects.all().delete()
+        customers = Customer.objects.filter(active=True).only(
+            'id', 'first_name', 'last_name', 'document_number', 'phone', 'email', 'active'
+        )
+        rows = []
+        for customer in customers.iterator(chunk_size=batch_size):
+            rows.extend(CustomerSearchTerm(customer_id=customer.id, term=term) for term in customer_terms(customer))
+            if len(rows) >= batch_size:
+                CustomerSearchTerm.objects.bulk_create(rows)
+                total += len(rows)
+                rows = []
+        CustomerSearchTerm.objects.bulk_create(rows)
+    return total + len(rows)
+
+
+def query_prefixes(query):
+    """
+    Variantes normalizadas de cada palabra de la consulta: tal cual (emails)
+    y solo con letras y dígitos (documentos con guion, teléfonos).
+    """
+    words = []
+    for word in query.split()[:MAX_QUERY_WORDS]:
+        prefixes = {prefix for prefix in (fold(word), alphanumeric(word)) if prefix}
+        if prefixes:
+            words.append(prefixes)
+    return words
+
+
+def prefix_filter(prefix):
+    return Q(term__gte=prefix, term__lt=prefix + PREFIX_UPPER_BOUND)
+
+
+def search_customer_ids(query, limit=10):
+    """
+    IDs de los `limit` clientes con mejor puntaje; a igual puntaje, por
+    apellido y nombre.
+    """
+    if len(query.strip()) < MIN_QUERY_LENGTH:
+        return []
+    words = query_prefixes(query)
+    if not words:
+        return []
+
+    def word_filter(prefixes):
+        return reduce(or_, (prefix_filter(prefix) for prefix in prefixes))
+
+    scores = {
+        f"word_{index}": Max(Case(
+            When(term__in=prefixes, then=Value(2)),
+            When(word_filter(prefixes), then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        ))
+        for index, prefixes in enumerate(words)
+    }
+    rows = (
+        CustomerSearchTerm.objects.filter(reduce(or_, (word_filter(prefixes) for prefixes in words)))
+        .values('customer_id')
+        .annotate(**scores)
+        .filter(**{f"{name}__gt": 0 for name in scores})
+        .annotate(score=sum(F(name) for name in scores))
+        .order_by('-score', 'customer__last_name', 'customer__first_name', 'customer_id')
+        .values_list('customer_id', flat=True)
+    )
+    return list(rows[:limit])
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from customer.models import Customer
-from django.contrib.auth.models import User
+from utilities.audit import AUDIT_FIELD_DEPENDENCIES, AuditUserSerializerMixin, AuditUserListSerializer
+from utilities.sparse_fields import SparseFieldsMixin
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, AuditUserSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Customer.
 
@@ -22,6 +23,7 @@ class CustomerSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Customer
+        list_serializer_class = AuditUserListSerializer
         # Lista de campos que se incluirán en la respuesta JSON.
         fields = (
             "id",
@@ -45,27 +47,12 @@ class CustomerSerializer(serializers.ModelSerializer):
             "modified_by_name",
             "updated_at"
         )
-
-    def get_created_by_name(self, obj):
-        """
-        Obtiene el 'first_name' del usuario que creó el cliente.
-        """
-        if obj.created_by is None:
-            return None
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except (User.DoesNotExist, ValueError):
-            return None
-
-    def get_modified_by_name(self, obj):
-        """
-        Obtiene el 'first_name' del usuario que modificó el cliente por última vez.
-        """
-        if obj.modified_by is None:
-            return None
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except (User.DoesNotExist, ValueError):
-            return None
+        # Conjuntos de campos con nombre para ?projection= (ver SparseFieldsMixin).
+        projections = {
+            'list': (
+                "id", "first_name", "last_name", "document_type", "document_number",
+                "phone", "email", "customer_type", "status",
+            ),
+            'detail': fields,
+        }
+        field_dependencies = AUDIT_FIELD_DEPENDENCIES
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from customer.models import Customer
+from customer.search import sync_customer
+
+
+@receiver(post_save, sender=Customer)
+def sync_customer_search_terms(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_customer(instance)
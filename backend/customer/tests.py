@@ -1,3 +1,72 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from utilities.testing import auth_headers
+
+from .models import Customer, CustomerSearchTerm
+from .search import rebuild, search_customer_ids
+
+
+def create_customer(first_name, last_name, document_number, email, phone="77778888"):
+    return Customer.objects.create(
+        first_name=first_name, last_name=last_name, document_type="DUI", document_number=document_number,
+        address="San Miguel", phone=phone, email=email, customer_type="Nacional", birth_date=date(1990, 1, 1),
+    )
+
+
+class CustomerSearchTests(TestCase):
+
+    def setUp(self):
+        self.maria = create_customer("María José", "López", "01234567-1", "mjlopez@example.com", phone="+50370001111")
+        self.mario = create_customer("Mario", "Lópezz", "07654321-0", "mario@example.com")
+        self.marta = create_customer("Marta", "Cruz", "05555555-5", "marta.cruz@example.com")
+
+    def test_prefix_matching_is_ranked_and_accent_insensitive(self):
+        self.assertEqual(search_customer_ids("jose lopez"), [self.maria.id])
+        # "lopez" completo vale más que el prefijo de "Lópezz"; "mar" es prefijo de los tres.
+        self.assertEqual(search_customer_ids("mar lopez"), [self.maria.id, self.mario.id])
+        self.assertEqual(search_customer_ids("0123456"), [self.maria.id])
+        self.assertEqual(search_customer_ids("01234567-1"), [self.maria.id])
+        self.assertEqual(search_customer_ids("7000"), [self.maria.id])
+        self.assertEqual(search_customer_ids("marta.c"), [self.marta.id])
+        self.assertEqual(search_customer_ids("m"), [])
+
+    def test_terms_follow_saves_and_deactivation(self):
+        self.marta.last_name = "Ayala"
+        self.marta.save()
+        self.assertEqual(search_customer_ids("marta ayala"), [self.marta.id])
+        self.assertEqual(search_customer_ids("cruz"), [])
+
+        self.marta.active = False
+        self.marta.save()
+        self.assertEqual(search_customer_ids("marta"), [])
+        terms = sorted(CustomerSearchTerm.objects.values_list('customer_id', 'term'))
+        rebuild()
+        self.assertEqual(sorted(CustomerSearchTerm.objects.values_list('customer_id', 'term')), terms)
+
+    def test_common_words_do_not_hide_the_intersection(self):
+        # Más clientes por palabra que cualquier lista de candidatos: la intersección debe ser completa.
+        Customer.objects.bulk_create([
+            Customer(
+                first_name=first_name, last_name=last_name, document_type="DUI",
+                document_number=f"{index:08d}-{group}", address="San Miguel", phone="77778888",
+                email=f"cliente{group}{index}@example.com", customer_type="Nacional", birth_date=date(1990, 1, 1),
+            )
+            for group, (first_name, last_name) in enumerate((("Maria", "Perez"), ("Ana", "Lopez")))
+            for index in range(550)
+        ])
+        rebuild()
+        both = create_customer("Maria", "Lopez", "09999999-9", "maria.lopez@example.com")
+        self.assertEqual(search_customer_ids("maria lopez"), [both.id, self.maria.id])
+        self.assertEqual(len(search_customer_ids("maria", limit=600)), 552)
+
+    def test_endpoint_returns_the_list_projection(self):
+        user = User.objects.create_superuser(username='ventas', password='secreta123')
+        headers = auth_headers(user)
+
+        response = self.client.get('/api/v1/customer/search?q=mar&limit=2', **headers)
+        data = response.json()["data"]
+        self.assertEqual([row["id"] for row in data], [self.marta.id, self.maria.id])
+        self.assertNotIn("address", data[0])
@@ -3,6 +3,7 @@ from .views import *
 
 urlpatterns = [
     path('customer', CustomerRC.as_view()),
+    path('customer/search', CustomerSearch.as_view()),
     path('customer/<int:id>', CustomerRU.as_view()),
     path('customer/delete/<int:id>', CustomerD.as_view()),
 ]
\ No newline at end of file
@@ -1,14 +1,20 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.db import transaction
 import json
 from django.core.exceptions import ValidationError
 
 from customer.models import Customer
+from customer.search import search_customer_ids
 from customer.serializers import CustomerSerializer
 from .forms import CustomerForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.sparse_fields import InvalidFieldSelection
+
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
 
 
 class CustomerRC(APIView):
@@ -24,8 +30,20 @@ class CustomerRC(APIView):
         Maneja las solicitudes GET para devolver una lista de todos los clientes activos.
         """
         try:
-            data = Customer.objects.filter(active=True).order_by('last_name', 'first_name')
-            serializer = CustomerSerializer(data, many=True)
+            fields = CustomerSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            data = CustomerSerializer.prepare_queryset(
+                Customer.objects.filter(active=True), fields, extra=('last_name', 'first_name')
+            ).order_by('last_name', 'first_name')
+            paginator = KeysetPagination(ordering=('last_name', 'first_name', 'id'))
+            response = paginator.respond(request, data, lambda page: CustomerSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = CustomerSerializer(data, many=True, fields=fields)
             return JsonResponse({
                 "data": serializer.data
             }, status=HTTPStatus.OK)
@@ -85,6 +103,32 @@ class CustomerRC(APIView):
             }, status=HTTPStatus.BAD_REQUEST)
         
     
+class CustomerSearch(APIView):
+    """
+    Búsqueda para autocompletar: clientes activos cuyo nombre, documento,
+    email o teléfono empiezan con las palabras de `q` (ver customer/search.py).
+    Parámetros: q, limit (10 por defecto, máximo 50) y los de selección de
+    campos; por defecto devuelve la proyección 'list'.
+    """
+    @authenticate_user(required_permission='customer.view_customer')
+    def get(self, request):
+        try:
+            limit = int(request.GET.get('limit', SEARCH_DEFAULT_LIMIT))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "El parámetro 'limit' debe ser un número entero."}, status=HTTPStatus.BAD_REQUEST)
+        limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+
+        try:
+            fields = CustomerSerializer.select_fields(request.GET) or CustomerSerializer.select_fields({'projection': 'list'})
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        ids = search_customer_ids(request.GET.get('q', ''), limit)
+        customers = CustomerSerializer.prepare_queryset(Customer.objects.filter(pk__in=ids), fields).in_bulk(ids) if ids else {}
+        serializer = CustomerSerializer([customers[id] for id in ids if id in customers], many=True, fields=fields)
+        return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
+
+
 class CustomerRU(APIView):
     @authenticate_user(required_permission='customer.view_customer')
     def get(self, request, id):
@@ -92,8 +136,13 @@ class CustomerRU(APIView):
         Maneja las solicitudes GET para devolver los datos de un cliente específico.
         """
         try:
-            customer = Customer.objects.get(pk=id, active=True)
-            serializer = CustomerSerializer(customer)
+            fields = CustomerSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            customer = CustomerSerializer.prepare_queryset(Customer.objects.all(), fields).get(pk=id, active=True)
+            serializer = CustomerSerializer(customer, fields=fields)
             return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
         
         except Customer.DoesNotExist:
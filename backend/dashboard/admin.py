@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import DailyRentalSummary, DailyRevenueSummary, VehicleStatusSummary
+
+
+@admin.register(DailyRevenueSummary)
+class DailyRevenueSummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'branch', 'concept', 'payment_type', 'amount', 'payments')
+    list_filter = ('branch', 'concept', 'payment_type')
+
+
+@admin.register(DailyRentalSummary)
+class DailyRentalSummaryAdmin(admin.ModelAdmin):
+    list_display = ('date', 'branch', 'rentals_started', 'rentals_finished')
+    list_filter = ('branch',)
+
+
+@admin.register(VehicleStatusSummary)
+class VehicleStatusSummaryAdmin(admin.ModelAdmin):
+    list_display = ('branch', 'status', 'vehicles')
@@ -0,0 +1,192 @@
+"""
+Exportaciones contables en CSV o XLSX de alquileres, pagos, clientes y
+facturas (`exports/<entidad>`).
+
+Las filas se leen con .values() (los JOIN los arma el ORM, como con
+select_related, pero sin construir instancias) en bloques por llave
+primaria (KeysetPagination.iterate_chunks) y se escriben a medida que
+llegan (utilities/spreadsheet.py). No se usa .iterator(): con MySQL el
+cliente carga el resultado completo en memoria.
+"""
+import datetime
+from collections import namedtuple
+
+from django.conf import settings
+
+from customer.models import Customer
+from dashboard.utilization import start_of_day
+from invoice.models import Invoice
+from payment.models import Payment
+from rental.models import Rental
+from utilities.pagination import KeysetPagination
+from utilities.spreadsheet import CSV_CONTENT_TYPE, XLSX_CONTENT_TYPE, stream_csv, stream_xlsx
+
+EXPORT_FORMATS = {'csv': CSV_CONTENT_TYPE, 'xlsx': XLSX_CONTENT_TYPE}
+
+# `fields` son rutas de .values(); con más de una se unen con un espacio (nombre y apellido).
+Column = namedtuple('Column', 'header fields choices', defaults=(None,))
+# `branch_field` y `status_field` son None si la entidad no admite ese filtro.
+ExportSpec = namedtuple('ExportSpec', 'title model columns date_field branch_field status_field')
+
+EXPORTS = {
+    'rentals': ExportSpec(
+        title="Alquileres",
+        model=Rental,
+        columns=(
+            Column("ID", ('id',)),
+            Column("Cliente", ('customer__first_name', 'customer__last_name')),
+            Column("Documento", ('customer__document_number',)),
+            Column("Vehículo", ('vehicle__plate',)),
+            Column("Sucursal de recogida", ('pickup_branch__name',)),
+            Column("Sucursal de devolución", ('return_branch__name',)),
+            Column("Inicio", ('start_date',)),
+            Column("Fin", ('end_date',)),
+            Column("Devolución real", ('actual_return_date',)),
+            Column("Estado", ('status',)),
+            Column("Precio total", ('total_price',)),
+            Column("Recargo por atraso", ('overdue_charge',)),
+        ),
+        date_field='start_date',
+        branch_field='pickup_branch_id',
+        status_field='status',
+    ),
+    'payments': ExportSpec(
+        title="Pagos",
+        model=Payment,
+        columns=(
+            Column("ID", ('id',)),
+            Column("Alquiler", ('rental_id',)),
+            Column("Cliente", ('rental__customer__first_name', 'rental__customer__last_name')),
+            Column("Sucursal", ('rental__pickup_branch__name',)),
+            Column("Fecha", ('payment_date',)),
+            Column("Concepto", ('concept',)),
+            Column("Método de pago", ('payment_type',), dict(Payment.PAYMENT_TYPE_CHOICES)),
+            Column("Monto", ('amount',)),
+            Column("Referencia", ('reference',)),
+        ),
+        date_field='payment_date',
+        branch_field='rental__pickup_branch_id',
+        status_field=None,
+    ),
+    'customers': ExportSpec(
+        title="Clientes",
+        model=Customer,
+        columns=(
+            Column("ID", ('id',)),
+            Column("Nombres", ('first_name',)),
+            Column("Apellidos", ('last_name',)),
+            Column("Tipo de documento", ('document_type',)),
+            Column("Número de documento", ('document_number',)),
+            Column("Teléfono", ('phone',)),
+            Column("Email", ('email',)),
+            Column("Tipo de cliente", ('customer_type',)),
+            Column("Fecha de nacimiento", ('birth_date',)),
+            Column("Estado", ('status',)),
+            Column("Fecha de registro", ('created_at',)),
+        ),
+        date_field='created_at',
+        branch_field=None,
+        status_field='status',
+    ),
+    'invoices': ExportSpec(
+        title="Facturas",
+        model=Invoice,
+        columns=(
+            Column("ID", ('id',)),
+            Column("Número", ('invoice_number',)),
+            Column("Fecha de emisión", ('issue_date',)),
+            Column("Alquiler", ('rental_id',)),
+            Column("Cliente", ('rental__customer__first_name', 'rental__customer__last_name')),
+            Column("Sucursal", ('rental__pickup_branch__name',)),
+            Column("Estado", ('status',)),
+            Column("Total", ('total_amount',)),
+            Column("Referencia", ('reference',)),
+        ),
+        date_field='issue_date',
+        branch_field='rental__pickup_branch_id',
+        status_field='status',
+    ),
+}
+
+
+def parse_date(value, name):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"El parámetro '{name}' debe tener el formato AAAA-MM-DD.")
+
+
+def get_export_queryset(spec, date_from=None, date_to=None, branch=None, status=None):
+    """
+    Registros activos de la entidad filtrados por rango de fechas (inclusivo),
+    sucursal y estados separados por coma. Lanza ValueError si los filtros no
+    son válidos o la entidad no los admite.
+
+    Las fechas se filtran como rango semiabierto de datetimes con zona
+    ([from 00:00, to + 1 día 00:00)) y no con `__date`: en MySQL eso se vuelve
+    DATE(CONVERT_TZ(...)), que no usa índices y da NULL sin las tablas de zonas.
+    """
+    queryset = spec.model.objects.filter(active=True)
+
+    if date_from:
+        date_from = parse_date(date_from, 'from')
+        queryset = queryset.filter(**{f"{spec.date_field}__gte": start_of_day(date_from)})
+    if date_to:
+        date_to = parse_date(date_to, 'to')
+        queryset = queryset.filter(**{f"{spec.date_field}__lt": start_of_day(date_to + datetime.timedelta(days=1))})
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("La fecha inicial no puede ser posterior a la fecha final.")
+
+    if branch:
+        if spec.branch_field is None:
+            raise ValueError(f"La exportación de {spec.title.lower()} no admite el filtro 'branch'.")
+        if not branch.isdigit():
+            raise ValueError("Parámetro 'branch' inválido.")
+        queryset = queryset.filter(**{spec.branch_field: int(branch)})
+
+    if status:
+        if spec.status_field is None:
+            raise ValueError(f"La exportación de {spec.title.lower()} no admite el filtro 'status'.")
+        statuses = [value.strip() for value in status.split(',') if value.strip()]
+        valid = dict(spec.model._meta.get_field(spec.status_field).choices)
+        invalid = [value for value in statuses if value not in valid]
+        if invalid:
+            raise ValueError(f"Estado(s) inválido(s): {', '.join(invalid)}.")
+        queryset = queryset.filter(**{f"{spec.status_field}__in": statuses})
+
+    return queryset
+
+
+def iter_export_rows(spec, queryset, chunk_size=None):
+    """
+    Bloques de filas (listas de valores en el orden de `spec.columns`).
+    """
+    chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    paths = list(dict.fromkeys(['id', *(field for column in spec.columns for field in column.fields)]))
+    paginator = KeysetPagination(ordering=('id',))
+    for rows in paginator.iterate_chunks(queryset.values(*paths), chunk_size):
+        yield [export_row(spec.columns, row) for row in rows]
+
+
+def export_row(columns, row):
+    values = []
+    for column in columns:
+        if len(column.fields) > 1:
+            value = " ".join(str(row[field]) for field in column.fields if row[field])
+        else:
+            value = row[column.fields[0]]
+            if column.choices:
+                value = column.choices.get(value, value)
+        values.append(value)
+    return values
+
+
+def write_export(spec, chunks, export_format):
+    headers = [column.header for column in spec.columns]
+    if export_format == 'xlsx':
+        return stream_xlsx(headers, chunks, sheet_name=spec.title)
+    return stream_csv(headers, chunks)
+
+
+def stream_export(spec, queryset, export_format, chunk_size=None):
+    return write_export(spec, iter_export_rows(spec, queryset, chunk_size), export_format)
@@ -0,0 +1,68 @@
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from dashboard.exports import EXPORTS, get_export_queryset, stream_export, write_export
+
+
+def peak_rss_mb():
+    # ru_maxrss viene en KB en Linux y en bytes en macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def payment_chunks(count, chunk_size):
+    """
+    Bloques de filas con la forma de la exportación de pagos, generados sin
+    guardarlos: la memoria solo depende de `chunk_size`.
+    """
+    base = timezone.make_aware(datetime(2025, 1, 1, 8, 0))
+    for offset in range(0, count, chunk_size):
+        yield [
+            [
+                number + 1, number // 3 + 1, f"Cliente {number % 900} Apellido", "Centro",
+                base + timedelta(minutes=number), "Anticipo", "Efectivo",
+                Decimal('40.00') + number % 50, f"REF-{number}",
+            ]
+            for number in range(offset, min(offset + chunk_size, count))
+        ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo y la memoria máxima (RSS) de exportar pagos a CSV y XLSX. "
+        "Por defecto usa 500000 filas sintéticas; con --db exporta la tabla real."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--db', action='store_true', help="Exporta los pagos de la base de datos.")
+        parser.add_argument('--format', choices=('csv', 'xlsx'), action='append', dest='formats')
+
+    def handle(self, *args, **options):
+        spec = EXPORTS['payments']
+        self.stdout.write(f"RSS inicial: {peak_rss_mb():.1f} MB")
+
+        for export_format in options['formats'] or ('csv', 'xlsx'):
+            if options['db']:
+                stream = stream_export(spec, get_export_queryset(spec), export_format, options['chunk_size'])
+            else:
+                stream = write_export(spec, payment_chunks(options['rows'], options['chunk_size']), export_format)
+
+            started = time.perf_counter()
+            total = 0
+            for data in stream:
+                total += len(data)
+            elapsed = time.perf_counter() - started
+            rows = "pagos de la base de datos" if options['db'] else f"{options['rows']:,} filas"
+            self.stdout.write(
+                f"{export_format}: {rows}, {total / 1024 / 1024:,.1f} MB en {elapsed:.2f} s; "
+                f"RSS máximo {peak_rss_mb():.1f} MB"
+            )
+
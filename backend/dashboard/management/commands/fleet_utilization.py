@@ -0,0 +1,60 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date
+
+from dashboard.utilization import SECONDS_PER_DAY, compute_utilization, utilization_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Reporte de utilización de la flota entre --from y --to (AAAA-MM-DD). "
+        "Con --benchmark N mide el cálculo sobre N alquileres sintéticos sin tocar la base de datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from')
+        parser.add_argument('--to', dest='date_to')
+        parser.add_argument('--category', type=int, default=None)
+        parser.add_argument('--branch', type=int, default=None)
+        parser.add_argument('--vehicles', action='store_true', help="Incluye el detalle por vehículo.")
+        parser.add_argument('--benchmark', type=int, default=None, metavar='N')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self.benchmark(options['benchmark'])
+
+        date_from = parse_date(options['date_from'] or '')
+        date_to = parse_date(options['date_to'] or '')
+        if date_from is None or date_to is None:
+            raise CommandError("Debe indicar --from y --to con formato AAAA-MM-DD.")
+
+        report = utilization_report(date_from, date_to, category=options['category'], branch=options['branch'])
+        if not options['vehicles']:
+            report.pop('vehicles')
+        self.stdout.write(json.dumps(report, cls=DjangoJSONEncoder, indent=2, ensure_ascii=False))
+
+    def benchmark(self, rentals, fleet_size=2000, years=3):
+        random.seed(7)
+        window_start = 1_600_000_000
+        window_end = window_start + years * 365 * SECONDS_PER_DAY
+        vehicles = [
+            (vehicle_id, f"P{vehicle_id:06d}", vehicle_id % 8, f"Categoría {vehicle_id % 8}", vehicle_id % 5, f"Sucursal {vehicle_id % 5}", 0)
+            for vehicle_id in range(1, fleet_size + 1)
+        ]
+        intervals = []
+        for _ in range(rentals):
+            start = random.randrange(window_start - 10 * SECONDS_PER_DAY, window_end)
+            end = start + random.randrange(3600, 14 * SECONDS_PER_DAY)
+            intervals.append((random.randrange(1, fleet_size + 1), start, end, random.uniform(30, 900)))
+
+        started = time.perf_counter()
+        report = compute_utilization(vehicles, intervals, window_start, window_end)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{rentals} alquileres, {fleet_size} vehículos, {years} años: {elapsed:.2f}s "
+            f"({rentals / elapsed:,.0f} alquileres/s), utilización de la flota {report['fleet']['utilization']}%"
+        )
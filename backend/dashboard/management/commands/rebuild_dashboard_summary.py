@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.summaries import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero las tablas de resumen del dashboard (carga inicial o corrección)."
+
+    def handle(self, *args, **options):
+        counts = rebuild()
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count} filas")
@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 12:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('branch', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRentalSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='fecha')),
+                ('rentals_started', models.IntegerField(default=0, verbose_name='alquileres iniciados')),
+                ('rentals_finished', models.IntegerField(default=0, verbose_name='alquileres finalizados')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='branch.branch', verbose_name='sucursal')),
+            ],
+            options={
+                'verbose_name': 'Alquileres diarios',
+                'verbose_name_plural': 'Alquileres diarios',
+                'db_table': 'dashboard_daily_rentals',
+                'constraints': [models.UniqueConstraint(fields=('date', 'branch'), name='dashboard_rentals_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='fecha')),
+                ('concept', models.CharField(max_length=20, verbose_name='concepto')),
+                ('payment_type', models.CharField(max_length=20, verbose_name='método de pago')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='monto')),
+                ('payments', models.IntegerField(default=0, verbose_name='cantidad de pagos')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='branch.branch', verbose_name='sucursal')),
+            ],
+            options={
+                'verbose_name': 'Ingreso diario',
+                'verbose_name_plural': 'Ingresos diarios',
+                'db_table': 'dashboard_daily_revenue',
+                'constraints': [models.UniqueConstraint(fields=('date', 'branch', 'concept', 'payment_type'), name='dashboard_revenue_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VehicleStatusSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20, verbose_name='estado')),
+                ('vehicles', models.IntegerField(default=0, verbose_name='vehículos')),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='branch.branch', verbose_name='sucursal')),
+            ],
+            options={
+                'verbose_name': 'Vehículos por estado',
+                'verbose_name_plural': 'Vehículos por estado',
+                'db_table': 'dashboard_vehicle_status',
+                'constraints': [models.UniqueConstraint(fields=('branch', 'status'), name='dashboard_vehicle_status_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.db import models
+
+from branch.models import Branch
+
+
+class DailyRevenueSummary(models.Model):
+    """
+    Ingresos por día, sucursal (de recogida del alquiler), concepto y método
+    de pago. Se mantiene con cada escritura de Payment (dashboard/signals.py).
+    """
+    date = models.DateField(verbose_name="fecha")
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, verbose_name="sucursal")
+    concept = models.CharField(max_length=20, verbose_name="concepto")
+    payment_type = models.CharField(max_length=20, verbose_name="método de pago")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="monto")
+    payments = models.IntegerField(default=0, verbose_name="cantidad de pagos")
+
+    class Meta:
+        db_table = 'dashboard_daily_revenue'
+        verbose_name = 'Ingreso diario'
+        verbose_name_plural = 'Ingresos diarios'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'branch', 'concept', 'payment_type'], name='dashboard_revenue_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.branch_id} {self.concept}/{self.payment_type}: {self.amount}"
+
+
+class DailyRentalSummary(models.Model):
+    """
+    Alquileres iniciados (por sucursal de recogida) y finalizados (por sucursal
+    de devolución) en cada día.
+    """
+    date = models.DateField(verbose_name="fecha")
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, verbose_name="sucursal")
+    rentals_started = models.IntegerField(default=0, verbose_name="alquileres iniciados")
+    rentals_finished = models.IntegerField(default=0, verbose_name="alquileres finalizados")
+
+    class Meta:
+        db_table = 'dashboard_daily_rentals'
+        verbose_name = 'Alquileres diarios'
+        verbose_name_plural = 'Alquileres diarios'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'branch'], name='dashboard_rentals_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.branch_id}: +{self.rentals_started} / -{self.rentals_finished}"
+
+
+class VehicleStatusSummary(models.Model):
+    """
+    Vehículos activos por sucursal y estado, al momento.
+    """
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE, verbose_name="sucursal")
+    status = models.CharField(max_length=20, verbose_name="estado")
+    vehicles = models.IntegerField(default=0, verbose_name="vehículos")
+
+    class Meta:
+        db_table = 'dashboard_vehicle_status'
+        verbose_name = 'Vehículos por estado'
+        verbose_name_plural = 'Vehículos por estado'
+        constraints = [
+            models.UniqueConstraint(fields=['branch', 'status'], name='dashboard_vehicle_status_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.branch_id} {self.status}: {self.vehicles}"
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from dashboard.summaries import apply_deltas, contributions, merge, moved_payment_contributions, previous_instance
+from payment.models import Payment
+from rental.models import Rental
+from vehicle.models import Vehicle
+
+
+@receiver(pre_save, sender=Payment)
+@receiver(pre_save, sender=Rental)
+@receiver(pre_save, sender=Vehicle)
+def remember_previous_contributions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = previous_instance(instance)
+    instance._dashboard_previous = contributions(previous) if previous is not None else []
+    instance._dashboard_moved = moved_payment_contributions(previous, instance) if sender is Rental else ([], [])
+
+
+@receiver(post_save, sender=Payment)
+@receiver(post_save, sender=Rental)
+@receiver(post_save, sender=Vehicle)
+def update_summaries_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    removed, added = getattr(instance, '_dashboard_moved', ([], []))
+    apply_deltas(merge(getattr(instance, '_dashboard_previous', []) + removed, contributions(instance) + added))
+
+
+@receiver(post_delete, sender=Payment)
+@receiver(post_delete, sender=Rental)
+@receiver(post_delete, sender=Vehicle)
+def update_summaries_on_delete(sender, instance, **kwargs):
+    apply_deltas(merge(contributions(instance), []))
@@ -0,0 +1,154 @@
+"""
+Mantenimiento incremental de las tablas de resumen del dashboard.
+
+Cada modelo de origen (Payment, Rental, Vehicle) se traduce a una lista de
+"aportes": (modelo resumen, llave, {campo: delta}). Al guardar un registro se
+resta el aporte de su versión anterior y se suma el de la nueva; al borrarlo
+solo se resta. Como las señales corren dentro de la transacción de la vista,
+el resumen se confirma o se revierte junto con el cambio que lo originó.
+
+Los ingresos se agrupan por la sucursal de retiro del alquiler, así que al
+cambiarla los aportes de sus pagos activos se mueven con él
+(`moved_payment_contributions`).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from dashboard.models import DailyRentalSummary, DailyRevenueSummary, VehicleStatusSummary
+from payment.models import Payment
+from rental.models import Rental
+from vehicle.models import Vehicle
+
+# Estados que no cuentan como alquiler iniciado.
+NOT_STARTED_STATUSES = ('Cancelado',)
+
+
+def local_date(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def payment_contributions(payment):
+    if not payment.active or payment.payment_date is None:
+        return []
+    key = {
+        'date': local_date(payment.payment_date),
+        'branch_id': payment.rental.pickup_branch_id,
+        'concept': payment.concept,
+        'payment_type': payment.payment_type,
+    }
+    return [(DailyRevenueSummary, key, {'amount': payment.amount, 'payments': 1})]
+
+
+def rental_contributions(rental):
+    if not rental.active:
+        return []
+    rows = []
+    if rental.status not in NOT_STARTED_STATUSES and rental.start_date:
+        key = {'date': local_date(rental.start_date), 'branch_id': rental.pickup_branch_id}
+        rows.append((DailyRentalSummary, key, {'rentals_started': 1}))
+    if rental.status == 'Finalizado' and rental.actual_return_date:
+        key = {'date': local_date(rental.actual_return_date), 'branch_id': rental.return_branch_id}
+        rows.append((DailyRentalSummary, key, {'rentals_finished': 1}))
+    return rows
+
+
+def vehicle_contributions(vehicle):
+    if not vehicle.active:
+        return []
+    return [(VehicleStatusSummary, {'branch_id': vehicle.branch_id, 'status': vehicle.status}, {'vehicles': 1})]
+
+
+# Modelo de origen -> (función de aportes, relaciones a precargar al leer la versión anterior).
+SOURCES = {
+    Payment: (payment_contributions, ('rental',)),
+    Rental: (rental_contributions, ()),
+    Vehicle: (vehicle_contributions, ()),
+}
+
+
+def contributions(instance):
+    contribution, _ = SOURCES[type(instance)]
+    return contribution(instance)
+
+
+def previous_instance(instance):
+    """
+    Versión guardada en la base de datos (antes de este save), o None.
+    """
+    if instance.pk is None:
+        return None
+    model = type(instance)
+    _, related = SOURCES[model]
+    return model._default_manager.select_related(*related).filter(pk=instance.pk).first()
+
+
+def moved_payment_contributions(previous, rental):
+    """
+    (aportes a restar, aportes a sumar) de los pagos activos de `rental` si
+    cambió su sucursal de retiro respecto de `previous`.
+    """
+    if previous is None or previous.pickup_branch_id == rental.pickup_branch_id:
+        return [], []
+    removed, added = [], []
+    for payment in Payment.objects.filter(rental_id=rental.pk, active=True):
+        payment.rental = previous
+        removed.extend(payment_contributions(payment))
+        payment.rental = rental
+        added.extend(payment_contributions(payment))
+    return removed, added
+
+
+def merge(removed, added):
+    """
+    Suma los aportes nuevos y resta los anteriores; descarta lo que no cambió.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    for sign, rows in ((-1, removed), (1, added)):
+        for model, key, values in rows:
+            bucket = deltas[(model, tuple(sorted(key.items())))]
+            for field, value in values.items():
+                bucket[field] += sign * value
+    return {
+        entry: {field: value for field, value in values.items() if value}
+        for entry, values in deltas.items()
+        if any(values.values())
+    }
+
+
+def apply_deltas(deltas):
+    with transaction.atomic():
+        for (model, key), values in deltas.items():
+            row, _ = model.objects.get_or_create(**dict(key))
+            model.objects.filter(pk=row.pk).update(**{field: F(field) + value for field, value in values.items()})
+
+
+def rebuild():
+    """
+    Recalcula todas las tablas desde cero (carga inicial o corrección de
+    desvíos por actualizaciones masivas que no disparan señales). Recorre
+    cada tabla de origen una sola vez.
+    """
+    totals = defaultdict(lambda: defaultdict(int))
+    sources = (
+        Payment.objects.filter(active=True).select_related('rental'),
+        Rental.objects.filter(active=True),
+        Vehicle.objects.filter(active=True),
+    )
+    for queryset in sources:
+        for instance in queryset.iterator(chunk_size=2000):
+            for model, key, values in contributions(instance):
+                bucket = totals[(model, tuple(sorted(key.items())))]
+                for field, value in values.items():
+                    bucket[field] += value
+
+    with transaction.atomic():
+        for model in (DailyRevenueSummary, DailyRentalSummary, VehicleStatusSummary):
+            model.objects.all().delete()
+            model.objects.bulk_create(
+                [model(**dict(key), **values) for (row_model, key), values in totals.items() if row_model is model],
+                batch_size=1000,
+            )
+    return {model.__name__: model.objects.count() for model in (DailyRevenueSummary, DailyRentalSummary, VehicleStatusSummary)}
@@ -0,0 +1,163 @@
+import csv
+import io
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from payment.models import Payment
+from utilities.testing import auth_headers, create_branch, create_customer, create_rental, create_vehicle
+from vehicle.models import Vehicle
+from .exports import EXPORTS, get_export_queryset
+from .models import DailyRentalSummary, DailyRevenueSummary, VehicleStatusSummary
+from .summaries import rebuild
+from .utilization import SECONDS_PER_DAY, compute_utilization, utilization_report
+
+
+def snapshot():
+    return (
+        sorted(DailyRevenueSummary.objects.exclude(payments=0).values_list('date', 'branch_id', 'concept', 'payment_type', 'amount', 'payments')),
+        sorted(DailyRentalSummary.objects.exclude(rentals_started=0, rentals_finished=0).values_list('date', 'branch_id', 'rentals_started', 'rentals_finished')),
+        sorted(VehicleStatusSummary.objects.exclude(vehicles=0).values_list('branch_id', 'status', 'vehicles')),
+    )
+
+
+class DashboardSummaryTests(TestCase):
+
+    def setUp(self):
+        self.day = timezone.make_aware(datetime(2025, 7, 10, 10, 0))
+        self.branch = create_branch()
+        self.vehicle = create_vehicle(1, self.branch)
+        create_vehicle(2, self.branch, status="En mantenimiento")
+        self.rental = create_rental(self.vehicle, create_customer(), self.branch, self.day, self.day + timedelta(days=2), status="Activo")
+        self.payment = Payment.objects.create(
+            rental=self.rental, amount=Decimal("40.00"), payment_type="Efectivo", concept="Anticipo", payment_date=self.day,
+        )
+
+    def test_incremental_updates_match_a_full_rebuild(self):
+        Payment.objects.create(
+            rental=self.rental, amount=Decimal("40.00"), payment_type="Transferencia", concept="Pago Final",
+            payment_date=self.day + timedelta(days=2),
+        )
+        self.payment.amount = Decimal("45.00")
+        self.payment.save()
+        self.rental.status = "Finalizado"
+        self.rental.actual_return_date = self.day + timedelta(days=2)
+        self.rental.save()
+        # Los ingresos siguen a la sucursal de retiro del alquiler.
+        other_branch = create_branch("Oriente")
+        self.rental.pickup_branch = other_branch
+        self.rental.save()
+        self.vehicle.status = "Alquilado"
+        self.vehicle.save()
+
+        incremental = snapshot()
+        rebuild()
+        self.assertEqual(incremental, snapshot())
+        self.assertEqual(DailyRevenueSummary.objects.get(concept="Anticipo", branch=other_branch).amount, Decimal("45.00"))
+        self.assertEqual(set(DailyRevenueSummary.objects.exclude(payments=0).values_list('branch_id', flat=True)), {other_branch.id})
+
+    def test_deactivated_payment_is_removed_from_revenue(self):
+        self.payment.active = False
+        self.payment.save()
+        self.assertEqual(DailyRevenueSummary.objects.get(concept="Anticipo").payments, 0)
+
+    def test_summary_endpoint_reads_only_summary_tables(self):
+        user = User.objects.create_user(username='gerencia', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='view_payment'))
+        headers = auth_headers(user)
+        url = '/api/v1/dashboard/summary?date_from=2025-07-01&date_to=2025-07-31'
+
+        self.client.get(url, **headers)
+        with self.assertNumQueries(3):
+            response = self.client.get(url, **headers)
+
+        data = response.json()["data"]
+        self.assertEqual(data["revenue"]["total"], "40.00")
+        self.assertEqual(data["revenue"]["by_concept"], {"Anticipo": "40.00"})
+        self.assertEqual(data["rentals"]["started"], 1)
+        self.assertEqual(data["vehicles"]["by_status"], {"Disponible": 1, "En mantenimiento": 1})
+
+
+class FleetUtilizationTests(TestCase):
+
+    def test_overlapping_rentals_are_merged_and_gaps_counted(self):
+        day = SECONDS_PER_DAY
+        vehicles = [(1, "P000001", 1, "Sedan", 1, "Centro", 0)]
+        intervals = [
+            (1, day // 2, day, 20.0),
+            (1, 3 * day // 4, day + day // 4, 10.0),
+            (1, -day, day // 4, 40.0),
+        ]
+        report = compute_utilization(vehicles, intervals, 0, 2 * day)
+        row = report["vehicles"][0]
+        # Ocupado [0, 6h) y [12h, 30h) de 48h; el tercero aporta 6h de sus 30h.
+        self.assertEqual(row["rented_hours"], 24.0)
+        self.assertEqual(row["utilization"], 50.0)
+        self.assertEqual(row["idle_gaps"], 2)
+        self.assertEqual(row["longest_idle_hours"], 18.0)
+        self.assertEqual(row["revenue"], 38.0)
+        self.assertEqual(report["fleet"]["revenue_per_available_day"], 19.0)
+
+    def test_report_reads_rentals_from_the_database(self):
+        branch = create_branch()
+        busy = create_vehicle(1, branch)
+        create_vehicle(2, branch)
+        start = timezone.make_aware(datetime(2025, 7, 10))
+        create_rental(busy, create_customer(), branch, start, start + timedelta(days=2), status="Finalizado")
+        for vehicle in Vehicle.objects.all():
+            vehicle.created_at = start - timedelta(days=30)
+            vehicle.save()
+
+        with self.assertNumQueries(2):
+            report = utilization_report(date(2025, 7, 10), date(2025, 7, 13))
+        self.assertEqual(report["fleet"]["utilization"], 25.0)
+        self.assertEqual({row["vehicle"]: row["utilization"] for row in report["vehicles"]}, {busy.id: 50.0, busy.id + 1: 0.0})
+
+
+@override_settings(EXPORT_CHUNK_SIZE=1)
+class DataExportTests(TestCase):
+
+    def setUp(self):
+        day = timezone.make_aware(datetime(2025, 7, 10, 10, 0))
+        self.centro, self.norte = create_branch(), create_branch("Norte")
+        for number, branch in ((1, self.centro), (2, self.norte), (3, self.centro)):
+            rental = create_rental(create_vehicle(number, branch), create_customer(number), branch, day, day + timedelta(days=2))
+            Payment.objects.create(
+                rental=rental, amount=Decimal("40.50"), payment_type="Tarjeta de Credito", concept="Anticipo",
+                payment_date=day, reference="=1+1",
+            )
+        user = User.objects.create_superuser(username='contabilidad', password='secreta123')
+        self.headers = auth_headers(user)
+
+    def test_csv_streams_filtered_rows(self):
+        response = self.client.get(f'/api/v1/exports/payments?from=2025-07-01&to=2025-07-31&branch={self.centro.id}', **self.headers)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode('utf-8-sig'))))
+        self.assertEqual(rows[0][:3], ["ID", "Alquiler", "Cliente"])
+        self.assertEqual([row[3] for row in rows[1:]], ["Centro", "Centro"])
+        self.assertEqual(rows[1][4:], ["10-07-2025 10:00", "Anticipo", "Tarjeta de Crédito", "40.50", "'=1+1"])
+
+        response = self.client.get('/api/v1/exports/payments?status=Activo', **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_date_filter_is_a_local_half_open_range(self):
+        payments = Payment.objects.order_by('id')
+        payments.filter(pk=payments[0].pk).update(payment_date=timezone.make_aware(datetime(2025, 7, 10, 23, 59)))
+        payments.filter(pk=payments[1].pk).update(payment_date=timezone.make_aware(datetime(2025, 7, 11, 0, 0)))
+        queryset = get_export_queryset(EXPORTS['payments'], date_from='2025-07-10', date_to='2025-07-10')
+        self.assertEqual(list(queryset.values_list('id', flat=True)), [payments[0].pk, payments[2].pk])
+        # Sin DATE()/CONVERT_TZ: la columna se compara directamente y puede usar su índice.
+        self.assertNotIn('CAST', str(queryset.query).upper())
+
+    def test_xlsx_is_a_valid_workbook(self):
+        response = self.client.get('/api/v1/exports/rentals?format=xlsx&status=Reservado', **self.headers)
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertIn('xl/workbook.xml', archive.namelist())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row '), 4)
+        self.assertIn('<c r="B2" t="inlineStr"><is><t xml:space="preserve">Ana Pérez</t></is></c>', sheet)
+        self.assertIn('<c r="K4" s="4"><v>80.00</v></c>', sheet)
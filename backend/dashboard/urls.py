@@ -0,0 +1,11 @@
+from django.urls import path
+from .views import *
+
+urlpatterns = [
+    path('dashboard/summary', DashboardSummary.as_view()),
+    path('dashboard/utilization', FleetUtilization.as_view()),
+    path('exports/rentals', RentalExport.as_view()),
+    path('exports/payments', PaymentExport.as_view()),
+    path('exports/customers', CustomerExport.as_view()),
+    path('exports/invoices', InvoiceDataExport.as_view()),
+]
@@ -0,0 +1,179 @@
+"""
+Reporte de utilización de la flota sobre un rango de fechas.
+
+Trae las columnas necesarias de `rental` y `vehicle` con una consulta cada
+una y trabaja con segundos enteros (epoch) y flotantes en lugar de datetime y
+Decimal: ordenar, recortar y unir intervalos por vehículo es O(n log n) y
+aguanta rangos de varios años. El monto del reporte es indicativo (se
+prorratea el precio de cada alquiler según la parte que cae en el rango);
+para montos contables se usan los pagos.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from rental.availability import effective_end, may_end_after
+from rental.models import Rental
+from vehicle.models import Vehicle
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * SECONDS_PER_HOUR
+
+# Alquileres que no ocupan el vehículo.
+EXCLUDED_STATUSES = ('Cancelado',)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def date_window(date_from, date_to):
+    """
+    [date_from 00:00, date_to + 1 día 00:00) en la zona del proyecto.
+    """
+    return start_of_day(date_from), start_of_day(date_to + timedelta(days=1))
+
+
+def fetch_vehicles(category=None, branch=None):
+    queryset = Vehicle.objects.filter(active=True)
+    if category is not None:
+        queryset = queryset.filter(vehiclecategory_id=category)
+    if branch is not None:
+        queryset = queryset.filter(branch_id=branch)
+    return [
+        (vehicle_id, plate, category_id, category_name, branch_id, branch_name, int(created_at.timestamp()))
+        for vehicle_id, plate, category_id, category_name, branch_id, branch_name, created_at in queryset.values_list(
+            'id', 'plate', 'vehiclecategory_id', 'vehiclecategory__name', 'branch_id', 'branch__name', 'created_at',
+        ).order_by('id')
+    ]
+
+
+def fetch_intervals(window_start, window_end, now, category=None, branch=None):
+    """
+    (vehicle_id, inicio, fin, precio) en segundos/float de los alquileres que
+    tocan la ventana. El fin es la devolución real, o la fecha pactada; si el
+    alquiler sigue abierto y ya venció, se extiende hasta `now`.
+    """
+    queryset = Rental.objects.filter(
+        may_end_after(window_start),
+        active=True,
+        vehicle__active=True,
+        start_date__lt=window_end,
+    ).exclude(status__in=EXCLUDED_STATUSES)
+    if category is not None:
+        queryset = queryset.filter(vehicle__vehiclecategory_id=category)
+    if branch is not None:
+        queryset = queryset.filter(vehicle__branch_id=branch)
+    rows = queryset.values_list(
+        'vehicle_id', 'start_date', 'end_date', 'actual_return_date', 'total_price', 'status',
+    )
+
+    intervals = []
+    for vehicle_id, start_date, end_date, actual_return_date, total_price, status in rows.iterator(chunk_size=5000):
+        end = effective_end(end_date, actual_return_date, status, now)
+        intervals.append((vehicle_id, int(start_date.timestamp()), int(end.timestamp()), float(total_price)))
+    return intervals
+
+
+def _ratio(part, whole):
+    return round(100.0 * part / whole, 2) if whole else 0.0
+
+
+def _summarize(available, rented, revenue):
+    return {
+        "available_hours": round(available / SECONDS_PER_HOUR, 2),
+        "rented_hours": round(rented / SECONDS_PER_HOUR, 2),
+        "utilization": _ratio(rented, available),
+        "revenue": round(revenue, 2),
+        # Ingreso por día disponible (equivalente al RevPAR hotelero).
+        "revenue_per_available_day": round(revenue * SECONDS_PER_DAY / available, 2) if available else 0.0,
+    }
+
+
+def compute_utilization(vehicles, intervals, window_start, window_end):
+    """
+    `vehicles`: tuplas de `fetch_vehicles`; `intervals`: tuplas de
+    `fetch_intervals`; la ventana en segundos epoch. Devuelve el reporte por
+    vehículo, categoría, sucursal y flota.
+    """
+    by_vehicle = defaultdict(list)
+    for vehicle_id, start, end, price in intervals:
+        by_vehicle[vehicle_id].append((start, end, price))
+
+    vehicle_rows = []
+    categories = defaultdict(lambda: [None, 0, 0, 0.0])
+    branches = defaultdict(lambda: [None, 0, 0, 0.0])
+    fleet = [0, 0, 0.0]
+
+    for vehicle_id, plate, category_id, category_name, branch_id, branch_name, created_at in vehicles:
+        available_from = max(window_start, created_at)
+        available = max(0, window_end - available_from)
+        rented = 0
+        revenue = 0.0
+        gaps = 0
+        longest_gap = 0
+        cursor = available_from
+
+        for start, end, price in sorted(by_vehicle.get(vehicle_id, ())):
+            clipped_start = max(start, available_from)
+            clipped_end = min(end, window_end)
+            if clipped_end <= clipped_start:
+                continue
+            if end > start:
+                revenue += price * (min(end, window_end) - max(start, window_start)) / (end - start)
+            if clipped_start > cursor:
+                gaps += 1
+                longest_gap = max(longest_gap, clipped_start - cursor)
+            if clipped_end > cursor:
+                rented += clipped_end - max(clipped_start, cursor)
+                cursor = clipped_end
+
+        if window_end > cursor and available:
+            gaps += 1
+            longest_gap = max(longest_gap, window_end - cursor)
+
+        row = _summarize(available, rented, revenue)
+        row.update({
+            "vehicle": vehicle_id,
+            "plate": plate,
+            "category": category_id,
+            "branch": branch_id,
+            "idle_gaps": gaps,
+            "longest_idle_hours": round(longest_gap / SECONDS_PER_HOUR, 2),
+        })
+        vehicle_rows.append(row)
+
+        for groups, key, name in ((categories, category_id, category_name), (branches, branch_id, branch_name)):
+            group = groups[key]
+            group[0] = name
+            group[1] += available
+            group[2] += rented
+            group[3] += revenue
+        fleet[0] += available
+        fleet[1] += rented
+        fleet[2] += revenue
+
+    def group_rows(groups, key_name):
+        return [
+            {key_name: key, "name": name, **_summarize(available, rented, revenue)}
+            for key, (name, available, rented, revenue) in groups.items()
+        ]
+
+    return {
+        "fleet": {"vehicles": len(vehicle_rows), **_summarize(*fleet)},
+        "categories": group_rows(categories, "category"),
+        "branches": group_rows(branches, "branch"),
+        "vehicles": vehicle_rows,
+    }
+
+
+def utilization_report(date_from, date_to, category=None, branch=None, now=None):
+    window_start, window_end = date_window(date_from, date_to)
+    now = now or timezone.now()
+    vehicles = fetch_vehicles(category=category, branch=branch)
+    intervals = fetch_intervals(window_start, window_end, now, category=category, branch=branch)
+    report = compute_utilization(vehicles, intervals, int(window_start.timestamp()), int(window_end.timestamp()))
+    report["date_from"] = date_from
+    report["date_to"] = date_to
+    return report
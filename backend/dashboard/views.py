@@ -0,0 +1,198 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from http import HTTPStatus
+
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from utilities.fast_json import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.views import APIView
+
+from utilities.decorators import authenticate_user
+from .exports import EXPORT_FORMATS, EXPORTS, get_export_queryset, stream_export
+from .models import DailyRentalSummary, DailyRevenueSummary, VehicleStatusSummary
+from .utilization import utilization_report
+
+DEFAULT_RANGE_DAYS = 30
+MAX_UTILIZATION_RANGE_DAYS = 5 * 366
+ZERO = Decimal('0.00')
+
+
+class DashboardSummary(APIView):
+    """
+    KPIs del dashboard leídos de las tablas de resumen (nunca de `rental` ni
+    `payment`). Parámetros: date_from, date_to (AAAA-MM-DD, por defecto los
+    últimos 30 días) y branch.
+    """
+
+    @authenticate_user(required_permission='payment.view_payment')
+    def get(self, request):
+        date_to = request.GET.get('date_to')
+        date_from = request.GET.get('date_from')
+        branch = request.GET.get('branch')
+
+        date_to = parse_date(date_to) if date_to else timezone.localdate()
+        date_from = parse_date(date_from) if date_from else None
+        if date_to is None or (request.GET.get('date_from') and date_from is None):
+            return JsonResponse({"status": "error", "message": "Formato de fecha inválido, use AAAA-MM-DD"}, status=HTTPStatus.BAD_REQUEST)
+        date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+        if date_from > date_to:
+            return JsonResponse({"status": "error", "message": "date_from debe ser anterior o igual a date_to"}, status=HTTPStatus.BAD_REQUEST)
+        if branch is not None and not branch.isdigit():
+            return JsonResponse({"status": "error", "message": "Parámetro 'branch' inválido"}, status=HTTPStatus.BAD_REQUEST)
+
+        revenue = DailyRevenueSummary.objects.filter(date__range=(date_from, date_to))
+        rentals = DailyRentalSummary.objects.filter(date__range=(date_from, date_to))
+        vehicles = VehicleStatusSummary.objects.all()
+        if branch is not None:
+            revenue = revenue.filter(branch_id=branch)
+            rentals = rentals.filter(branch_id=branch)
+            vehicles = vehicles.filter(branch_id=branch)
+
+        revenue_total = ZERO
+        payments_total = 0
+        by_concept = defaultdict(lambda: ZERO)
+        by_payment_type = defaultdict(lambda: ZERO)
+        revenue_by_day = defaultdict(lambda: ZERO)
+        rows = revenue.values('date', 'concept', 'payment_type').annotate(total=Sum('amount'), count=Sum('payments'))
+        for row in rows:
+            revenue_total += row['total']
+            payments_total += row['count']
+            by_concept[row['concept']] += row['total']
+            by_payment_type[row['payment_type']] += row['total']
+            revenue_by_day[row['date']] += row['total']
+
+        rentals_by_day = list(
+            rentals.values('date').annotate(started=Sum('rentals_started'), finished=Sum('rentals_finished')).order_by('date')
+        )
+        vehicles_by_status = {
+            row['status']: row['count']
+            for row in vehicles.values('status').annotate(count=Sum('vehicles'))
+            if row['count']
+        }
+
+        return JsonResponse({
+            "data": {
+                "date_from": date_from,
+                "date_to": date_to,
+                "branch": int(branch) if branch is not None else None,
+                "revenue": {
+                    "total": revenue_total,
+                    "payments": payments_total,
+                    "by_concept": dict(by_concept),
+                    "by_payment_type": dict(by_payment_type),
+                    "by_day": [{"date": day, "amount": revenue_by_day[day]} for day in sorted(revenue_by_day)],
+                },
+                "rentals": {
+                    "started": sum(row['started'] for row in rentals_by_day),
+                    "finished": sum(row['finished'] for row in rentals_by_day),
+                    "by_day": rentals_by_day,
+                },
+                "vehicles": {
+                    "total": sum(vehicles_by_status.values()),
+                    "by_status": vehicles_by_status,
+                },
+            }
+        }, status=HTTPStatus.OK)
+
+
+class FleetUtilization(APIView):
+    """
+    Porcentaje de horas alquiladas, ingreso por día disponible y tiempos
+    muertos por vehículo, categoría y sucursal. Parámetros: date_from y
+    date_to (obligatorios, AAAA-MM-DD), category y branch.
+    """
+
+    @authenticate_user(required_permission='rental.view_rental')
+    def get(self, request):
+        date_from = parse_date(request.GET.get('date_from') or '')
+        date_to = parse_date(request.GET.get('date_to') or '')
+        if date_from is None or date_to is None:
+            return JsonResponse({"status": "error", "message": "Debe indicar date_from y date_to con formato AAAA-MM-DD"}, status=HTTPStatus.BAD_REQUEST)
+        if date_from > date_to:
+            return JsonResponse({"status": "error", "message": "date_from debe ser anterior o igual a date_to"}, status=HTTPStatus.BAD_REQUEST)
+        if (date_to - date_from).days >= MAX_UTILIZATION_RANGE_DAYS:
+            return JsonResponse({"status": "error", "message": "El rango máximo es de 5 años"}, status=HTTPStatus.BAD_REQUEST)
+
+        filters = {}
+        for name in ('category', 'branch'):
+            value = request.GET.get(name)
+            if value is None:
+                continue
+            if not value.isdigit():
+                return JsonResponse({"status": "error", "message": f"Parámetro '{name}' inválido"}, status=HTTPStatus.BAD_REQUEST)
+            filters[name] = int(value)
+
+        try:
+            report = utilization_report(date_from, date_to, **filters)
+        except Exception as e:
+            print(f"Error al calcular la utilización de la flota: {e}")
+            return JsonResponse({"status": "error", "message": "Ocurrió un error inesperado"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        return JsonResponse({"data": report}, status=HTTPStatus.OK)
+
+
+class DataExport(APIView):
+    """
+    Descarga en CSV o XLSX por flujo, sin cargar la tabla en memoria.
+    Parámetros: from, to (AAAA-MM-DD), branch, status (separados por coma) y
+    format (csv por defecto). Cada subclase define la entidad y su permiso.
+    """
+
+    export_name = None
+
+    def export(self, request):
+        spec = EXPORTS[self.export_name]
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({"status": "error", "message": "El formato debe ser 'csv' o 'xlsx'."}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            queryset = get_export_queryset(
+                spec,
+                date_from=request.GET.get('from'),
+                date_to=request.GET.get('to'),
+                branch=request.GET.get('branch'),
+                status=request.GET.get('status'),
+            )
+        except ValueError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        response = StreamingHttpResponse(stream_export(spec, queryset, export_format), content_type=EXPORT_FORMATS[export_format])
+        filename = f"{spec.title}-{timezone.localdate().strftime('%Y%m%d')}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class RentalExport(DataExport):
+    export_name = 'rentals'
+
+    @authenticate_user(required_permission='rental.view_rental')
+    def get(self, request):
+        return self.export(request)
+
+
+class PaymentExport(DataExport):
+    export_name = 'payments'
+
+    @authenticate_user(required_permission='payment.view_payment')
+    def get(self, request):
+        return self.export(request)
+
+
+class CustomerExport(DataExport):
+    export_name = 'customers'
+
+    @authenticate_user(required_permission='customer.view_customer')
+    def get(self, request):
+        return self.export(request)
+
+
+class InvoiceDataExport(DataExport):
+    export_name = 'invoices'
+
+    @authenticate_user(required_permission='invoice.view_invoice')
+    def get(self, request):
+        return self.export(request)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DepartmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'department'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import Department
+
+        connect_catalog(Department)
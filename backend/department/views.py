@@ -1,11 +1,14 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse, Http404
+from django.http import Http404
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.utils.timezone import now
 
 from department.models import Department
 from department.serializers import DepartmentSerializer
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.catalog_cache import catalog_cache
 
 # Create your views here.
 
@@ -20,10 +23,15 @@ class DepartmentRC(APIView):
         try:
             # El usuario ya está autenticado y tiene los permisos necesarios en este punto
             data = Department.objects.filter(active=True).order_by('id')
-            datos_json = DepartmentSerializer(data, many=True)
-            return JsonResponse({
-                "data": datos_json.data
-            }, status=HTTPStatus.OK)
+            paginator = KeysetPagination(ordering=('id',))
+            response = paginator.respond(request, data, lambda page: DepartmentSerializer(page, many=True).data)
+            if response is not None:
+                return response
+
+            return catalog_cache.response(
+                request, 'department', (Department,),
+                lambda: ({"data": DepartmentSerializer(data, many=True).data}, HTTPStatus.OK),
+            )
         except Exception as e:
             return JsonResponse(
                 {"status": "error", "message": f"Ocurrió un error al procesar la solicitud. {e}"},
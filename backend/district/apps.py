@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DistrictConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'district'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import District
+
+        connect_catalog(District)
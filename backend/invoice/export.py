@@ -0,0 +1,185 @@
+import datetime
+import multiprocessing
+import tempfile
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from company.profile import get_company_profile
+from utilities.spreadsheet import ZipStreamBuffer
+
+from .models import Invoice
+from .pdf import draw_invoice_page, invoice_pdf_store
+from .render_worker import setup_render_worker
+
+EXPORT_FORMATS = ('zip', 'pdf')
+PROGRESS_CACHE_PREFIX = 'invoice_export:'
+PROGRESS_CACHE_TIMEOUT = 60 * 60
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def get_export_queryset(date_from=None, date_to=None, status=None):
+    """
+    Facturas activas filtradas por rango de fechas de emisión (YYYY-MM-DD,
+    inclusivo) y/o estados separados por coma. Lanza ValueError si los filtros
+    no son válidos.
+
+    Las fechas se comparan como datetimes con zona ([desde 00:00, hasta + 1 día
+    00:00)) para que MySQL use el índice en lugar de DATE(CONVERT_TZ(...)).
+    """
+    queryset = Invoice.objects.select_related('rental__customer').filter(active=True)
+
+    try:
+        if date_from:
+            queryset = queryset.filter(issue_date__gte=start_of_day(datetime.date.fromisoformat(date_from)))
+        if date_to:
+            next_day = datetime.date.fromisoformat(date_to) + datetime.timedelta(days=1)
+            queryset = queryset.filter(issue_date__lt=start_of_day(next_day))
+    except ValueError:
+        raise ValueError("Las fechas deben tener el formato AAAA-MM-DD.")
+
+    if date_from and date_to and date_from > date_to:
+        raise ValueError("La fecha inicial no puede ser posterior a la fecha final.")
+
+    if status:
+        statuses = [value.strip() for value in status.split(',') if value.strip()]
+        valid = dict(Invoice.STATUS_CHOICES)
+        invalid = [value for value in statuses if value not in valid]
+        if invalid:
+            raise ValueError(f"Estado(s) inválido(s): {', '.join(invalid)}.")
+        queryset = queryset.filter(status__in=statuses)
+
+    return queryset.order_by('issue_date', 'id')
+
+
+class ExportProgress:
+    """
+    Avance de una exportación. Se publica en la caché de Django para que
+    `invoice/export/<job_id>` pueda consultarlo mientras se descarga.
+    """
+
+    def __init__(self, total, job_id=None, publish_every=10):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.total = total
+        self.done = 0
+        self.status = 'En progreso'
+        self.started = time.monotonic()
+        self.publish_every = publish_every
+        self.publish()
+
+    def advance(self, count=1):
+        self.done += count
+        if self.done % self.publish_every == 0 or self.done == self.total:
+            self.publish()
+
+    def finish(self, status='Completado'):
+        self.status = status
+        self.publish()
+
+    def to_dict(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "percent": round(self.done * 100 / self.total, 1) if self.total else 100.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "invoices_per_second": round(self.done / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    def publish(self):
+        cache.set(f"{PROGRESS_CACHE_PREFIX}{self.job_id}", self.to_dict(), PROGRESS_CACHE_TIMEOUT)
+
+    @staticmethod
+    def get(job_id):
+        return cache.get(f"{PROGRESS_CACHE_PREFIX}{job_id}")
+
+
+def render_invoice_job(invoice, company):
+    """
+    Tarea del pool de procesos: usa la caché de PDFs, así que una factura ya
+    renderizada no se vuelve a dibujar. `company` llega del proceso padre para
+    que todas las facturas usen el mismo perfil sin consultarlo en cada worker.
+    """
+    return f"Factura-{invoice.invoice_number}.pdf", invoice_pdf_store.get_bytes(invoice, company)
+
+
+def iter_rendered_invoices(invoices, workers=None, total=None):
+    """
+    Genera (nombre, bytes) en el mismo orden de `invoices`. Con más de un worker
+    y al menos INVOICE_EXPORT_POOL_MIN_INVOICES facturas (`total`) renderiza en
+    un pool de procesos, manteniendo como máximo 2 tareas por proceso en vuelo
+    para no acumular todos los PDFs en memoria.
+
+    Los procesos se crean con 'spawn' y no con 'fork': copiar un worker de
+    gunicorn a mitad de una solicitud duplicaría su conexión a MySQL y los
+    hilos en segundo plano. Cada hijo arranca sin Django configurado y ejecuta
+    `django.setup()` sin hilos en segundo plano (invoice/render_worker.py), un
+    costo fijo que solo compensa en exportaciones grandes.
+    """
+    workers = workers or getattr(settings, 'INVOICE_EXPORT_WORKERS', 2)
+    company = get_company_profile()
+    if workers <= 1 or (total is not None and total < getattr(settings, 'INVOICE_EXPORT_POOL_MIN_INVOICES', 200)):
+        for invoice in invoices:
+            yield render_invoice_job(invoice, company)
+        return
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=setup_render_worker) as executor:
+        pending = deque()
+        for invoice in invoices:
+            pending.append(executor.submit(render_invoice_job, invoice, company))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_invoices_zip(invoices, progress, workers=None):
+    buffer = ZipStreamBuffer()
+    completed = False
+    try:
+        with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for filename, data in iter_rendered_invoices(invoices, workers, total=progress.total):
+                archive.writestr(filename, data)
+                progress.advance()
+                yield buffer.drain()
+        yield buffer.drain()
+        completed = True
+    finally:
+        # También si el cliente se desconecta (GeneratorExit): el trabajo no queda 'En progreso'.
+        progress.finish(status='Completado' if completed else 'Error')
+
+
+def build_merged_invoices_pdf(invoices, progress):
+    """
+    Un único PDF con una página por factura, usando el mismo diseño de
+    `generate_invoice_pdf`. El resultado se escribe en un archivo temporal que
+    pasa a disco a partir de 10 MB.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=10 * 1024 * 1024)
+    p = canvas.Canvas(output, pagesize=letter)
+    company = get_company_profile()
+    try:
+        for invoice in invoices:
+            draw_invoice_page(p, invoice, company)
+            progress.advance()
+        p.save()
+    except Exception:
+        progress.finish(status='Error')
+        raise
+    progress.finish()
+    output.seek(0)
+    return output
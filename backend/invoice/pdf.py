@@ -0,0 +1,197 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+
+from company.profile import get_company_profile
+
+# Cambiar al modificar el diseño del PDF: invalida todo lo ya renderizado.
+INVOICE_PDF_LAYOUT_VERSION = 2
+
+
+def draw_invoice_page(p, invoice, company=None):
+    """
+    Dibuja una factura en la página actual del canvas y la cierra. `company`
+    es el perfil de la empresa (por defecto, el vigente del proceso).
+    """
+    width, height = letter
+    company = company or get_company_profile()
+
+    p.setFont("Helvetica-Bold", 16)
+    p.drawString(0.75 * inch, height - 1 * inch, "FACTURA")
+    p.setFont("Helvetica", 10)
+    p.drawString(0.75 * inch, height - 1.25 * inch, company.trade_name)
+    p.drawString(0.75 * inch, height - 1.40 * inch, company.address)
+    if company.nrc:
+        p.drawString(0.75 * inch, height - 1.55 * inch, f"NRC: {company.nrc}   Tel: {company.phone}")
+
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(4.5 * inch, height - 1 * inch, f"Factura N°: {invoice.invoice_number}")
+    p.setFont("Helvetica", 10)
+    p.drawString(4.5 * inch, height - 1.25 * inch, f"Fecha de Emisión: {invoice.issue_date.strftime('%d-%m-%Y')}")
+
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(0.75 * inch, height - 2.2 * inch, "Facturar a:")
+    p.setFont("Helvetica", 10)
+    p.drawString(0.75 * inch, height - 2.4 * inch, f"Cliente: {invoice.rental.customer.__str__()}")
+    p.drawString(0.75 * inch, height - 2.55 * inch, f"Email: {invoice.rental.customer.email}")
+
+    p.line(0.75 * inch, height - 3 * inch, width - 0.75 * inch, height - 3 * inch)
+
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(0.75 * inch, height - 3.3 * inch, "Descripción")
+    
+    p.setFont("Helvetica", 10)
+    text_object = p.beginText(0.75 * inch, height - 3.5 * inch)
+    for line in invoice.reference.split('\n'):
+        text_object.textLine(line)
+    p.drawText(text_object)
+
+    p.setFont("Helvetica-Bold", 14)
+    total_text = f"TOTAL: ${invoice.total_amount:,.2f}"
+    p.drawRightString(width - 0.75 * inch, 1.5 * inch, total_text)
+
+    p.showPage()
+
+
+def generate_invoice_pdf(invoice, company=None):
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    draw_invoice_page(p, invoice, company)
+    p.save()
+    
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def invoice_pdf_fingerprint(invoice, company=None):
+    """
+    Hash de todos los datos que aparecen (o deberían forzar) un nuevo PDF.
+    Requiere `rental__customer` precargado para no generar consultas extra.
+    """
+    customer = invoice.rental.customer
+    company = company or get_company_profile()
+    parts = [
+        INVOICE_PDF_LAYOUT_VERSION,
+        company.trade_name,
+        company.address,
+        company.nrc,
+        company.phone,
+        invoice.invoice_number,
+        invoice.status,
+        f"{invoice.total_amount:.2f}",
+        invoice.reference,
+        invoice.issue_date.strftime('%d-%m-%Y'),
+        customer.__str__(),
+        customer.email,
+    ]
+    payload = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class InvoicePDFStore:
+    """
+    Almacén en disco de PDFs de facturas direccionado por contenido.
+
+    Cada archivo se nombra con el hash de los datos de la factura, así que un
+    cambio relevante produce un archivo nuevo y los viejos simplemente dejan de
+    usarse hasta que la limpieza los elimina por tamaño total o antigüedad.
+    La carpeta es privada (fuera de MEDIA_ROOT, que se sirve públicamente).
+    """
+
+    def __init__(self, root=None, max_bytes=None, max_age=None, evict_interval=60):
+        self.root = root or getattr(settings, 'INVOICE_PDF_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'invoice_pdf'))
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(settings, 'INVOICE_PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+        self.max_age = max_age if max_age is not None else getattr(settings, 'INVOICE_PDF_CACHE_MAX_AGE', 30 * 24 * 3600)
+        self.evict_interval = evict_interval
+        self._last_eviction = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.pdf")
+
+    def get_path(self, invoice, company=None):
+        """
+        Devuelve (hash, ruta) del PDF de la factura, renderizándolo solo si no existe.
+        """
+        company = company or get_company_profile()
+        digest = invoice_pdf_fingerprint(invoice, company)
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            try:
+                # La fecha de acceso define qué se elimina primero.
+                os.utime(path, None)
+            except OSError:
+                pass
+        else:
+            self.write(path, generate_invoice_pdf(invoice, company))
+        return digest, path
+
+    def get_bytes(self, invoice, company=None):
+        digest, path = self.get_path(invoice, company)
+        with open(path, 'rb') as pdf_file:
+            return pdf_file.read()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escritura atómica: otro proceso nunca ve un archivo a medias.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.maybe_evict()
+
+    def maybe_evict(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_eviction < self.evict_interval:
+                return
+            self._last_eviction = now
+        self.evict()
+
+    def evict(self):
+        """
+        Elimina los PDFs más antiguos que max_age y, si aún se supera max_bytes,
+        los menos usados recientemente. Devuelve la cantidad de archivos borrados.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+
+        entries = []
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        removed = 0
+        cutoff = time.time() - self.max_age
+        total = sum(size for _, size, _ in entries)
+        for mtime, size, path in sorted(entries):
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+
+invoice_pdf_store = InvoicePDFStore()
@@ -0,0 +1,15 @@
+"""
+Arranque de los procesos del pool de exportación de facturas (invoice/export.py).
+
+Vive aparte porque invoice/export.py importa modelos y no puede cargarse antes
+de `django.setup()`.
+"""
+import django
+from django.conf import settings
+
+
+def setup_render_worker():
+    # El proceso solo renderiza PDFs: no envía correos ni barre alquileres atrasados.
+    settings.MAIL_OUTBOX_AUTOSTART = False
+    settings.RENTAL_OVERDUE_SWEEP_AUTOSTART = False
+    django.setup()
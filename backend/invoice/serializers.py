@@ -1,7 +1,8 @@
 from rest_framework import serializers
-from django.contrib.auth.models import User
 from .models import Invoice
 from payment.models import Payment
+from utilities.audit import AUDIT_FIELD_DEPENDENCIES, AuditUserSerializerMixin, AuditUserListSerializer
+from utilities.sparse_fields import SparseFieldsMixin
 
 class PaymentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,7 +16,7 @@ class PaymentSerializer(serializers.ModelSerializer):
             'reference'
         )
 
-class InvoiceSerializer(serializers.ModelSerializer):
+class InvoiceSerializer(SparseFieldsMixin, AuditUserSerializerMixin, serializers.ModelSerializer):
 
     customer_name = serializers.CharField(source='rental.customer.__str__', read_only=True)
     customer_type = serializers.CharField(source='rental.customer.customer_type', read_only=True)
@@ -28,6 +29,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Invoice
+        list_serializer_class = AuditUserListSerializer
         fields = (
             'id',
             'invoice_number',
@@ -44,18 +46,17 @@ class InvoiceSerializer(serializers.ModelSerializer):
             'modified_by_name',
             'updated_at',
         )
+        projections = {
+            'list': ('id', 'invoice_number', 'rental_id', 'customer_name', 'issue_date', 'total_amount', 'status'),
+            'detail': fields,
+        }
+        field_dependencies = {
+            **AUDIT_FIELD_DEPENDENCIES,
+            'rental_id': ('rental',),
+            'customer_name': ('rental__customer__first_name', 'rental__customer__last_name'),
+        }
 
-    def get_user_name(self, user_id):
-        if user_id is None:
-            return None
-        try:
-            user = User.objects.get(id=user_id)
-            return user.get_full_name() or user.username
-        except (User.DoesNotExist, ValueError):
-            return "Usuario Desconocido"
+    audit_unknown_user = "Usuario Desconocido"
 
-    def get_created_by_name(self, obj):
-        return self.get_user_name(obj.created_by)
-    
-    def get_modified_by_name(self, obj):
-        return self.get_user_name(obj.modified_by)
\ No newline at end of file
+    def format_audit_user(self, user):
+        return user.get_full_name() or user.username
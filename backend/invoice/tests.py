@@ -1,3 +1,189 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import zipfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from customer.models import Customer
+from rental.models import Rental
+from utilities.testing import auth_headers, create_branch, create_customer, create_rental, create_vehicle
+from .models import Invoice
+from .export import ExportProgress, build_merged_invoices_pdf, get_export_queryset, stream_invoices_zip
+from .pdf import InvoicePDFStore, invoice_pdf_fingerprint, invoice_pdf_store
+from .render_worker import setup_render_worker
+
+
+class InvoicePDFStoreTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = InvoicePDFStore(root=self.tmpdir.name, max_bytes=10 * 1024 * 1024, max_age=3600)
+        customer = Customer(first_name="Ana", last_name="Pérez", email="ana@example.com")
+        self.invoice = Invoice(
+            rental=Rental(customer=customer),
+            invoice_number="INV-20250101-ABCD",
+            issue_date=timezone.now(),
+            total_amount=Decimal("150.00"),
+            reference="Pago final",
+            status="Emitida",
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_pdf_is_rendered_once_per_fingerprint(self):
+        with mock.patch('invoice.pdf.generate_invoice_pdf', return_value=b"%PDF-1") as render:
+            first = self.store.get_bytes(self.invoice)
+            second = self.store.get_bytes(self.invoice)
+        self.assertEqual(first, second)
+        self.assertEqual(render.call_count, 1)
+
+        digest = invoice_pdf_fingerprint(self.invoice)
+        self.invoice.status = "Anulada"
+        self.assertNotEqual(invoice_pdf_fingerprint(self.invoice), digest)
+
+    def test_evict_removes_old_and_oversized_entries(self):
+        for number in range(3):
+            self.invoice.invoice_number = f"INV-{number}"
+            self.store.write(self.store.path_for(invoice_pdf_fingerprint(self.invoice)), b"x" * 100)
+
+        paths = sorted(
+            os.path.join(directory, name) for directory, _, names in os.walk(self.tmpdir.name) for name in names
+        )
+        old = timezone.now().timestamp() - 7200
+        os.utime(paths[0], (old, old))
+        self.assertEqual(self.store.evict(), 1)
+
+        self.store.max_bytes = 150
+        self.assertEqual(self.store.evict(), 1)
+
+
+class InvoiceExportTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(invoice_pdf_store, 'root', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Los procesos del pool arrancan con 'spawn' y leen la carpeta desde el entorno.
+        environ = mock.patch.dict(os.environ, {'INVOICE_PDF_CACHE_DIR': self.tmpdir.name})
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        customer = Customer(first_name="Ana", last_name="Pérez", email="ana@example.com")
+        self.invoices = [
+            Invoice(
+                rental=Rental(customer=customer),
+                invoice_number=f"INV-20250101-{number}",
+                issue_date=timezone.now(),
+                total_amount=Decimal("99.50"),
+                reference="Pago final",
+            )
+            for number in range(5)
+        ]
+
+    @override_settings(INVOICE_EXPORT_POOL_MIN_INVOICES=1)
+    def test_zip_is_streamed_in_order_with_process_pool(self):
+        progress = ExportProgress(len(self.invoices))
+        data = b"".join(stream_invoices_zip(iter(self.invoices), progress, workers=2))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [f"Factura-INV-20250101-{n}.pdf" for n in range(5)])
+            self.assertTrue(archive.read(archive.namelist()[0]).startswith(b"%PDF"))
+        self.assertEqual(ExportProgress.get(progress.job_id)["done"], 5)
+        self.assertEqual(ExportProgress.get(progress.job_id)["status"], "Completado")
+
+    def test_small_exports_render_in_process(self):
+        progress = ExportProgress(len(self.invoices))
+        with mock.patch('invoice.export.ProcessPoolExecutor') as pool:
+            data = b"".join(stream_invoices_zip(iter(self.invoices), progress, workers=4))
+        pool.assert_not_called()
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(len(archive.namelist()), 5)
+
+    def test_disconnected_download_marks_the_job_as_failed(self):
+        progress = ExportProgress(len(self.invoices))
+        stream = stream_invoices_zip(iter(self.invoices), progress, workers=1)
+        next(stream)
+        stream.close()
+        self.assertEqual(ExportProgress.get(progress.job_id)["status"], "Error")
+
+    def test_merged_pdf_has_one_page_per_invoice(self):
+        progress = ExportProgress(len(self.invoices))
+        with build_merged_invoices_pdf(iter(self.invoices), progress) as merged:
+            data = merged.read()
+        self.assertTrue(data.startswith(b"%PDF"))
+        self.assertIn(b"/Count 5", data)
+
+    def test_render_workers_start_without_background_threads(self):
+        with override_settings(MAIL_OUTBOX_AUTOSTART=True, RENTAL_OVERDUE_SWEEP_AUTOSTART=True):
+            setup_render_worker()
+            self.assertFalse(settings.MAIL_OUTBOX_AUTOSTART)
+            self.assertFalse(settings.RENTAL_OVERDUE_SWEEP_AUTOSTART)
+
+    def test_render_jobs_receive_the_profile_from_the_parent(self):
+        progress = ExportProgress(len(self.invoices))
+        with mock.patch('invoice.pdf.get_company_profile', side_effect=AssertionError("perfil consultado en la tarea")):
+            data = b"".join(stream_invoices_zip(iter(self.invoices), progress, workers=1))
+            with build_merged_invoices_pdf(iter(self.invoices), ExportProgress(len(self.invoices))) as merged:
+                self.assertTrue(merged.read().startswith(b"%PDF"))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            self.assertEqual(len(archive.namelist()), 5)
+
+
+@override_settings(INVOICE_EXPORT_WORKERS=1)
+class InvoiceExportViewTests(TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(invoice_pdf_store, 'root', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        user = User.objects.create_superuser(username='facturas', password='secreta123')
+        self.headers = auth_headers(user)
+        branch = create_branch()
+        customer = create_customer()
+        start = timezone.now() - timedelta(days=10)
+        for number in range(3):
+            rental = create_rental(
+                create_vehicle(number, branch), customer, branch,
+                start + timedelta(days=number), start + timedelta(days=number, hours=5), status="Finalizado",
+            )
+            Invoice.objects.create(rental=rental, total_amount=Decimal("80.00"), reference="Pago final")
+
+    def test_zip_export_streams_one_pdf_per_invoice(self):
+        response = self.client.get('/api/v1/invoice/export', {"format": "zip"}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        self.assertEqual(response["X-Export-Total"], "3")
+        with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as archive:
+            self.assertEqual(len(archive.namelist()), 3)
+
+        progress = self.client.get(f'/api/v1/invoice/export/{response["X-Export-Job"]}', **self.headers)
+        self.assertEqual(progress.json()["data"]["status"], "Completado")
+
+    def test_pdf_export_merges_the_invoices(self):
+        response = self.client.get('/api/v1/invoice/export', {"format": "pdf"}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn(b"/Count 3", b"".join(response.streaming_content))
+
+    def test_date_filter_is_a_local_half_open_range(self):
+        first, second, third = Invoice.objects.order_by('id')
+        for invoice, moment in ((first, datetime(2025, 7, 10, 23, 59)), (second, datetime(2025, 7, 11)), (third, datetime(2025, 7, 9, 12))):
+            Invoice.objects.filter(pk=invoice.pk).update(issue_date=timezone.make_aware(moment))
+        queryset = get_export_queryset(date_from='2025-07-10', date_to='2025-07-10')
+        self.assertEqual(list(queryset.values_list('id', flat=True)), [first.pk])
+        self.assertNotIn('CAST', str(queryset.query).upper())
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/v1/invoice/export', {"format": "xlsx"}, **self.headers)
+        self.assertEqual(response.status_code, 400)
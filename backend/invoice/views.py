@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from django.db import transaction
 from http import HTTPStatus
 import json
@@ -10,13 +10,17 @@ from payment.models import Payment
 from .serializers import InvoiceSerializer, PaymentSerializer
 from .forms import InvoiceCreateForm, InvoiceStatusUpdateForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.sparse_fields import InvalidFieldSelection
 
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+from django.utils import timezone
+from .pdf import invoice_pdf_store, invoice_pdf_fingerprint
+from .export import EXPORT_FORMATS, ExportProgress, get_export_queryset, stream_invoices_zip, build_merged_invoices_pdf
 
-from utilities.utilities import sendMail
+from mail_outbox.utils import enqueue_mail
+from company.profile import get_company_profile, mail_signature
 
 
 class InvoiceRC(APIView):
@@ -24,8 +28,18 @@ class InvoiceRC(APIView):
     @authenticate_user(required_permission='invoice.view_invoice')
     def get(self, request):
         try:
-            invoices = Invoice.objects.select_related('rental__customer').filter(active=True)
-            serializer = InvoiceSerializer(invoices, many=True)
+            fields = InvoiceSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            invoices = InvoiceSerializer.prepare_queryset(Invoice.objects.filter(active=True), fields, extra=('issue_date',))
+            paginator = KeysetPagination(ordering=('-issue_date', '-id'))
+            response = paginator.respond(request, invoices, lambda page: InvoiceSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = InvoiceSerializer(invoices, many=True, fields=fields)
             return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
         except Exception as e:
             return JsonResponse({"status": "error", "message": f"Ocurrió un error: {str(e)}"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -59,22 +73,22 @@ class InvoiceRC(APIView):
                 try:
                     customer = new_invoice.rental.customer
                     if customer.email:
-                        pdf_data = generate_invoice_pdf(new_invoice)
+                        pdf_data = invoice_pdf_store.get_bytes(new_invoice)
                         pdf_filename = f"Factura-{new_invoice.invoice_number}.pdf"
-                        html_body = f"<p>Hola {customer.__str__()},</p><p>Adjuntamos tu nueva factura N° {new_invoice.invoice_number}.</p>"
+                        html_body = f"<p>Hola {customer.__str__()},</p><p>Adjuntamos tu nueva factura N° {new_invoice.invoice_number}.</p>{mail_signature()}"
                         
-                        sendMail(
+                        enqueue_mail(
                             html_content=html_body,
                             subject=f"Nueva Factura - N° {new_invoice.invoice_number}",
                             recipient_email=customer.email,
                             attachment_data=pdf_data,
                             attachment_filename=pdf_filename
                         )
-                        message += f" La factura ha sido enviada a {customer.email}."
+                        message += f" La factura será enviada a {customer.email}."
                     else:
                         message += " No se pudo enviar el correo (cliente sin email)."
                 except Exception as e:
-                    print(f"Error al enviar correo de creación para factura {new_invoice.id}: {e}")
+                    print(f"Error al encolar correo de creación para factura {new_invoice.id}: {e}")
                     message += " Hubo un error al intentar enviar el correo."
 
             serializer = InvoiceSerializer(new_invoice)
@@ -91,8 +105,13 @@ class InvoiceRU(APIView):
     @authenticate_user(required_permission='invoice.view_invoice')
     def get(self, request, id):
         try:
-            invoice = Invoice.objects.select_related('rental__customer').get(pk=id, active=True)
-            serializer = InvoiceSerializer(invoice)
+            fields = InvoiceSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            invoice = InvoiceSerializer.prepare_queryset(Invoice.objects.all(), fields).get(pk=id, active=True)
+            serializer = InvoiceSerializer(invoice, fields=fields)
             return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
         except Invoice.DoesNotExist:
             return JsonResponse({"status": "error", "message": "Factura no encontrada o inactiva."}, status=HTTPStatus.NOT_FOUND)
@@ -130,15 +149,16 @@ class InvoiceRU(APIView):
                                 <p>Hola {customer.__str__()},</p>
                                 <p>Te informamos que la factura con número <strong>{updated_invoice.invoice_number}</strong> 
                                 emitida el {updated_invoice.issue_date.strftime('%d-%m-%Y')} ha sido <strong>anulada</strong>.</p>
+                                {mail_signature()}
                             """
-                            sendMail(
+                            enqueue_mail(
                                 html_content=html_body,
                                 subject=f"Anulación de Factura N° {updated_invoice.invoice_number}",
                                 recipient_email=customer.email
                             )
                             message += " Se ha notificado la anulación al cliente."
                     except Exception as e:
-                        print(f"Error al enviar correo de anulación para factura {updated_invoice.id}: {e}")
+                        print(f"Error al encolar correo de anulación para factura {updated_invoice.id}: {e}")
                         message += " Hubo un error al notificar la anulación."
                 
                 return JsonResponse({"status": "success", "message": message}, status=HTTPStatus.OK)
@@ -213,65 +233,110 @@ class IssueInvoice(APIView):
             return JsonResponse({"status": "error", "message": "El cliente no tiene un correo electrónico registrado."}, status=HTTPStatus.BAD_REQUEST)
 
         try:
-            pdf_data = generate_invoice_pdf(invoice)
+            pdf_data = invoice_pdf_store.get_bytes(invoice)
             pdf_filename = f"Factura-{invoice.invoice_number}.pdf"
 
-            html_body = f"<p>Hola {customer.__str__()},</p><p>Adjuntamos tu factura N° {invoice.invoice_number}.</p><p>Gracias por tu preferencia.</p>"
+            html_body = f"<p>Hola {customer.__str__()},</p><p>Adjuntamos tu factura N° {invoice.invoice_number}.</p><p>Gracias por tu preferencia.</p>{mail_signature()}"
             
-            sendMail(
+            enqueue_mail(
                 html_content=html_body,
-                subject=f"Factura de Tu Empresa - N° {invoice.invoice_number}",
+                subject=f"Factura de {get_company_profile().trade_name} - N° {invoice.invoice_number}",
                 recipient_email=customer.email,
                 attachment_data=pdf_data,
                 attachment_filename=pdf_filename
             )
 
-            return JsonResponse({"status": "success", "message": f"Factura enviada exitosamente a {customer.email}."}, status=HTTPStatus.OK)
+            return JsonResponse({"status": "success", "message": f"Factura en cola de envío a {customer.email}."}, status=HTTPStatus.OK)
 
         except Exception as e:
             print(f"Error en el proceso de emisión de factura {id}: {e}")
             return JsonResponse({"status": "error", "message": f"No se pudo enviar la factura. Error: {e}"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
 
-def generate_invoice_pdf(invoice):
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
 
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(0.75 * inch, height - 1 * inch, "FACTURA")
-    p.setFont("Helvetica", 10)
-    p.drawString(0.75 * inch, height - 1.25 * inch, "AutoRent León")
-    p.drawString(0.75 * inch, height - 1.40 * inch, "San Miguel Centro")
+class InvoicePDF(APIView):
+
+    @authenticate_user(required_permission='invoice.view_invoice')
+    def get(self, request, id):
+        try:
+            invoice = Invoice.objects.select_related('rental__customer').get(pk=id, active=True)
+        except Invoice.DoesNotExist:
+            return JsonResponse({"status": "error", "message": "Factura no encontrada."}, status=HTTPStatus.NOT_FOUND)
 
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(4.5 * inch, height - 1 * inch, f"Factura N°: {invoice.invoice_number}")
-    p.setFont("Helvetica", 10)
-    p.drawString(4.5 * inch, height - 1.25 * inch, f"Fecha de Emisión: {invoice.issue_date.strftime('%d-%m-%Y')}")
+        # El ETag es el mismo hash que direcciona el PDF en disco, así que un 304
+        # se responde sin renderizar ni leer el archivo.
+        etag = f'"{invoice_pdf_fingerprint(invoice)}"'
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
 
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(0.75 * inch, height - 2.2 * inch, "Facturar a:")
-    p.setFont("Helvetica", 10)
-    p.drawString(0.75 * inch, height - 2.4 * inch, f"Cliente: {invoice.rental.customer.__str__()}")
-    p.drawString(0.75 * inch, height - 2.55 * inch, f"Email: {invoice.rental.customer.email}")
+        try:
+            digest, path = invoice_pdf_store.get_path(invoice)
+            response = FileResponse(
+                open(path, 'rb'),
+                content_type='application/pdf',
+                filename=f"Factura-{invoice.invoice_number}.pdf",
+            )
+        except Exception as e:
+            print(f"Error al generar el PDF de la factura {id}: {e}")
+            return JsonResponse({"status": "error", "message": f"No se pudo generar el PDF. Error: {e}"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
-    p.line(0.75 * inch, height - 3 * inch, width - 0.75 * inch, height - 3 * inch)
+        response['ETag'] = f'"{digest}"'
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(0.75 * inch, height - 3.3 * inch, "Descripción")
-    
-    p.setFont("Helvetica", 10)
-    text_object = p.beginText(0.75 * inch, height - 3.5 * inch)
-    for line in invoice.reference.split('\n'):
-        text_object.textLine(line)
-    p.drawText(text_object)
-
-    p.setFont("Helvetica-Bold", 14)
-    total_text = f"TOTAL: ${invoice.total_amount:,.2f}"
-    p.drawRightString(width - 0.75 * inch, 1.5 * inch, total_text)
-
-    p.showPage()
-    p.save()
-    
-    buffer.seek(0)
-    return buffer.getvalue()
\ No newline at end of file
+
+class InvoiceExport(APIView):
+
+    @authenticate_user(required_permission='invoice.view_invoice')
+    def get(self, request):
+        export_format = request.GET.get('format', 'zip')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({"status": "error", "message": "El formato debe ser 'zip' o 'pdf'."}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            invoices = get_export_queryset(
+                date_from=request.GET.get('date_from'),
+                date_to=request.GET.get('date_to'),
+                status=request.GET.get('status'),
+            )
+        except ValueError as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        total = invoices.count()
+        if not total:
+            return JsonResponse({"status": "error", "message": "No se encontraron facturas con los filtros indicados."}, status=HTTPStatus.NOT_FOUND)
+
+        progress = ExportProgress(total)
+        filename = f"Facturas-{timezone.localdate().strftime('%Y%m%d')}"
+
+        if export_format == 'zip':
+            response = StreamingHttpResponse(
+                stream_invoices_zip(invoices.iterator(chunk_size=200), progress),
+                content_type='application/zip',
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+        else:
+            try:
+                merged = build_merged_invoices_pdf(invoices.iterator(chunk_size=200), progress)
+            except Exception as e:
+                print(f"Error al generar el PDF combinado de facturas: {e}")
+                return JsonResponse({"status": "error", "message": f"No se pudo generar el PDF. Error: {e}"}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+            response = FileResponse(merged, content_type='application/pdf', as_attachment=True, filename=f"{filename}.pdf")
+
+        # El cliente puede consultar el avance en invoice/export/<job_id>.
+        response['X-Export-Job'] = progress.job_id
+        response['X-Export-Total'] = str(total)
+        return response
+
+
+class InvoiceExportProgress(APIView):
+
+    @authenticate_user(required_permission='invoice.view_invoice')
+    def get(self, request, job_id):
+        progress = ExportProgress.get(job_id)
+        if progress is None:
+            return JsonResponse({"status": "error", "message": "Exportación no encontrada o expirada."}, status=HTTPStatus.NOT_FOUND)
+        return JsonResponse({"data": progress}, status=HTTPStatus.OK)
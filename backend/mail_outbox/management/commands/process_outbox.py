@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from mail_outbox.smtp import SMTPConnectionPool
+from mail_outbox.worker import outbox_setting, process_outbox
+
+
+class Command(BaseCommand):
+    help = "Envía los correos pendientes del outbox (usar --once para un solo ciclo, p. ej. desde cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Procesa lo pendiente y termina.")
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or outbox_setting('WORKERS', 4)
+        pool = SMTPConnectionPool(maxsize=workers)
+        poll_interval = outbox_setting('POLL_INTERVAL', 30)
+
+        try:
+            while True:
+                processed, sent = process_outbox(pool, workers=workers, batch_size=options['batch_size'])
+                if processed:
+                    self.stdout.write(f"Procesados: {processed}, enviados: {sent}")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(poll_interval)
+        finally:
+            pool.close_all()
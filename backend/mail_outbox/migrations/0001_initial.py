@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 12:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254, verbose_name='destinatario')),
+                ('subject', models.CharField(max_length=255, verbose_name='asunto')),
+                ('html_content', models.TextField(verbose_name='contenido HTML')),
+                ('attachment_data', models.BinaryField(blank=True, null=True, verbose_name='adjunto')),
+                ('attachment_filename', models.CharField(blank=True, max_length=255, null=True, verbose_name='nombre del adjunto')),
+                ('status', models.CharField(choices=[('Pendiente', 'Pendiente'), ('Enviando', 'Enviando'), ('Enviado', 'Enviado'), ('Fallido', 'Fallido')], default='Pendiente', max_length=10, verbose_name='estado')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='intentos')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='próximo intento')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='tomado por el worker')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='fecha de creación')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='fecha de envío')),
+            ],
+            options={
+                'verbose_name': 'Correo saliente',
+                'verbose_name_plural': 'Correos salientes',
+                'db_table': 'mail_outbox',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='mail_outbox_status_next_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('Pendiente', 'Pendiente'),
+        ('Enviando', 'Enviando'),
+        ('Enviado', 'Enviado'),
+        ('Fallido', 'Fallido'),
+    ]
+
+    recipient = models.EmailField(max_length=254, verbose_name="destinatario")
+    subject = models.CharField(max_length=255, verbose_name="asunto")
+    html_content = models.TextField(verbose_name="contenido HTML")
+    attachment_data = models.BinaryField(null=True, blank=True, verbose_name="adjunto")
+    attachment_filename = models.CharField(max_length=255, null=True, blank=True, verbose_name="nombre del adjunto")
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pendiente', verbose_name="estado")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="intentos")
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name="próximo intento")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="tomado por el worker")
+    last_error = models.TextField(null=True, blank=True, verbose_name="último error")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="fecha de creación")
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name="fecha de envío")
+
+    class Meta:
+        db_table = 'mail_outbox'
+        verbose_name = 'Correo saliente'
+        verbose_name_plural = 'Correos salientes'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='mail_outbox_status_next_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
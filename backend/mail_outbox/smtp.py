@@ -0,0 +1,79 @@
+import smtplib
+import threading
+import time
+
+from utilities.utilities import get_smtp_settings, open_smtp_connection
+
+
+class SMTPConnectionPool:
+    """
+    Pool de conexiones SMTP ya autenticadas.
+
+    Evita abrir una conexión TLS y hacer login por cada correo: las conexiones
+    se devuelven al pool después de usarse y se revisan con NOOP si estuvieron
+    inactivas. Se descartan al superar `max_messages` envíos, ya que muchos
+    servidores cortan la sesión pasado cierto número de mensajes.
+    """
+
+    def __init__(self, maxsize=4, max_messages=100, idle_check_seconds=30, config=None, timeout=10):
+        self.maxsize = maxsize
+        self.max_messages = max_messages
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self._config = config
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = get_smtp_settings()
+        return self._config
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return {"connection": open_smtp_connection(self.config, timeout=self.timeout), "sent": 0, "released_at": time.monotonic()}
+            if time.monotonic() - entry["released_at"] < self.idle_check_seconds or self._is_alive(entry["connection"]):
+                return entry
+            self._close(entry["connection"])
+
+    def release(self, entry, broken=False):
+        if broken or entry["sent"] >= self.max_messages:
+            self._close(entry["connection"])
+            return
+        entry["released_at"] = time.monotonic()
+        with self._lock:
+            if len(self._idle) < self.maxsize:
+                self._idle.append(entry)
+                return
+        self._close(entry["connection"])
+
+    def send(self, entry, recipient, message):
+        entry["connection"].sendmail(self.config["sender"], recipient, message.as_string())
+        entry["sent"] += 1
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close(entry["connection"])
+
+    @staticmethod
+    def _is_alive(connection):
+        try:
+            return connection.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                connection.close()
+            except Exception:
+                pass
@@ -0,0 +1,113 @@
+import socketserver
+import threading
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .smtp import SMTPConnectionPool
+from .utils import enqueue_mail
+from .worker import claim_batch, dispatcher, process_outbox
+
+
+class DebugSMTPHandler(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo de pruebas (equivalente a un aiosmtpd local)."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 debug-smtp")
+        recipient = None
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(" ")[0].upper()
+            if command == "EHLO":
+                self.reply("250-debug-smtp")
+                self.reply("250 OK")
+            elif command == "RCPT":
+                recipient = line.split(":", 1)[1].strip("<> ")
+                self.reply("550 Buzón inexistente" if recipient.startswith("rechazado") else "250 OK")
+            elif command == "DATA":
+                self.reply("354 Fin con <CRLF>.<CRLF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.messages.append(recipient)
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@override_settings(MAIL_OUTBOX_AUTOSTART=False, MAIL_OUTBOX_BACKOFF_SECONDS=30)
+class MailOutboxTests(TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), DebugSMTPHandler)
+        self.server.daemon_threads = True
+        self.server.connections = 0
+        self.server.messages = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        config = {
+            "host": "127.0.0.1", "port": self.server.server_address[1], "user": None,
+            "password": None, "sender": "autorent@example.com", "use_tls": False,
+        }
+        self.pool = SMTPConnectionPool(maxsize=2, config=config)
+
+    def tearDown(self):
+        self.pool.close_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batch_reuses_pooled_connections(self):
+        for i in range(6):
+            enqueue_mail("<p>Hola</p>", f"Correo {i}", f"cliente{i}@example.com", b"%PDF-1.4", "Factura.pdf")
+
+        self.assertEqual(process_outbox(self.pool, workers=2, batch_size=10), (6, 6))
+        self.assertEqual(len(self.server.messages), 6)
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(OutboundEmail.objects.filter(status='Enviado').count(), 6)
+
+        enqueue_mail("<p>Hola</p>", "Otro", "cliente7@example.com")
+        process_outbox(self.pool, workers=1, batch_size=10)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_failed_delivery_is_rescheduled_with_backoff(self):
+        email = enqueue_mail("<p>Hola</p>", "Rechazo", "rechazado@example.com")
+
+        self.assertEqual(process_outbox(self.pool, workers=1), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'Pendiente')
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", email.last_error)
+        self.assertGreater(email.next_attempt_at, email.created_at)
+        # El reintento aún no vence, así que el siguiente ciclo no lo toma.
+        self.assertEqual(process_outbox(self.pool, workers=1), (0, 0))
+
+    @override_settings(MAIL_OUTBOX_MAX_ATTEMPTS=3, MAIL_OUTBOX_LEASE_SECONDS=300)
+    def test_reclaiming_an_expired_lease_counts_as_an_attempt(self):
+        expired = timezone.now() - timedelta(seconds=301)
+        retried = enqueue_mail("<p>Hola</p>", "Colgado", "cliente1@example.com")
+        poison = enqueue_mail("<p>Hola</p>", "Tumba al worker", "cliente2@example.com")
+        OutboundEmail.objects.filter(id=retried.id).update(status='Enviando', locked_at=expired, attempts=1)
+        OutboundEmail.objects.filter(id=poison.id).update(status='Enviando', locked_at=expired, attempts=2)
+
+        self.assertEqual([email.id for email in claim_batch(10)], [retried.id])
+        retried.refresh_from_db()
+        poison.refresh_from_db()
+        self.assertEqual((retried.status, retried.attempts), ('Enviando', 2))
+        self.assertEqual((poison.status, poison.attempts), ('Fallido', 3))
+
+    def test_only_the_web_entry_point_starts_the_dispatcher(self):
+        # Ni cargar las apps ni encolar arrancan el hilo: lo hace start_dispatcher desde wsgi/asgi.
+        self.assertIsNone(dispatcher._thread)
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_mail("<p>Hola</p>", "Sin hilo", "cliente1@example.com")
+        self.assertIsNone(dispatcher._thread)
+        self.assertNotIn('mail-outbox', [thread.name for thread in threading.enumerate()])
@@ -0,0 +1,23 @@
+from django.db import transaction
+
+from .models import OutboundEmail
+
+
+def enqueue_mail(html_content: str, subject: str, recipient_email: str, attachment_data=None, attachment_filename=None):
+    """
+    Encola un correo para envío en segundo plano y regresa de inmediato.
+
+    Si se llama dentro de una transacción, el correo solo se envía cuando esta
+    se confirma (y se descarta si se revierte).
+    """
+    email = OutboundEmail.objects.create(
+        recipient=recipient_email,
+        subject=subject,
+        html_content=html_content,
+        attachment_data=attachment_data,
+        attachment_filename=attachment_filename,
+    )
+
+    from .worker import dispatcher
+    transaction.on_commit(dispatcher.notify)
+    return email
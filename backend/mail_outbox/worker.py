@@ -0,0 +1,198 @@
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from utilities.utilities import build_mail_message
+from .models import OutboundEmail
+from .smtp import SMTPConnectionPool
+
+
+def outbox_setting(name, default):
+    return getattr(settings, f"MAIL_OUTBOX_{name}", default)
+
+
+def claim_batch(batch_size):
+    """
+    Toma un lote de correos pendientes (o abandonados por un worker caído) y
+    los marca como 'Enviando' para que ningún otro proceso los envíe.
+
+    Recuperar un correo abandonado cuenta como intento: si el correo es lo
+    que tumba al worker, termina como 'Fallido' en lugar de reintentarse
+    sin fin.
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=outbox_setting('LEASE_SECONDS', 300))
+    max_attempts = outbox_setting('MAX_ATTEMPTS', 5)
+
+    with transaction.atomic():
+        queryset = OutboundEmail.objects.filter(next_attempt_at__lte=now, status='Pendiente') | \
+            OutboundEmail.objects.filter(status='Enviando', locked_at__lt=stale_before)
+        queryset = queryset.order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        else:
+            queryset = queryset.select_for_update()
+
+        emails = list(queryset[:batch_size])
+        abandoned = [email for email in emails if email.status == 'Enviando']
+        if abandoned:
+            OutboundEmail.objects.filter(id__in=[email.id for email in abandoned]).update(attempts=F('attempts') + 1)
+            for email in abandoned:
+                email.attempts += 1
+            exhausted = {email.id for email in abandoned if email.attempts >= max_attempts}
+            if exhausted:
+                OutboundEmail.objects.filter(id__in=exhausted).update(
+                    status='Fallido', locked_at=None,
+                    last_error="El envío se interrumpió sin registrar resultado demasiadas veces.",
+                )
+                emails = [email for email in emails if email.id not in exhausted]
+        if emails:
+            OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(status='Enviando', locked_at=now)
+    return emails
+
+
+def send_chunk(pool, emails):
+    """
+    Envía un grupo de correos reutilizando una conexión del pool. No toca la
+    base de datos: devuelve (correo, error) para que el hilo principal guarde
+    los resultados.
+    """
+    results = []
+    entry = None
+    for email in emails:
+        try:
+            if entry is None:
+                entry = pool.acquire()
+            message = build_mail_message(
+                email.html_content, email.subject, pool.config["sender"], email.recipient,
+                bytes(email.attachment_data) if email.attachment_data else None, email.attachment_filename
+            )
+            pool.send(entry, email.recipient, message)
+            results.append((email, None))
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+            # La conexión quedó inservible: se descarta y el siguiente correo abre otra.
+            if entry is not None:
+                pool.release(entry, broken=True)
+                entry = None
+            results.append((email, f"{type(e).__name__}: {e}"))
+        except Exception as e:
+            results.append((email, f"{type(e).__name__}: {e}"))
+    if entry is not None:
+        pool.release(entry)
+    return results
+
+
+def record_results(results):
+    now = timezone.now()
+    max_attempts = outbox_setting('MAX_ATTEMPTS', 5)
+    base_backoff = outbox_setting('BACKOFF_SECONDS', 30)
+    max_backoff = outbox_setting('MAX_BACKOFF_SECONDS', 3600)
+
+    sent_ids = [email.id for email, error in results if error is None]
+    if sent_ids:
+        OutboundEmail.objects.filter(id__in=sent_ids).update(status='Enviado', sent_at=now, locked_at=None, last_error=None)
+
+    for email, error in results:
+        if error is None:
+            continue
+        attempts = email.attempts + 1
+        delay = min(base_backoff * (2 ** (attempts - 1)), max_backoff)
+        OutboundEmail.objects.filter(id=email.id).update(
+            status='Fallido' if attempts >= max_attempts else 'Pendiente',
+            attempts=attempts,
+            next_attempt_at=now + timedelta(seconds=delay),
+            locked_at=None,
+            last_error=error[:2000],
+        )
+    return len(sent_ids)
+
+
+def process_outbox(pool, workers=None, batch_size=None):
+    """
+    Procesa un lote del outbox. Devuelve (procesados, enviados).
+    """
+    workers = workers or outbox_setting('WORKERS', 4)
+    batch_size = batch_size or outbox_setting('BATCH_SIZE', 20)
+
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    chunks = [emails[i::workers] for i in range(workers) if emails[i::workers]]
+    if len(chunks) == 1:
+        results = send_chunk(pool, chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            results = [result for chunk_results in executor.map(lambda chunk: send_chunk(pool, chunk), chunks) for result in chunk_results]
+
+    return len(emails), record_results(results)
+
+
+class OutboxDispatcher:
+    """
+    Hilo en segundo plano que vacía el outbox. Se despierta con `wake()` (al
+    confirmar la transacción que encoló un correo) o cada POLL_INTERVAL segundos
+    para atender los reintentos programados.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.pool = None
+
+    def wake(self):
+        self._ensure_started()
+        self._event.set()
+
+    def notify(self):
+        """
+        Despierta el hilo solo si este proceso lo arrancó (start_dispatcher);
+        en otros procesos el correo queda para process_outbox o el hilo de un
+        worker web.
+        """
+        if self._thread is not None:
+            self.wake()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            workers = outbox_setting('WORKERS', 4)
+            self.pool = SMTPConnectionPool(maxsize=workers)
+            self._thread = threading.Thread(target=self._run, name='mail-outbox', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        poll_interval = outbox_setting('POLL_INTERVAL', 30)
+        while True:
+            self._event.wait(timeout=poll_interval)
+            self._event.clear()
+            try:
+                close_old_connections()
+                while process_outbox(self.pool)[0]:
+                    pass
+            except Exception as e:
+                print(f"Error al procesar el outbox de correos: {e}")
+            finally:
+                close_old_connections()
+
+
+dispatcher = OutboxDispatcher()
+
+
+def start_dispatcher():
+    """
+    Arranca el hilo de envío si MAIL_OUTBOX_AUTOSTART está activo. Se llama
+    desde backend/wsgi.py y backend/asgi.py: al reiniciar quedan correos
+    pendientes o en espera de reintento, y solo los procesos que atienden
+    solicitudes deben enviarlos (no los comandos ni los procesos auxiliares).
+    """
+    if outbox_setting('AUTOSTART', True):
+        dispatcher.wake()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MunicipalityConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'municipality'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import Municipality
+
+        connect_catalog(Municipality)
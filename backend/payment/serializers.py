@@ -5,9 +5,11 @@ from rental.models import Rental
 from django.utils import timezone
 import decimal
 from django.db.models import Sum 
-from django.contrib.auth.models import User # Necesitamos importar User para created_by_name y modified_by_name
+from utilities.audit import AUDIT_FIELD_DEPENDENCIES, AuditUserSerializerMixin, AuditUserListSerializer
+from utilities.sparse_fields import SparseFieldsMixin
+from rental import pricing
 
-class PaymentSerializer(serializers.ModelSerializer):
+class PaymentSerializer(SparseFieldsMixin, AuditUserSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Payment.
     """
@@ -29,6 +31,7 @@ class PaymentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Payment
+        list_serializer_class = AuditUserListSerializer
         fields = [
             'id',
             'rental',
@@ -45,6 +48,11 @@ class PaymentSerializer(serializers.ModelSerializer):
             'modified_by_name', # Incluir el nombre del modificador
             'updated_at',
         ]
+        projections = {
+            'list': ['id', 'rental', 'amount', 'payment_type', 'payment_date', 'concept'],
+            'detail': fields,
+        }
+        field_dependencies = AUDIT_FIELD_DEPENDENCIES
         # --- ¡CAMBIO CLAVE AQUÍ! ---
         # Hacemos que 'rental' no sea requerido cuando se usa en un contexto de creación anidada
         # (ya que el RentalSerializer lo asigna después), pero permitimos que se envíe si es necesario.
@@ -56,25 +64,9 @@ class PaymentSerializer(serializers.ModelSerializer):
         # Pero los dejaremos para no romper algo si tienes lógica específica con ellos.
         read_only_fields = ['id', 'payment_date', 'created_at', 'updated_at', 'created_by', 'modified_by'] 
 
-    # Método para obtener el nombre del usuario que creó el pago
-    def get_created_by_name(self, obj):
-        if obj.created_by is None:
-            return None
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name if user.first_name else user.username # O el campo que uses para el nombre
-        except (User.DoesNotExist, ValueError):
-            return None
-
-    # Método para obtener el nombre del usuario que modificó el pago
-    def get_modified_by_name(self, obj):
-        if obj.modified_by is None:
-            return None
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name if user.first_name else user.username # O el campo que uses para el nombre
-        except (User.DoesNotExist, ValueError):
-            return None
+    # Nombre mostrado para los usuarios de auditoría
+    def format_audit_user(self, user):
+        return user.first_name if user.first_name else user.username
 
     def create(self, validated_data):
         request = self.context.get('request')
@@ -136,16 +128,8 @@ class PaymentSerializer(serializers.ModelSerializer):
 
                 total_rental_price = rental.total_price
                 
-                duration_total_seconds = (rental.end_date - rental.start_date).total_seconds()
-                duration_days = int(duration_total_seconds / (24 * 3600))
-                if duration_total_seconds % (24 * 3600) > 0 or duration_days == 0:
-                    duration_days += 1
-
-                required_initial_payment_percentage = decimal.Decimal('0.50')
-                if duration_days > 5:
-                    required_initial_payment_percentage = decimal.Decimal('1.00')
-
-                expected_anticipo = total_rental_price * required_initial_payment_percentage
+                duration_days = pricing.rental_days(rental.start_date, rental.end_date)
+                _, expected_anticipo, _ = pricing.initial_terms(total_rental_price, duration_days, rental.customer.customer_type)
                 
                 paid_anticipo_so_far = Payment.objects.filter(
                     rental=rental,
@@ -160,8 +144,8 @@ class PaymentSerializer(serializers.ModelSerializer):
                         {"amount": f"El monto del anticipo (${amount:.2f}) excede el monto restante requerido (${remaining_anticipo:.2f})."}
                     )
             
-            if rental.customer.customer_type == 'extranjero' and concept == 'Deposito':
-                expected_deposit = decimal.Decimal('100.00')
+            if pricing.is_foreign(rental.customer.customer_type) and concept == 'Deposito':
+                expected_deposit = pricing.FOREIGN_DEPOSIT
                 paid_deposit_so_far = Payment.objects.filter(
                     rental=rental,
                     concept='Deposito', 
@@ -177,7 +161,7 @@ class PaymentSerializer(serializers.ModelSerializer):
                 elif amount < expected_deposit and remaining_deposit > 0:
                     pass 
 
-            elif rental.customer.customer_type != 'extranjero' and concept == 'Deposito':
+            elif not pricing.is_foreign(rental.customer.customer_type) and concept == 'Deposito':
                 raise serializers.ValidationError({"concept": "No se requiere depósito para clientes nacionales."})
 
         return data
\ No newline at end of file
@@ -1,3 +1,41 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import Permission, User
 from django.test import TestCase
+from django.utils import timezone
+
+from payment.models import Payment
+from utilities.testing import auth_headers, create_branch, create_customer, create_rental, create_vehicle
+
+
+class PaymentCreateTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='caja', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='add_payment'))
+        self.headers = auth_headers(user)
+        branch = create_branch()
+        start = timezone.now() + timedelta(days=1)
+        # Dos días a 40.00: el anticipo exigido es la mitad del total.
+        self.rental = create_rental(create_vehicle(1, branch), create_customer(), branch, start, start + timedelta(days=2))
+
+    def post_payment(self, amount, concept="Anticipo"):
+        return self.client.post('/api/v1/payment/', {
+            "rental": self.rental.id, "amount": amount, "payment_type": "Efectivo", "concept": concept,
+        }, content_type='application/json', **self.headers)
+
+    def test_anticipo_cannot_exceed_what_is_still_required(self):
+        response = self.post_payment("50.00")
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertFalse(Payment.objects.filter(rental=self.rental).exists())
+
+        self.assertEqual(self.post_payment("25.00").status_code, 201)
+        response = self.post_payment("20.00")
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn("15.00", response.content.decode())
 
-# Create your tests here.
+    def test_covering_the_anticipo_activates_the_rental(self):
+        response = self.post_payment("40.00")
+        self.assertEqual(response.status_code, 201, response.content)
+        self.rental.refresh_from_db()
+        self.assertEqual(self.rental.status, "Activo")
@@ -1,6 +1,6 @@
 # payment/views.py
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse, StreamingJsonResponse
 from http import HTTPStatus
 import decimal
 from django.db import transaction
@@ -13,12 +13,16 @@ from customer.models import Customer # Necesario para tipo de cliente en validac
 
 # Importa tus serializadores
 from payment.serializers import PaymentSerializer
+from rental import pricing
 
 # Importa tus decoradores y permisos personalizados
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.sparse_fields import InvalidFieldSelection
 
 # Otras importaciones necesarias
 from django.utils import timezone
+from django.conf import settings
 
 # --- Vista para Listar y Crear Pagos ---
 class PaymentRC(APIView):
@@ -30,6 +34,11 @@ class PaymentRC(APIView):
         """
         Maneja las solicitudes GET para devolver una lista de todos los pagos activos.
         """
+        try:
+            fields = PaymentSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
         try:
             # Puedes filtrar pagos por rental_id si lo pasas como parámetro de query
             rental_id = request.query_params.get('rental_id')
@@ -37,8 +46,18 @@ class PaymentRC(APIView):
                 payments = Payment.objects.filter(rental_id=rental_id, active=True).order_by('-payment_date')
             else:
                 payments = Payment.objects.filter(active=True).order_by('-payment_date')
+            payments = PaymentSerializer.prepare_queryset(payments, fields, extra=('payment_date',))
             
-            serializer = PaymentSerializer(payments, many=True)
+            paginator = KeysetPagination(ordering=('-payment_date', '-id'))
+            if request.query_params.get('stream') == '1':
+                # Listado completo por bloques (exportaciones, sincronización sin conexión).
+                chunks = paginator.iterate_chunks(payments, getattr(settings, 'API_STREAM_CHUNK_SIZE', 500))
+                return StreamingJsonResponse(chunks, lambda rows: PaymentSerializer(rows, many=True, fields=fields).data)
+            response = paginator.respond(request, payments, lambda page: PaymentSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = PaymentSerializer(payments, many=True, fields=fields)
             return JsonResponse({
                 "data": serializer.data
             }, status=HTTPStatus.OK)
@@ -75,19 +94,11 @@ class PaymentRC(APIView):
                 # Esto es útil si necesitas acceso a más contexto o múltiples pagos
                 total_rental_price = rental.total_price
 
-                # Calcular duración en días (Duplicado de lógica para seguridad, podrías refactorizar)
-                duration_total_seconds = (rental.end_date - rental.start_date).total_seconds()
-                duration_days = int(duration_total_seconds / (24 * 3600))
-                if duration_total_seconds % (24 * 3600) > 0 or duration_days == 0:
-                    duration_days += 1
-
-                # Porcentaje de pago inicial requerido
-                required_initial_payment_percentage = decimal.Decimal('0.50')
-                if duration_days > 5:
-                    required_initial_payment_percentage = decimal.Decimal('1.00')
-                
-                expected_anticipo = total_rental_price * required_initial_payment_percentage
-                expected_deposit = decimal.Decimal('100.00') if rental.customer.customer_type == 'extranjero' else decimal.Decimal('0.00')
+                duration_days = pricing.rental_days(rental.start_date, rental.end_date)
+                _, expected_anticipo, expected_deposit = pricing.initial_terms(
+                    total_rental_price, duration_days, rental.customer.customer_type
+                )
+                is_foreign_customer = pricing.is_foreign(rental.customer.customer_type)
 
                 # Montos ya pagados de anticipo y depósito para esta renta
                 paid_anticipo_so_far = Payment.objects.filter(
@@ -110,7 +121,7 @@ class PaymentRC(APIView):
                             status=HTTPStatus.BAD_REQUEST
                         )
                 elif concept == 'Deposito':
-                    if rental.customer.customer_type != 'extranjero':
+                    if not is_foreign_customer:
                         return JsonResponse(
                             {"detail": "No se requiere depósito para clientes nacionales."},
                             status=HTTPStatus.BAD_REQUEST
@@ -169,8 +180,13 @@ class PaymentRetrieveUpdateDestroy(APIView):
     @authenticate_user(required_permission='payment.view_payment')
     def get(self, request, pk):
         try:
-            payment = Payment.objects.get(pk=pk, active=True)
-            serializer = PaymentSerializer(payment)
+            fields = PaymentSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            payment = PaymentSerializer.prepare_queryset(Payment.objects.all(), fields).get(pk=pk, active=True)
+            serializer = PaymentSerializer(payment, fields=fields)
             return JsonResponse(serializer.data, status=HTTPStatus.OK)
         except Payment.DoesNotExist:
             return JsonResponse({"detail": "Pago no encontrado."}, status=HTTPStatus.NOT_FOUND)
@@ -1,3 +1,8 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import RentalOverdueSummary
+
+
+@admin.register(RentalOverdueSummary)
+class RentalOverdueSummaryAdmin(admin.ModelAdmin):
+    list_display = ('overdue_rentals', 'overdue_customers', 'total_overdue_charge', 'max_days_overdue', 'computed_at')
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class RentalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rental'
+
+    def ready(self):
+        from rental import signals  # noqa: F401
+
+        if getattr(settings, 'RENTAL_OVERDUE_SWEEP_AUTOSTART', False):
+            from rental.overdue import sweeper
+            sweeper.start()
@@ -0,0 +1,191 @@
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from rental.models import Rental, VehicleOccupancy
+from vehicle.models import Vehicle
+
+# Estados de alquiler que ocupan el vehículo. 'Retrasado' también bloquea:
+# el vehículo sigue en manos del cliente.
+BLOCKING_STATUSES = ('Activo', 'Reservado', 'Retrasado')
+
+# Alquileres aún en manos del cliente: si ya vencieron, siguen ocupando el vehículo.
+OPEN_STATUSES = ('Activo', 'Retrasado')
+
+# Estados del vehículo que lo sacan de circulación sin importar las fechas.
+UNAVAILABLE_VEHICLE_STATUSES = ('En mantenimiento', 'En reparacion')
+
+UNAVAILABLE_MESSAGE = "El vehículo no está disponible para las fechas seleccionadas debido a un alquiler existente."
+
+
+def effective_end(end_date, actual_return_date, status, now):
+    """
+    Fin real de un alquiler: la devolución si existe; si no, la fecha pactada,
+    extendida hasta `now` si el alquiler sigue abierto y ya venció.
+    """
+    if actual_return_date is not None:
+        return actual_return_date
+    if status in OPEN_STATUSES:
+        return max(end_date, now)
+    return end_date
+
+
+def may_end_after(moment):
+    """
+    Filtro de los alquileres cuyo `effective_end` puede ser posterior a
+    `moment`. Incluye todos los abiertos sin devolución: su fin depende de `now`.
+    """
+    return (
+        Q(actual_return_date__gt=moment)
+        | Q(actual_return_date__isnull=True, end_date__gt=moment)
+        | Q(actual_return_date__isnull=True, status__in=OPEN_STATUSES)
+    )
+
+
+def occupied_span(start, end):
+    """
+    Primer y último día (en la zona del proyecto) que toma un alquiler en
+    `vehicle_occupancy`: desde el día de inicio hasta el anterior a la
+    devolución, mínimo uno.
+    """
+    first = timezone.localdate(start)
+    return first, max(first, timezone.localdate(end) - timedelta(days=1))
+
+
+def occupied_days(start, end):
+    first, last = occupied_span(start, end)
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def intervals_conflict(start, end, other_start, other_end):
+    """
+    Regla de choque entre dos alquileres, la misma de `occupancy_conflicts`:
+    comparten un día del calendario (lo que rechaza la llave única
+    `vehicle_occupancy_day_uniq`) o sus horas se traslapan el día de
+    devolución, que el calendario deja libre.
+    """
+    if other_start < end and other_end > start:
+        return True
+    first, last = occupied_span(start, end)
+    other_first, other_last = occupied_span(other_start, other_end)
+    return first <= other_last and other_first <= last
+
+
+def lookup_days(start, end):
+    """
+    Rango de días a consultar para [start, end). Todo alquiler que se traslape
+    con el intervalo ocupa al menos un día de este rango (el día previo cubre
+    al que se devuelve el mismo día en que este inicia).
+    """
+    return timezone.localdate(start) - timedelta(days=1), timezone.localdate(end)
+
+
+def overlapping_rentals(start, end, vehicle=None, exclude_id=None):
+    """
+    Alquileres vigentes que se traslapan con el intervalo semiabierto
+    [start, end). Un alquiler que termina justo cuando empieza otro no choca.
+
+    Consulta directa sobre `rental`; las validaciones usan `occupancy_conflicts`,
+    que no crece con el historial.
+    """
+    queryset = Rental.objects.filter(
+        active=True,
+        status__in=BLOCKING_STATUSES,
+        start_date__lt=end,
+        end_date__gt=start,
+    )
+    if vehicle is not None:
+        queryset = queryset.filter(vehicle=vehicle)
+    if exclude_id is not None:
+        queryset = queryset.exclude(id=exclude_id)
+    return queryset
+
+
+def occupancy_conflicts(start, end, vehicle=None, exclude_id=None):
+    """
+    Filas de ocupación de los alquileres que chocan con [start, end) según
+    `intervals_conflict`. Es una búsqueda acotada por la llave única
+    (vehicle, day) sobre pocos días; el alquiler se une por llave primaria
+    solo para la comparación exacta de horas en el día de devolución.
+
+    Un alquiler de 09:00 a 11:00 toma el día completo: otro que empiece ese
+    mismo día a las 14:00 choca, igual que en la llave única.
+    """
+    queryset = VehicleOccupancy.objects.filter(day__range=lookup_days(start, end)).filter(
+        Q(day__range=occupied_span(start, end))
+        | Q(rental__start_date__lt=end, rental__end_date__gt=start)
+    )
+    if vehicle is not None:
+        queryset = queryset.filter(vehicle=vehicle)
+    if exclude_id is not None:
+        queryset = queryset.exclude(rental_id=exclude_id)
+    return queryset
+
+
+def is_vehicle_available(vehicle, start, end, exclude_id=None):
+    return not occupancy_conflicts(start, end, vehicle=vehicle, exclude_id=exclude_id).exists()
+
+
+def available_vehicles(start, end, category=None, branch=None):
+    """
+    Vehículos activos y en circulación sin ningún alquiler que se traslape con
+    [start, end). Es un único anti-join (NOT EXISTS correlacionado) contra el
+    calendario de ocupación.
+    """
+    busy = occupancy_conflicts(start, end).filter(vehicle=OuterRef('pk'))
+    queryset = Vehicle.objects.filter(active=True).exclude(status__in=UNAVAILABLE_VEHICLE_STATUSES)
+    if category is not None:
+        queryset = queryset.filter(vehiclecategory_id=category)
+    if branch is not None:
+        queryset = queryset.filter(branch_id=branch)
+    return queryset.filter(~Exists(busy))
+
+
+def busy_windows(vehicle_ids, start, end):
+    """
+    Alquileres de varios vehículos que podrían chocar con alguna ventana
+    dentro de [start, end), en una sola consulta: {vehicle_id: [(inicio, fin),
+    ...]}. Sirve para validar muchas ventanas candidatas en memoria con
+    `window_is_free`.
+    """
+    windows = {}
+    rows = set(
+        VehicleOccupancy.objects.filter(day__range=lookup_days(start, end), vehicle_id__in=vehicle_ids)
+        .values_list('vehicle_id', 'rental_id', 'rental__start_date', 'rental__end_date')
+    )
+    for vehicle_id, _, busy_start, busy_end in rows:
+        windows.setdefault(vehicle_id, []).append((busy_start, busy_end))
+    return windows
+
+
+def window_is_free(windows, start, end):
+    return not any(intervals_conflict(start, end, busy_start, busy_end) for busy_start, busy_end in windows)
+
+
+class VehicleUnavailable(Exception):
+    pass
+
+
+@contextmanager
+def reserve_vehicle(vehicle_id, start, end, exclude_id=None):
+    """
+    Transacción corta para crear un alquiler sin reservas dobles: bloquea la
+    fila del vehículo (SELECT ... FOR UPDATE), vuelve a revisar los traslapes
+    y entrega el vehículo bloqueado. Dos agentes que reservan el mismo
+    vehículo se atienden en serie; vehículos distintos no se bloquean entre sí.
+    Si aun así dos alquileres quieren el mismo día, la llave única de
+    `vehicle_occupancy` rechaza el segundo.
+
+    Las validaciones costosas deben hacerse antes, fuera de este bloque.
+    """
+    with transaction.atomic():
+        vehicle = Vehicle.objects.select_for_update().get(pk=vehicle_id)
+        if occupancy_conflicts(start, end, vehicle=vehicle, exclude_id=exclude_id).exists():
+            raise VehicleUnavailable(UNAVAILABLE_MESSAGE)
+        try:
+            yield vehicle
+        except IntegrityError:
+            raise VehicleUnavailable("El vehículo ya tiene un alquiler que inicia o continúa en uno de esos días.")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from rental.occupancy import reconcile
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el calendario vehicle_occupancy a partir de los alquileres vigentes (--check solo reporta)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Solo compara, no escribe.")
+
+    def handle(self, *args, **options):
+        missing, extra, conflicts = reconcile(apply=not options['check'])
+
+        for rental_id, kept_rental_id, (vehicle_id, day) in conflicts:
+            self.stdout.write(
+                f"Choque: el alquiler {rental_id} y el {kept_rental_id} toman el vehículo {vehicle_id} el {day}; se conserva el {kept_rental_id}."
+            )
+        action = "Por corregir" if options['check'] else "Corregidas"
+        self.stdout.write(f"{action}: {len(missing)} filas faltantes, {len(extra)} sobrantes, {len(conflicts)} choques.")
@@ -0,0 +1,103 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from customer.models import Customer
+from rental.availability import VehicleUnavailable, overlapping_rentals, reserve_vehicle
+from rental.models import Rental
+from vehicle.models import Vehicle
+
+BENCHMARK_REMARK = 'benchmark de concurrencia'
+
+
+class Command(BaseCommand):
+    help = (
+        "Lanza N hilos que intentan reservar el mismo vehículo en franjas que se traslapan y "
+        "verifica que no queden reservas dobles. Usa fechas del año 2100 y borra lo que crea."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicle', type=int, required=True)
+        parser.add_argument('--customer', type=int, required=True)
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--attempts', type=int, default=50, help="Intentos por hilo.")
+        parser.add_argument('--slots', type=int, default=20, help="Franjas distintas disputadas.")
+        parser.add_argument('--no-lock', action='store_true', help="Sin bloqueo (para comparar).")
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError("SQLite no soporta SELECT ... FOR UPDATE; ejecute el benchmark contra MySQL.")
+        try:
+            vehicle = Vehicle.objects.get(pk=options['vehicle'])
+            customer = Customer.objects.get(pk=options['customer'])
+        except (Vehicle.DoesNotExist, Customer.DoesNotExist):
+            raise CommandError("Vehículo o cliente inexistente.")
+
+        base = timezone.make_aware(datetime(2100, 1, 1, 8, 0))
+        counters = {"created": 0, "conflicts": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def book(start, end):
+            rental = Rental(
+                customer=customer, vehicle=vehicle, pickup_branch_id=vehicle.branch_id,
+                return_branch_id=vehicle.branch_id, start_date=start, end_date=end,
+                status='Reservado', total_price=Decimal('1.00'), fuel_level_pickup='Lleno',
+                remarks=BENCHMARK_REMARK,
+            )
+            if options['no_lock']:
+                with transaction.atomic():
+                    if overlapping_rentals(start, end, vehicle=vehicle).exists():
+                        raise VehicleUnavailable()
+                    rental.save()
+            else:
+                with reserve_vehicle(vehicle.pk, start, end):
+                    rental.save()
+
+        def writer(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['attempts']):
+                    # Franjas de 2 días que empiezan cada día: vecinas se traslapan.
+                    start = base + timedelta(days=rng.randrange(options['slots']))
+                    try:
+                        book(start, start + timedelta(days=2))
+                        outcome = "created"
+                    except VehicleUnavailable:
+                        outcome = "conflicts"
+                    except Exception as e:
+                        print(f"Error en el benchmark de concurrencia: {e}")
+                        outcome = "errors"
+                    with lock:
+                        counters[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(options['writers'])]
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+            created = list(
+                Rental.objects.filter(vehicle=vehicle, remarks=BENCHMARK_REMARK).order_by('start_date').values_list('start_date', 'end_date')
+            )
+            # Todas las franjas duran lo mismo: basta comparar cada una con la anterior.
+            double_bookings = sum(1 for previous, current in zip(created, created[1:]) if current[0] < previous[1])
+        finally:
+            Rental.objects.filter(vehicle=vehicle, remarks=BENCHMARK_REMARK).delete()
+
+        total = sum(counters.values())
+        self.stdout.write(
+            f"{options['writers']} hilos, {total} intentos en {elapsed:.2f}s ({total / elapsed:,.1f} intentos/s): "
+            f"{counters['created']} creadas, {counters['conflicts']} rechazadas, {counters['errors']} errores, "
+            f"{double_bookings} reservas dobles"
+        )
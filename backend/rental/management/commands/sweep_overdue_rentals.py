@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from rental.overdue import sweep_overdue
+
+
+class Command(BaseCommand):
+    help = "Marca como 'Retrasado' los alquileres vencidos y actualiza sus recargos (usar --once desde cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Ejecuta un solo barrido y termina.")
+        parser.add_argument('--interval', type=int, default=None, help="Segundos entre barridos.")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or getattr(settings, 'RENTAL_OVERDUE_SWEEP_INTERVAL', 300)
+
+        while True:
+            summary = sweep_overdue()
+            self.stdout.write(
+                f"Marcados: {summary.marked_last_run}, retrasados: {summary.overdue_rentals}, "
+                f"recargo acumulado: {summary.total_overdue_charge}"
+            )
+            if options['once']:
+                break
+            time.sleep(interval)
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-18 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branch', '0001_initial'),
+        ('customer', '0001_initial'),
+        ('rental', '0001_initial'),
+        ('vehicle', '0002_historicalvehicle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['vehicle', 'active', 'status', 'start_date', 'end_date'], name='rental_vehicle_avail_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['customer', 'active', 'status'], name='rental_customer_status_idx'),
+        ),
+    ]
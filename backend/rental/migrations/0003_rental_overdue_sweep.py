@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branch', '0001_initial'),
+        ('customer', '0001_initial'),
+        ('rental', '0002_rental_availability_indexes'),
+        ('vehicle', '0002_historicalvehicle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentalOverdueSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('overdue_rentals', models.PositiveIntegerField(default=0, verbose_name='alquileres retrasados')),
+                ('overdue_customers', models.PositiveIntegerField(default=0, verbose_name='clientes con atraso')),
+                ('total_overdue_charge', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='recargo total por atraso')),
+                ('max_days_overdue', models.PositiveIntegerField(default=0, verbose_name='máximo de días de atraso')),
+                ('oldest_end_date', models.DateTimeField(blank=True, null=True, verbose_name='fecha de fin más antigua')),
+                ('marked_last_run', models.PositiveIntegerField(default=0, verbose_name='marcados en el último barrido')),
+                ('computed_at', models.DateTimeField(blank=True, null=True, verbose_name='fecha de cálculo')),
+            ],
+            options={
+                'verbose_name': 'Resumen de atrasos',
+                'verbose_name_plural': 'Resumen de atrasos',
+                'db_table': 'rental_overdue_summary',
+            },
+        ),
+        migrations.AddField(
+            model_name='rental',
+            name='overdue_charge',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Recargo por atraso a la fecha del último barrido (se recalcula al finalizar).', max_digits=10, verbose_name='recargo por atraso acumulado'),
+        ),
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['status', 'active', 'end_date'], name='rental_status_end_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 12:27
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_occupancy(apps, schema_editor):
+    """
+    Carga inicial del calendario con los alquileres vigentes. Si dos alquileres
+    toman el mismo día se conserva el que inicia primero; el comando
+    `rebuild_vehicle_occupancy --check` lista esos choques.
+    """
+    Rental = apps.get_model('rental', 'Rental')
+    VehicleOccupancy = apps.get_model('rental', 'VehicleOccupancy')
+
+    taken = set()
+    rows = []
+    rentals = Rental.objects.filter(active=True, status__in=('Activo', 'Reservado', 'Retrasado')).order_by('start_date', 'id')
+    for rental in rentals.iterator(chunk_size=2000):
+        first = timezone.localdate(rental.start_date)
+        last = max(first, timezone.localdate(rental.end_date) - timedelta(days=1))
+        for offset in range((last - first).days + 1):
+            key = (rental.vehicle_id, first + timedelta(days=offset))
+            if key not in taken:
+                taken.add(key)
+                rows.append(VehicleOccupancy(vehicle_id=key[0], day=key[1], rental_id=rental.id))
+    VehicleOccupancy.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental', '0003_rental_overdue_sweep'),
+        ('vehicle', '0002_historicalvehicle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='día')),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='rental.rental', verbose_name='alquiler')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='vehicle.vehicle', verbose_name='vehículo')),
+            ],
+            options={
+                'verbose_name': 'Ocupación de vehículo',
+                'verbose_name_plural': 'Ocupación de vehículos',
+                'db_table': 'vehicle_occupancy',
+                'constraints': [models.UniqueConstraint(fields=('vehicle', 'day'), name='vehicle_occupancy_day_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_occupancy, migrations.RunPython.noop),
+    ]
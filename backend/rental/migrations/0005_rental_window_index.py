@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branch', '0001_initial'),
+        ('customer', '0001_initial'),
+        ('rental', '0004_vehicle_occupancy'),
+        ('vehicle', '0002_historicalvehicle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(fields=['active', 'end_date', 'start_date'], name='rental_window_idx'),
+        ),
+    ]
@@ -115,6 +115,13 @@ class Rental(models.Model):
         verbose_name="observaciones",
         help_text="Notas o comentarios adicionales sobre el alquiler (daños, acuerdos, etc.)."
     )
+    overdue_charge = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name="recargo por atraso acumulado",
+        help_text="Recargo por atraso a la fecha del último barrido (se recalcula al finalizar)."
+    )
 
     # --- Campos de Auditoría ---
     active = models.BooleanField(default=True, verbose_name="activo")
@@ -144,6 +151,62 @@ class Rental(models.Model):
         db_table = 'rental'
         verbose_name = 'Alquiler'
         verbose_name_plural = 'Alquileres'
+        indexes = [
+            # Búsquedas de disponibilidad / traslapes por vehículo.
+            models.Index(fields=['vehicle', 'active', 'status', 'start_date', 'end_date'], name='rental_vehicle_avail_idx'),
+            # Límite de alquileres simultáneos por cliente.
+            models.Index(fields=['customer', 'active', 'status'], name='rental_customer_status_idx'),
+            # Barrido de vencidos (rental/overdue.py).
+            models.Index(fields=['status', 'active', 'end_date'], name='rental_status_end_idx'),
+            # Consultas por ventana de fechas de toda la flota (línea de tiempo).
+            models.Index(fields=['active', 'end_date', 'start_date'], name='rental_window_idx'),
+        ]
 
     def __str__(self):
         return f"Alquiler de {self.vehicle.plate} por {self.customer} - {self.start_date.strftime('%d/%m/%Y')}"
+
+
+class RentalOverdueSummary(models.Model):
+    """
+    Resumen de la exposición por atrasos, escrito por el barrido de alquileres
+    vencidos (rental/overdue.py). Tiene una sola fila (pk=1).
+    """
+    overdue_rentals = models.PositiveIntegerField(default=0, verbose_name="alquileres retrasados")
+    overdue_customers = models.PositiveIntegerField(default=0, verbose_name="clientes con atraso")
+    total_overdue_charge = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name="recargo total por atraso")
+    max_days_overdue = models.PositiveIntegerField(default=0, verbose_name="máximo de días de atraso")
+    oldest_end_date = models.DateTimeField(null=True, blank=True, verbose_name="fecha de fin más antigua")
+    marked_last_run = models.PositiveIntegerField(default=0, verbose_name="marcados en el último barrido")
+    computed_at = models.DateTimeField(null=True, blank=True, verbose_name="fecha de cálculo")
+
+    class Meta:
+        db_table = 'rental_overdue_summary'
+        verbose_name = 'Resumen de atrasos'
+        verbose_name_plural = 'Resumen de atrasos'
+
+    def __str__(self):
+        return f"{self.overdue_rentals} alquileres retrasados al {self.computed_at}"
+
+
+class VehicleOccupancy(models.Model):
+    """
+    Calendario de ocupación: una fila por vehículo y día tomado por un alquiler
+    vigente. Un alquiler ocupa desde el día en que inicia hasta el día anterior
+    a su devolución (el día de devolución queda libre para el siguiente
+    cliente). La restricción única sobre (vehicle, day) impide en la base de
+    datos que dos alquileres tomen el mismo día. Se mantiene en rental/occupancy.py.
+    """
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='occupancy', verbose_name="vehículo")
+    day = models.DateField(verbose_name="día")
+    rental = models.ForeignKey(Rental, on_delete=models.CASCADE, related_name='occupancy', verbose_name="alquiler")
+
+    class Meta:
+        db_table = 'vehicle_occupancy'
+        verbose_name = 'Ocupación de vehículo'
+        verbose_name_plural = 'Ocupación de vehículos'
+        constraints = [
+            models.UniqueConstraint(fields=['vehicle', 'day'], name='vehicle_occupancy_day_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle_id} {self.day} -> alquiler {self.rental_id}"
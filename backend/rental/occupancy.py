@@ -0,0 +1,83 @@
+"""
+Mantenimiento del calendario `vehicle_occupancy`.
+
+Cada vez que se guarda un alquiler se sincronizan sus días: se agregan los
+que faltan y se quitan los que sobran (cambio de fechas o de vehículo,
+cancelación, finalización o desactivación). Corre dentro de la transacción
+del guardado, así que un choque con la llave única revierte el alquiler.
+"""
+from django.db import transaction
+
+from rental.availability import BLOCKING_STATUSES, occupied_days
+from rental.models import Rental, VehicleOccupancy
+
+
+def is_blocking(rental):
+    return rental.active and rental.status in BLOCKING_STATUSES and rental.start_date and rental.end_date
+
+
+def expected_days(rental):
+    return set(occupied_days(rental.start_date, rental.end_date)) if is_blocking(rental) else set()
+
+
+def sync_rental(rental):
+    days = expected_days(rental)
+    current = set(VehicleOccupancy.objects.filter(rental=rental).values_list('vehicle_id', 'day'))
+    expected = {(rental.vehicle_id, day) for day in days}
+    if current == expected:
+        return
+
+    with transaction.atomic():
+        stale = current - expected
+        if stale:
+            VehicleOccupancy.objects.filter(rental=rental).exclude(vehicle_id=rental.vehicle_id).delete()
+            VehicleOccupancy.objects.filter(rental=rental, vehicle_id=rental.vehicle_id).exclude(day__in=days).delete()
+        VehicleOccupancy.objects.bulk_create([
+            VehicleOccupancy(vehicle_id=vehicle_id, day=day, rental=rental)
+            for vehicle_id, day in sorted(expected - current)
+        ])
+
+
+def expected_rows():
+    """
+    Filas que debería tener el calendario según `rental`: ({(vehicle_id, day):
+    rental_id}, choques). Ante dos alquileres que toman el mismo día gana el
+    que inicia primero; el otro se reporta como choque.
+    """
+    rows = {}
+    conflicts = []
+    rentals = Rental.objects.filter(active=True, status__in=BLOCKING_STATUSES).order_by('start_date', 'id')
+    for rental in rentals.only('id', 'vehicle_id', 'start_date', 'end_date', 'status', 'active').iterator(chunk_size=2000):
+        for day in expected_days(rental):
+            key = (rental.vehicle_id, day)
+            if key in rows:
+                conflicts.append((rental.id, rows[key], key))
+            else:
+                rows[key] = rental.id
+    return rows, conflicts
+
+
+def reconcile(apply=False):
+    """
+    Compara el calendario con `rental`. Con `apply=True` borra las filas que
+    sobran y crea las que faltan. Devuelve (faltantes, sobrantes, choques).
+    """
+    expected, conflicts = expected_rows()
+    current = {}
+    row_ids = {}
+    for row_id, vehicle_id, day, rental_id in VehicleOccupancy.objects.values_list('id', 'vehicle_id', 'day', 'rental_id').iterator(chunk_size=5000):
+        current[(vehicle_id, day)] = rental_id
+        row_ids[(vehicle_id, day)] = row_id
+    extra = {key for key, rental_id in current.items() if expected.get(key) != rental_id}
+    missing = {key for key, rental_id in expected.items() if current.get(key) != rental_id}
+
+    if apply and (extra or missing):
+        with transaction.atomic():
+            stale_ids = [row_ids[key] for key in extra]
+            for offset in range(0, len(stale_ids), 1000):
+                VehicleOccupancy.objects.filter(id__in=stale_ids[offset:offset + 1000]).delete()
+            VehicleOccupancy.objects.bulk_create(
+                [VehicleOccupancy(vehicle_id=vehicle_id, day=day, rental_id=expected[(vehicle_id, day)]) for vehicle_id, day in sorted(missing)],
+                batch_size=1000,
+            )
+    return missing, extra, conflicts
@@ -0,0 +1,116 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, Min, OuterRef, Subquery, Sum, Value, When
+from django.utils import timezone
+
+from rental import pricing
+from rental.models import Rental, RentalOverdueSummary
+from vehicle.models import Vehicle
+from vehicle.timeline import invalidate_timeline_on_commit
+
+
+def overdue_rentals():
+    """
+    Alquileres que siguen en manos del cliente y ya están marcados como retrasados.
+    """
+    return Rental.objects.filter(active=True, status='Retrasado', actual_return_date__isnull=True)
+
+
+def overdue_charge_expression(now):
+    """
+    Recargo por atraso a la fecha `now` como expresión SQL, con los mismos
+    tramos que `pricing.overdue_charge`: un CASE sobre `end_date` elige el
+    multiplicador y se aplica a la tarifa diaria del vehículo.
+    """
+    whens = [
+        When(end_date__gte=now - timedelta(days=days), then=Value(Decimal(pricing.overdue_multiplier(days))))
+        for days in range(1, pricing.OVERDUE_MAX_DAYS)
+    ]
+    multiplier = Case(
+        *whens,
+        default=Value(Decimal(pricing.overdue_multiplier(pricing.OVERDUE_MAX_DAYS))),
+        output_field=DecimalField(max_digits=5, decimal_places=2),
+    )
+    daily_price = Subquery(Vehicle.objects.filter(pk=OuterRef('vehicle_id')).values('daily_price')[:1])
+    return ExpressionWrapper(daily_price * multiplier, output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def sweep_overdue(now=None):
+    """
+    Marca como 'Retrasado' los alquileres activos vencidos, recalcula el recargo
+    acumulado de todos los retrasados y guarda el resumen. Son dos UPDATE y una
+    agregación, sin importar cuántos alquileres haya.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        marked = Rental.objects.filter(
+            active=True,
+            status='Activo',
+            actual_return_date__isnull=True,
+            end_date__lt=now,
+        ).update(status='Retrasado', updated_at=now)
+
+        overdue_rentals().filter(end_date__lt=now).update(overdue_charge=overdue_charge_expression(now))
+
+        totals = overdue_rentals().aggregate(
+            rentals=Count('id'),
+            customers=Count('customer', distinct=True),
+            charge=Sum('overdue_charge'),
+            oldest=Min('end_date'),
+        )
+        summary, _ = RentalOverdueSummary.objects.update_or_create(pk=1, defaults={
+            'overdue_rentals': totals['rentals'],
+            'overdue_customers': totals['customers'],
+            'total_overdue_charge': totals['charge'] or pricing.ZERO,
+            'max_days_overdue': pricing.rental_days(totals['oldest'], now) if totals['oldest'] else 0,
+            'oldest_end_date': totals['oldest'],
+            'marked_last_run': marked,
+            'computed_at': now,
+        })
+    if marked:
+        # El UPDATE masivo no dispara señales: la línea de tiempo debe refrescarse.
+        invalidate_timeline_on_commit()
+    return summary
+
+
+class OverdueSweeper:
+    """
+    Hilo en segundo plano que ejecuta `sweep_overdue` cada
+    RENTAL_OVERDUE_SWEEP_INTERVAL segundos. Alternativa al comando
+    `sweep_overdue_rentals` cuando no hay cron disponible.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='rental-overdue-sweeper', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        interval = getattr(settings, 'RENTAL_OVERDUE_SWEEP_INTERVAL', 300)
+        while not self._stop.is_set():
+            try:
+                close_old_connections()
+                sweep_overdue()
+            except Exception as e:
+                print(f"Error al procesar los alquileres retrasados: {e}")
+            finally:
+                close_old_connections()
+            self._stop.wait(timeout=interval)
+
+
+sweeper = OverdueSweeper()
@@ -0,0 +1,200 @@
+"""
+Reglas de precio de los alquileres en un solo lugar.
+
+Todas las rutas (cotización, creación, pagos y finalización) deben usar estas
+funciones para que la duración, el anticipo, el depósito y los recargos se
+calculen siempre igual. Las funciones son puras: no consultan la base de datos
+salvo `projected_balances`, que resuelve un lote completo con una sola consulta.
+"""
+import math
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from payment.models import Payment
+
+CENT = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Alquileres de más de estos días se pagan completos al inicio.
+FULL_PAYMENT_AFTER_DAYS = 5
+INITIAL_PAYMENT_RATE = Decimal('0.50')
+FULL_PAYMENT_RATE = Decimal('1.00')
+
+FOREIGN_DEPOSIT = Decimal('100.00')
+FUEL_COST_PER_LEVEL = Decimal('15.00')
+
+# Recargo por atraso: los primeros días a tarifa normal, luego al doble, con tope.
+OVERDUE_SINGLE_RATE_DAYS = 3
+OVERDUE_MAX_DAYS = 7
+OVERDUE_DOUBLE_RATE = 2
+
+FUEL_LEVELS = ('Vacio', '1/4', '1/2', '3/4', 'Lleno')
+_FUEL_INDEX = {level: index for index, level in enumerate(FUEL_LEVELS)}
+
+SERVICE_CONCEPTS = ('Anticipo', 'Pago Final', 'Cargo Adicional', 'Cargo por Retraso')
+DEPOSIT_CONCEPTS = ('Depósito', 'Deposito')
+
+Quote = namedtuple('Quote', [
+    'duration_days', 'daily_price', 'total_price', 'initial_rate',
+    'initial_payment', 'deposit', 'due_at_start',
+])
+
+Settlement = namedtuple('Settlement', [
+    'days_overdue', 'overdue_charge', 'fuel_charge', 'total_to_cover',
+])
+
+Balance = namedtuple('Balance', [
+    'paid_for_service', 'deposit_paid', 'projected_overdue_charge', 'projected_total', 'balance',
+])
+
+
+def to_decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def is_foreign(customer_type):
+    return bool(customer_type) and customer_type.lower() == 'extranjero'
+
+
+# Vehículos simultáneos permitidos por tipo de cliente.
+NATIONAL_RENTAL_LIMIT = 5
+FOREIGN_RENTAL_LIMIT = 3
+
+
+def customer_limit_error(customer, active_rentals_count):
+    """
+    Mensaje si el cliente ya tiene el máximo de alquileres vigentes para su
+    tipo, o None. Lo aplican la cotización y la creación.
+    """
+    if is_foreign(customer.customer_type):
+        if active_rentals_count >= FOREIGN_RENTAL_LIMIT:
+            return f"Cliente extranjero ya ha alcanzado el límite de {active_rentals_count} de {FOREIGN_RENTAL_LIMIT} vehículos simultáneos."
+    elif active_rentals_count >= NATIONAL_RENTAL_LIMIT:
+        return f"Cliente nacional ya ha alcanzado el límite de {active_rentals_count} de {NATIONAL_RENTAL_LIMIT} vehículos simultáneos."
+    return None
+
+
+def rental_days(start, end):
+    """
+    Días cobrables: bloques de 24 horas iniciados, mínimo uno.
+    """
+    seconds = (end - start).total_seconds()
+    if seconds <= 0:
+        return 0
+    return max(1, math.ceil(seconds / SECONDS_PER_DAY))
+
+
+def initial_terms(total_price, duration_days, customer_type):
+    """
+    (porcentaje, anticipo, depósito) exigidos al iniciar el alquiler.
+    """
+    rate = FULL_PAYMENT_RATE if duration_days > FULL_PAYMENT_AFTER_DAYS else INITIAL_PAYMENT_RATE
+    initial_payment = (to_decimal(total_price) * rate).quantize(CENT)
+    deposit = FOREIGN_DEPOSIT if is_foreign(customer_type) else ZERO
+    return rate, initial_payment, deposit
+
+
+def quote(vehicle, customer_type, start, end):
+    """
+    Cotización completa de un alquiler. `vehicle` puede ser un Vehicle o
+    directamente el precio diario.
+    """
+    daily_price = to_decimal(getattr(vehicle, 'daily_price', vehicle))
+    duration_days = rental_days(start, end)
+    total_price = (daily_price * duration_days).quantize(CENT)
+    rate, initial_payment, deposit = initial_terms(total_price, duration_days, customer_type)
+    return Quote(
+        duration_days, daily_price, total_price, rate,
+        initial_payment, deposit, (initial_payment + deposit).quantize(CENT),
+    )
+
+
+def overdue_charge(daily_price, scheduled_end, returned_at):
+    """
+    (días de atraso, recargo) al devolver el vehículo en `returned_at`.
+    """
+    if returned_at <= scheduled_end:
+        return 0, ZERO
+
+    days_overdue = rental_days(scheduled_end, returned_at)
+    charge = to_decimal(daily_price) * overdue_multiplier(days_overdue)
+    return days_overdue, charge.quantize(CENT)
+
+
+def overdue_multiplier(days_overdue):
+    """
+    Cuántas tarifas diarias se cobran por `days_overdue` días de atraso.
+    A partir de OVERDUE_MAX_DAYS el valor ya no crece.
+    """
+    single = min(days_overdue, OVERDUE_SINGLE_RATE_DAYS)
+    double = max(0, min(days_overdue, OVERDUE_MAX_DAYS) - OVERDUE_SINGLE_RATE_DAYS)
+    return single + double * OVERDUE_DOUBLE_RATE
+
+
+def fuel_charge(pickup_level, return_level):
+    pickup_index = _FUEL_INDEX.get(pickup_level, 0)
+    return_index = _FUEL_INDEX.get(return_level, 0)
+    if return_index >= pickup_index:
+        return ZERO
+    return (FUEL_COST_PER_LEVEL * (pickup_index - return_index)).quantize(CENT)
+
+
+def settle(rental, return_ts, fuel):
+    """
+    Cargos al finalizar: atraso, combustible y total a cubrir (precio original
+    más recargos). No considera los pagos ya registrados.
+    """
+    days_overdue, overdue = overdue_charge(rental.vehicle.daily_price, rental.end_date, return_ts)
+    fuel_cost = fuel_charge(rental.fuel_level_pickup, fuel)
+    total_to_cover = (to_decimal(rental.total_price) + overdue + fuel_cost).quantize(CENT)
+    return Settlement(days_overdue, overdue, fuel_cost, total_to_cover)
+
+
+def projected_balances(rentals, as_of=None):
+    """
+    Saldo proyectado de un lote de alquileres: {rental_id: Balance}.
+
+    Usa los pagos precargados (prefetch_related('payment_set')) si están
+    disponibles; si no, agrupa todos los pagos del lote en una sola consulta.
+    Para alquileres en curso ya vencidos suma el recargo por atraso a la fecha
+    `as_of` (por defecto, ahora). Requiere `vehicle` precargado.
+    """
+    rentals = list(rentals)
+    if not rentals:
+        return {}
+    as_of = as_of or timezone.now()
+
+    totals = {}
+    missing = {rental.id for rental in rentals if 'payment_set' not in getattr(rental, '_prefetched_objects_cache', {})}
+    if missing:
+        rows = Payment.objects.filter(rental_id__in=missing, active=True).values('rental_id', 'concept').annotate(total=Sum('amount'))
+        for row in rows:
+            totals[(row['rental_id'], row['concept'])] = row['total'] or ZERO
+    for rental in rentals:
+        if rental.id in missing:
+            continue
+        for payment in rental.payment_set.all():
+            if payment.active:
+                key = (rental.id, payment.concept)
+                totals[key] = totals.get(key, ZERO) + payment.amount
+
+    balances = {}
+    for rental in rentals:
+        paid = sum((totals.get((rental.id, concept), ZERO) for concept in SERVICE_CONCEPTS), ZERO)
+        deposit = sum((totals.get((rental.id, concept), ZERO) for concept in DEPOSIT_CONCEPTS), ZERO)
+        overdue = ZERO
+        if rental.status in ('Activo', 'Retrasado') and rental.end_date and rental.actual_return_date is None:
+            overdue = overdue_charge(rental.vehicle.daily_price, rental.end_date, as_of)[1]
+        projected_total = (to_decimal(rental.total_price) + overdue).quantize(CENT)
+        balances[rental.id] = Balance(
+            paid.quantize(CENT), deposit.quantize(CENT), overdue, projected_total,
+            (projected_total - paid).quantize(CENT),
+        )
+    return balances
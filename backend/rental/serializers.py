@@ -1,17 +1,20 @@
 from rest_framework import serializers
 from rental.models import Rental
-from django.contrib.auth.models import User
 from django.db import transaction
 import decimal
-import math
 from django.utils import timezone
 from datetime import timedelta
+from django.db import models
 from django.db.models import Sum
 from payment.models import Payment
 from payment.serializers import PaymentSerializer as NestedPaymentSerializer # Asegúrate de que esta línea esté correcta
 from customer.models import Customer
 from vehicle.models import Vehicle
 import pytz
+from utilities.audit import AUDIT_FIELD_DEPENDENCIES, AuditUserSerializerMixin, AuditUserListSerializer
+from utilities.sparse_fields import SparseFieldsMixin
+from rental.availability import BLOCKING_STATUSES, is_vehicle_available
+from rental import pricing
 
 # --- NestedPaymentSerializer (Asegúrate de que este serializer exista y sea correcto) ---
 class NestedPaymentSerializer(serializers.Serializer):
@@ -56,8 +59,21 @@ class NestedPaymentSerializer(serializers.Serializer):
         return instance
 
 
+class RentalListSerializer(AuditUserListSerializer):
+    """
+    Calcula en lote el saldo proyectado de todas las filas antes de serializar.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        iterable = list(iterable)
+        if 'projected_balance' in self.child.fields:
+            self.context.setdefault('_projected_balances', {}).update(pricing.projected_balances(iterable))
+        return super().to_representation(iterable)
+
+
 # --- RentalSerializer Principal (Sin cambios relevantes para este problema, pero incluido por completitud) ---
-class RentalSerializer(serializers.ModelSerializer):
+class RentalSerializer(SparseFieldsMixin, AuditUserSerializerMixin, serializers.ModelSerializer):
     """
     Serializador para el modelo Rental.
     """
@@ -74,6 +90,7 @@ class RentalSerializer(serializers.ModelSerializer):
     
     created_by_name = serializers.SerializerMethodField(read_only=True)
     modified_by_name = serializers.SerializerMethodField(read_only=True)
+    projected_balance = serializers.SerializerMethodField(read_only=True)
 
     start_date = serializers.DateTimeField(
         format="%d-%m-%Y %H:%M",
@@ -110,6 +127,7 @@ class RentalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Rental
+        list_serializer_class = RentalListSerializer
         fields = (
             "id",
             "customer",
@@ -131,6 +149,7 @@ class RentalSerializer(serializers.ModelSerializer):
             "fuel_level_pickup",
             "fuel_level_return",
             "remarks",
+            "overdue_charge",
             "active",
             "created_by",
             "created_by_name",
@@ -138,32 +157,37 @@ class RentalSerializer(serializers.ModelSerializer):
             "modified_by",
             "modified_by_name",
             "updated_at",
+            "projected_balance",
             "payments",      # Asegúrate de que 'payments' (lectura) esté en los 'fields'
             "payments_input", # Asegúrate de que 'payments_input' (escritura) esté en los 'fields'
         )
+        projections = {
+            'list': (
+                "id", "customer", "customer_name", "vehicle", "vehicle_plate", "pickup_branch_name",
+                "return_branch_name", "start_date", "end_date", "status", "total_price", "projected_balance",
+            ),
+            'detail': fields,
+        }
+        expandable = ("payments",)
+        field_dependencies = {
+            **AUDIT_FIELD_DEPENDENCIES,
+            'customer_name': ('customer__first_name', 'customer__last_name'),
+            'projected_balance': ('status', 'end_date', 'actual_return_date', 'total_price', 'vehicle__daily_price'),
+        }
         extra_kwargs = {
-            'status': {'required': False}
+            'status': {'required': False},
+            'overdue_charge': {'read_only': True},
         }
 
-    def get_created_by_name(self, obj):
-        if obj.created_by is None:
-            return None
-        try:
-            # Asegúrate de que User esté correctamente importado o usa get_user_model()
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name if user.first_name else user.username
-        except (User.DoesNotExist, ValueError):
-            return None
-
-    def get_modified_by_name(self, obj):
-        if obj.modified_by is None:
-            return None
-        try:
-            # Asegúrate de que User esté correctamente importado o usa get_user_model()
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name if user.first_name else user.username
-        except (User.DoesNotExist, ValueError):
-            return None
+    def format_audit_user(self, user):
+        return user.first_name if user.first_name else user.username
+
+    def get_projected_balance(self, obj):
+        balances = self.context.setdefault('_projected_balances', {})
+        if obj.id not in balances:
+            balances.update(pricing.projected_balances([obj]))
+        balance = balances[obj.id]
+        return {field: str(value) for field, value in balance._asdict().items()}
 
     def validate(self, data):
         is_creating = self.instance is None
@@ -190,13 +214,7 @@ class RentalSerializer(serializers.ModelSerializer):
         if end_date <= start_date:
             raise serializers.ValidationError({"end_date": "La fecha y hora de fin debe ser posterior a la fecha de inicio."})
 
-        duration_days = (end_date.date() - start_date.date()).days
-        # Ajuste para incluir el día de finalización si excede la hora de inicio o si es el mismo día con duración
-        if start_date.date() != end_date.date() and (end_date.hour > start_date.hour or (end_date.hour == start_date.hour and end_date.minute > start_date.minute)):
-            duration_days += 1
-        elif start_date.date() == end_date.date() and (end_date.total_seconds() - start_date.total_seconds() > 0):
-            duration_days = 1
-
+        duration_days = pricing.rental_days(start_date, end_date)
         if duration_days <= 0:
             raise serializers.ValidationError({"dates": "La duración del alquiler debe ser al menos un día."})
         data['duration_days'] = duration_days
@@ -208,38 +226,16 @@ class RentalSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"vehicle": "El vehículo no está activo."})
 
         # Conflicto de rentas existentes
-        conflicting_rentals = Rental.objects.filter(
-            vehicle=vehicle,
-            end_date__gte=start_date,
-            start_date__lte=end_date,
-            status__in=['Activo', 'Reservado'],
-            active=True
-        )
-        if self.instance:
-            conflicting_rentals = conflicting_rentals.exclude(id=self.instance.id)
-
-        if conflicting_rentals.exists():
+        exclude_id = self.instance.id if self.instance else None
+        if not is_vehicle_available(vehicle, start_date, end_date, exclude_id=exclude_id):
             raise serializers.ValidationError({"vehicle": "El vehículo no está disponible para las fechas seleccionadas debido a un alquiler existente."})
 
         # --- Cálculo del Precio Total de la Renta ---
-        total_rental_price = vehicle.daily_price * decimal.Decimal(str(duration_days))
-        data['total_price'] = total_rental_price.quantize(decimal.Decimal('0.01'))
-
-        # Definir el porcentaje de pago inicial del alquiler
-        required_rental_payment_percentage = decimal.Decimal('0.50')
-        if duration_days > 5:
-            required_rental_payment_percentage = decimal.Decimal('1.00')
-
-        # Calcular el monto del anticipo del alquiler (sin depósito)
-        required_rental_payment_amount = (total_rental_price * required_rental_payment_percentage).quantize(decimal.Decimal('0.01'))
-
-        # Calcular el depósito requerido para extranjeros
-        deposit_required = decimal.Decimal('0.00')
-        if customer.customer_type.lower() == 'extranjero':
-            deposit_required = decimal.Decimal('100.00')
+        rental_quote = pricing.quote(vehicle, customer.customer_type, start_date, end_date)
+        data['total_price'] = rental_quote.total_price
 
         # Monto total EXACTO que se espera de pago inicial (anticipo + depósito)
-        expected_total_initial_payment = (required_rental_payment_amount + deposit_required).quantize(decimal.Decimal('0.01'))
+        expected_total_initial_payment = rental_quote.due_at_start
 
         if is_creating:
             if not payments_data:
@@ -261,14 +257,13 @@ class RentalSerializer(serializers.ModelSerializer):
         if is_creating:
             active_rentals_count = Rental.objects.filter(
                 customer=customer,
-                status__in=['Activo', 'Reservado'],
+                status__in=BLOCKING_STATUSES,
                 active=True
             ).count()
 
-            if customer.customer_type == 'nacional' and active_rentals_count >= 5:
-                raise serializers.ValidationError({"customer": f"Cliente nacional ya ha alcanzado el límite de {active_rentals_count} de 5 vehículos simultáneos."})
-            elif customer.customer_type.lower() == 'extranjero' and active_rentals_count >= 3:
-                raise serializers.ValidationError({"customer": f"Cliente extranjero ya ha alcanzado el límite de {active_rentals_count} de 3 vehículos simultáneos."})
+            limit_error = pricing.customer_limit_error(customer, active_rentals_count)
+            if limit_error:
+                raise serializers.ValidationError({"customer": limit_error})
 
         return data
 
@@ -293,22 +288,9 @@ class RentalSerializer(serializers.ModelSerializer):
         start_date = rental.start_date
         end_date = rental.end_date
 
-        duration_days = (end_date.date() - start_date.date()).days
-        if start_date.date() != end_date.date() and (end_date.hour > start_date.hour or (end_date.hour == start_date.hour and end_date.minute > start_date.minute)):
-            duration_days += 1
-        elif start_date.date() == end_date.date() and (end_date.total_seconds() - start_date.total_seconds() > 0):
-            duration_days = 1
-            
-        total_rental_price = (vehicle.daily_price * decimal.Decimal(str(duration_days))).quantize(decimal.Decimal('0.01'))
-
-        required_rental_payment_percentage = decimal.Decimal('0.50')
-        if duration_days > 5:
-            required_rental_payment_percentage = decimal.Decimal('1.00')
-
-        required_rental_payment_amount = (total_rental_price * required_rental_payment_percentage).quantize(decimal.Decimal('0.01'))
-        deposit_required = decimal.Decimal('0.00')
-        if customer.customer_type.lower() == 'extranjero':
-            deposit_required = decimal.Decimal('100.00')
+        rental_quote = pricing.quote(vehicle, customer.customer_type, start_date, end_date)
+        required_rental_payment_amount = rental_quote.initial_payment
+        deposit_required = rental_quote.deposit
 
         # Si viene un solo pago del frontend que suma anticipo + depósito (lo más común)
         # Asumimos que `initial_payment_data` contiene el monto total recibido.
@@ -321,7 +303,7 @@ class RentalSerializer(serializers.ModelSerializer):
             # 1. Crear el pago para el anticipo del alquiler
             if required_rental_payment_amount > decimal.Decimal('0.00'):
                 payment_concept = 'Anticipo'
-                if required_rental_payment_percentage == decimal.Decimal('1.00'):
+                if rental_quote.initial_rate == pricing.FULL_PAYMENT_RATE:
                     payment_concept = 'Pago Final'
 
                 Payment.objects.create(
@@ -417,61 +399,22 @@ class RentalFinalizeSerializer(serializers.Serializer): # Cambiado a Serializer
         if actual_return_date_local > current_time_in_local_tz + timedelta(minutes=1):
             raise serializers.ValidationError({"actual_return_date": "La fecha de devolución real no puede ser una fecha futura."})
 
-        fuel_level_map = {choice[0]: i for i, choice in enumerate(Rental.FUEL_LEVEL_CHOICES)}
-        pickup_level = fuel_level_map.get(rental.fuel_level_pickup, 0)
-        return_level = fuel_level_map.get(fuel_level_return, 0)
-
-        fuel_charge = decimal.Decimal('0.00')
-        FUEL_COST_PER_LEVEL = decimal.Decimal('15.00')
-
-        if return_level < pickup_level:
-            fuel_charge = (pickup_level - return_level) * FUEL_COST_PER_LEVEL
-        
-        data['calculated_fuel_charge'] = fuel_charge.quantize(decimal.Decimal('0.01'))
-
-        overdue_charge = decimal.Decimal('0.00')
-        days_overdue = 0
-
-        rental_end_date_local_tz = rental.end_date.astimezone(el_salvador_tz)
-        
-        if actual_return_date_local > rental_end_date_local_tz:
-            
-            diff_time = actual_return_date_local - rental_end_date_local_tz
-
-            diff_hours = diff_time.total_seconds() / (60 * 60)
-            raw_days_overdue = math.ceil(diff_hours / 24)
-
-            if raw_days_overdue <= 0 and diff_hours > 0:
-                raw_days_overdue = 1
-
-            days_overdue = raw_days_overdue
-
-            daily_price = rental.vehicle.daily_price
-
-            if days_overdue <= 3:
-                overdue_charge = daily_price * days_overdue
-            elif days_overdue > 3 and days_overdue <= 7:
-                overdue_acu = daily_price * 3
-                overdue_charge = overdue_acu + (daily_price * (days_overdue - 3) * 2)
-            else: # Más de 7 días
-                overdue_acu = daily_price * 3
-                overdue_charge = overdue_acu + (daily_price * (7 - 3) * 2)
-        
-        data['calculated_overdue_charge'] = overdue_charge.quantize(decimal.Decimal('0.01'))
-        data['days_overdue'] = days_overdue
+        settlement = pricing.settle(rental, actual_return_date, fuel_level_return)
+        fuel_charge = settlement.fuel_charge
+        overdue_charge = settlement.overdue_charge
 
-        total_original_rental_cost = rental.total_price 
-        if not isinstance(total_original_rental_cost, decimal.Decimal):
-            total_original_rental_cost = decimal.Decimal(str(total_original_rental_cost)).quantize(decimal.Decimal('0.01'))
+        data['calculated_fuel_charge'] = fuel_charge
+        data['calculated_overdue_charge'] = overdue_charge
+        data['days_overdue'] = settlement.days_overdue
 
         # Total que se debe cubrir por el alquiler, cargos por atraso y combustible
-        total_amount_to_cover = (total_original_rental_cost + overdue_charge + fuel_charge).quantize(decimal.Decimal('0.01'))
+        total_amount_to_cover = settlement.total_to_cover
         
         # Pagos existentes por conceptos de servicio (anticipo, pago final, cargos adicionales)
         # Excluye depósitos y reembolsos de este cálculo inicial
         paid_for_rental_only = Payment.objects.filter(
             rental=rental,
-            concept__in=['Anticipo', 'Pago Final', 'Cargo Adicional', 'Cargo por Retraso'] 
+            concept__in=pricing.SERVICE_CONCEPTS
         ).aggregate(total=Sum('amount'))['total'] or decimal.Decimal('0.00')
 
         # Depósito de garantía real recibido (monto que existe en BD, será 0 para nacionales si no lo pagaron)
@@ -488,11 +431,9 @@ class RentalFinalizeSerializer(serializers.Serializer): # Cambiado a Serializer
             payment_concept = final_payment_data.get('concept')
         
         # Determine si el cliente es extranjero
-        is_foreign_customer = False
-        if hasattr(rental.customer, 'customer_type') and rental.customer.customer_type and rental.customer.customer_type.lower() == 'extranjero':
-            is_foreign_customer = True
+        is_foreign_customer = pricing.is_foreign(rental.customer.customer_type)
 
-        DEPOSIT_AMOUNT_FOREIGNER = decimal.Decimal('100.00') # El valor fijo para depósitos de extranjeros
+        DEPOSIT_AMOUNT_FOREIGNER = pricing.FOREIGN_DEPOSIT # El valor fijo para depósitos de extranjeros
 
         # --- CÁLCULO INICIAL DEL SALDO PENDIENTE (ANTES DE APLICAR EL PAGO ACTUAL O DEPÓSITO) ---
         # Este es el monto que realmente se debe por el servicio, sin incluir aún el pago que viene en el request
@@ -731,6 +672,7 @@ class RentalFinalizeSerializer(serializers.Serializer): # Cambiado a Serializer
 
         # 3. Actualizar el estado de la renta a 'Finalizado'
         rental.status = 'Finalizado'
+        rental.overdue_charge = self.validated_data.get('calculated_overdue_charge', decimal.Decimal('0.00'))
 
         # 4. Actualizar el estado del vehículo
         rental.vehicle.status = 'Disponible' 
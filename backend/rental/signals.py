@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from rental.models import Rental
+from rental.occupancy import sync_rental
+
+
+@receiver(post_save, sender=Rental)
+def sync_vehicle_occupancy(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_rental(instance)
@@ -1,3 +1,453 @@
-from django.test import TestCase
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from branch.models import Branch
+from payment.models import Payment
+from rental import pricing
+from rental.availability import (
+    VehicleUnavailable, available_vehicles, busy_windows, is_vehicle_available, reserve_vehicle, window_is_free,
+)
+from rental.models import Rental, RentalOverdueSummary, VehicleOccupancy
+from rental.serializers import RentalFinalizeSerializer
+from rental.occupancy import reconcile
+from rental.overdue import sweep_overdue
+from utilities.testing import (
+    auth_headers, create_branch, create_customer, create_rental, create_vehicle, format_local,
+)
+from vehiclecategory.models import VehicleCategory
+
+
+class VehicleAvailabilityTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.branch = create_branch()
+        cls.customer = create_customer()
+        cls.start = timezone.make_aware(datetime(2025, 7, 10, 9, 0))
+        cls.end = cls.start + timedelta(days=3)
+        cls.busy = create_vehicle(1, cls.branch)
+        cls.free = create_vehicle(2, cls.branch)
+        cls.back_to_back = create_vehicle(3, cls.branch)
+        cls.cancelled = create_vehicle(4, cls.branch)
+        cls.in_repair = create_vehicle(5, cls.branch, status="En reparacion")
+
+        create_rental(cls.busy, cls.customer, cls.branch, cls.start + timedelta(days=1), cls.end + timedelta(days=1), status="Activo")
+        create_rental(cls.back_to_back, cls.customer, cls.branch, cls.end, cls.end + timedelta(days=2))
+        create_rental(cls.cancelled, cls.customer, cls.branch, cls.start, cls.end, status="Cancelado")
+
+    def test_available_vehicles_is_an_anti_join(self):
+        with self.assertNumQueries(1):
+            ids = set(available_vehicles(self.start, self.end).values_list('id', flat=True))
+        self.assertEqual(ids, {self.free.id, self.back_to_back.id, self.cancelled.id})
+
+    def test_single_vehicle_check_matches_search(self):
+        self.assertFalse(is_vehicle_available(self.busy, self.start, self.end))
+        self.assertTrue(is_vehicle_available(self.back_to_back, self.start, self.end))
+
+    def test_reserve_vehicle_rechecks_overlaps_under_lock(self):
+        with self.assertRaises(VehicleUnavailable):
+            with reserve_vehicle(self.busy.pk, self.start, self.end):
+                self.fail("No debe entregar un vehículo ocupado.")
+
+        with reserve_vehicle(self.free.pk, self.start, self.end) as vehicle:
+            self.assertEqual(vehicle.pk, self.free.pk)
+
+    def test_filters_by_category_and_branch(self):
+        other_branch = create_branch("Norte")
+        suv = VehicleCategory.objects.create(name="SUV")
+        target = create_vehicle(6, other_branch, category=suv)
+        ids = list(available_vehicles(self.start, self.end, category=suv.id, branch=other_branch.id).values_list('id', flat=True))
+        self.assertEqual(ids, [target.id])
+
+
+class PricingTests(TestCase):
+
+    def setUp(self):
+        self.start = timezone.make_aware(datetime(2025, 7, 10, 9, 0))
+
+    def test_rental_days_counts_started_24h_blocks(self):
+        self.assertEqual(pricing.rental_days(self.start, self.start + timedelta(hours=2)), 1)
+        self.assertEqual(pricing.rental_days(self.start, self.start + timedelta(days=2)), 2)
+        self.assertEqual(pricing.rental_days(self.start, self.start + timedelta(days=2, minutes=1)), 3)
+
+    def test_quote_applies_initial_rate_and_foreign_deposit(self):
+        short = pricing.quote(Decimal("40.00"), "Extranjero", self.start, self.start + timedelta(days=3))
+        self.assertEqual(short.total_price, Decimal("120.00"))
+        self.assertEqual(short.initial_payment, Decimal("60.00"))
+        self.assertEqual(short.due_at_start, Decimal("160.00"))
+
+        long = pricing.quote(Decimal("40.00"), "Nacional", self.start, self.start + timedelta(days=6))
+        self.assertEqual(long.initial_rate, pricing.FULL_PAYMENT_RATE)
+        self.assertEqual(long.due_at_start, Decimal("240.00"))
+
+    def test_overdue_charge_tiers(self):
+        end = self.start
+        self.assertEqual(pricing.overdue_charge(Decimal("10"), end, end + timedelta(hours=5)), (1, Decimal("10.00")))
+        self.assertEqual(pricing.overdue_charge(Decimal("10"), end, end + timedelta(days=5)), (5, Decimal("70.00")))
+        self.assertEqual(pricing.overdue_charge(Decimal("10"), end, end + timedelta(days=12)), (12, Decimal("110.00")))
+
+    def test_settle_adds_overdue_and_fuel_charges_to_the_price(self):
+        branch = create_branch()
+        rental = create_rental(create_vehicle(1, branch), create_customer(), branch, self.start, self.start + timedelta(days=2))
+        on_time = pricing.settle(rental, rental.end_date, "Lleno")
+        self.assertEqual(on_time, pricing.Settlement(0, Decimal("0.00"), Decimal("0.00"), Decimal("80.00")))
+
+        # 5 días tarde: 3 a tarifa normal y 2 al doble; de Lleno a 1/4 son tres niveles.
+        late = pricing.settle(rental, rental.end_date + timedelta(days=5), "1/4")
+        self.assertEqual(late, pricing.Settlement(5, Decimal("280.00"), Decimal("45.00"), Decimal("405.00")))
+
+    def test_projected_balances_use_one_query_for_the_batch(self):
+        branch = create_branch()
+        customer = create_customer()
+        rentals = []
+        for number in range(4):
+            vehicle = create_vehicle(number + 1, branch)
+            rental = create_rental(vehicle, customer, branch, self.start, self.start + timedelta(days=2), total_price="80.00")
+            Payment.objects.create(rental=rental, amount=Decimal("40.00"), payment_type="Efectivo", concept="Anticipo")
+            rentals.append(rental)
+
+        rentals = list(Rental.objects.filter(id__in=[r.id for r in rentals]).select_related('vehicle'))
+        with self.assertNumQueries(1):
+            balances = pricing.projected_balances(rentals, as_of=self.start)
+        self.assertEqual({b.balance for b in balances.values()}, {Decimal("40.00")})
+
+
+class RentalFinalizeSerializerTests(TestCase):
+
+    def setUp(self):
+        branch = create_branch()
+        self.returned = timezone.now().replace(second=0, microsecond=0) - timedelta(minutes=5)
+        # Devuelto 30 horas después de lo pactado: dos días de atraso (80.00) más dos niveles de combustible (30.00).
+        end = self.returned - timedelta(hours=30)
+        self.rental = create_rental(create_vehicle(1, branch), create_customer(), branch, end - timedelta(days=2), end, status="Activo")
+        Payment.objects.create(rental=self.rental, amount=Decimal("40.00"), payment_type="Efectivo", concept="Anticipo")
+
+    def validate(self, final_payment=None):
+        data = {"actual_return_date": format_local(self.returned), "fuel_level_return": "1/2"}
+        if final_payment is not None:
+            data["final_payment"] = {"amount": final_payment, "payment_type": "Efectivo", "concept": "Pago Final"}
+        return RentalFinalizeSerializer(data=data, context={'rental': self.rental})
+
+    def test_final_payment_must_cover_price_and_charges(self):
+        missing = self.validate()
+        self.assertFalse(missing.is_valid())
+        self.assertIn("150.00", str(missing.errors["final_payment"]))
+
+        short = self.validate("100.00")
+        self.assertFalse(short.is_valid())
+        self.assertIn("50.00", str(short.errors["final_payment"]))
+
+        exact = self.validate("150.00")
+        self.assertTrue(exact.is_valid(), exact.errors)
+        self.assertEqual(exact.validated_data["days_overdue"], 2)
+        self.assertEqual(exact.validated_data["calculated_overdue_charge"], Decimal("80.00"))
+        self.assertEqual(exact.validated_data["calculated_fuel_charge"], Decimal("30.00"))
+
+    def test_finished_rentals_are_rejected(self):
+        self.rental.status = "Finalizado"
+        serializer = self.validate("150.00")
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("status", serializer.errors)
+
+
+class BatchQuoteTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='ventas', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='view_rental'))
+        self.headers = auth_headers(user)
+
+        self.branch = create_branch()
+        self.customer = create_customer(customer_type="Extranjero")
+        self.vehicles = [create_vehicle(number, self.branch) for number in range(1, 7)]
+        self.start = timezone.now().replace(second=0, microsecond=0) + timedelta(days=1)
+        create_rental(self.vehicles[0], create_customer(2), self.branch, self.start, self.start + timedelta(days=2))
+
+    def post_batch(self, vehicles):
+        items = [
+            {"vehicle": vehicle.id, "start_date": format_local(self.start), "end_date": format_local(self.start + timedelta(days=3))}
+            for vehicle in vehicles
+        ]
+        return self.client.post(
+            '/api/v1/rental/calculate-price/batch/', {"customer": self.customer.id, "items": items},
+            content_type='application/json', **self.headers,
+        )
+
+    def test_returns_quotes_and_errors_per_item(self):
+        response = self.post_batch(self.vehicles[:2])
+        self.assertEqual(response.status_code, 200, response.content)
+        busy, free = response.json()["data"]
+        self.assertIn("errors", busy)
+        self.assertEqual(free["total_price"], "120.00")
+        self.assertEqual(free["total_amount_due_at_start"], "160.00")
+
+    def test_query_count_does_not_grow_with_items(self):
+        self.post_batch(self.vehicles[:1])
+        with CaptureQueriesContext(connection) as small:
+            self.post_batch(self.vehicles[:2])
+        with CaptureQueriesContext(connection) as large:
+            response = self.post_batch(self.vehicles)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(small), len(large))
+
+
+class OverdueSweepTests(TestCase):
+
+    def test_sweep_marks_overdue_and_matches_pricing_tiers(self):
+        now = timezone.make_aware(datetime(2025, 7, 20, 12, 0))
+        branch = create_branch()
+        customer = create_customer()
+        rentals = {}
+        for number, days_late in enumerate((1, 5, 12, -1), start=1):
+            end = now - timedelta(days=days_late, hours=-1)
+            vehicle = create_vehicle(number, branch, daily_price="10.00")
+            rentals[days_late] = create_rental(vehicle, customer, branch, end - timedelta(days=3), end, status="Activo")
+
+        with CaptureQueriesContext(connection) as queries:
+            summary = sweep_overdue(now)
+        rental_writes = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "rental"')]
+        self.assertEqual(len(rental_writes), 2)
+
+        for days_late, rental in rentals.items():
+            rental.refresh_from_db()
+            if days_late < 0:
+                self.assertEqual(rental.status, "Activo")
+                continue
+            expected = pricing.overdue_charge(Decimal("10.00"), rental.end_date, now)[1]
+            self.assertEqual(rental.status, "Retrasado")
+            self.assertEqual(rental.overdue_charge, expected)
+
+        self.assertEqual(summary.marked_last_run, 3)
+        self.assertEqual(summary.overdue_rentals, 3)
+        self.assertEqual(summary.total_overdue_charge, Decimal("10.00") + Decimal("70.00") + Decimal("110.00"))
+        self.assertEqual(RentalOverdueSummary.objects.get(pk=1).max_days_overdue, 12)
+
+
+class RentalCreateTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='mostrador', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='add_rental'))
+        self.headers = auth_headers(user)
+        self.branch = create_branch()
+        self.vehicle = create_vehicle(1, self.branch)
+        self.start = timezone.now().replace(second=0, microsecond=0) + timedelta(days=1)
+
+    def post_rental(self, customer):
+        return self.client.post('/api/v1/rental/', {
+            "customer": customer.id,
+            "vehicle": self.vehicle.id,
+            "pickup_branch": self.branch.id,
+            "return_branch": self.branch.id,
+            "start_date": format_local(self.start),
+            "end_date": format_local(self.start + timedelta(days=2)),
+            "fuel_level_pickup": "Lleno",
+            "payments_input": [{"amount": "40.00", "payment_type": "Efectivo", "concept": "Anticipo"}],
+        }, content_type='application/json', **self.headers)
+
+    def test_second_booking_of_the_same_window_is_rejected(self):
+        first = self.post_rental(create_customer(1))
+        self.assertEqual(first.status_code, 201, first.content)
+        second = self.post_rental(create_customer(2))
+        self.assertEqual(second.status_code, 400)
+        self.assertEqual(Rental.objects.filter(vehicle=self.vehicle).count(), 1)
+
+    def test_national_limit_applies_to_creation_and_quotes(self):
+        customer = create_customer(1, customer_type="Nacional")
+        for number in range(2, 2 + pricing.NATIONAL_RENTAL_LIMIT - 1):
+            create_rental(create_vehicle(number, self.branch), customer, self.branch, self.start, self.start + timedelta(days=1))
+
+        User.objects.get(username='mostrador').user_permissions.add(Permission.objects.get(codename='view_rental'))
+        quote = self.client.post('/api/v1/rental/calculate-price/', {
+            "customer": customer.id,
+            "vehicle": self.vehicle.id,
+            "start_date": format_local(self.start),
+            "end_date": format_local(self.start + timedelta(days=2)),
+        }, content_type='application/json', **self.headers)
+        self.assertEqual(quote.status_code, 200, quote.content)
+        self.assertEqual(quote.json()["active_rentals_count"], pricing.NATIONAL_RENTAL_LIMIT - 1)
+
+        self.assertEqual(self.post_rental(customer).status_code, 201)
+        self.vehicle = create_vehicle(50, self.branch)
+        response = self.post_rental(customer)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("customer", response.json())
+
+    def test_booking_that_loses_the_race_after_validation_is_a_conflict(self):
+        first = self.post_rental(create_customer(1))
+        self.assertEqual(first.status_code, 201, first.content)
+        # Ambos agentes validaron antes de que el otro guardara: solo la revisión bajo bloqueo lo detecta.
+        with mock.patch('rental.serializers.is_vehicle_available', return_value=True):
+            second = self.post_rental(create_customer(2))
+        self.assertEqual(second.status_code, 409, second.content)
+        self.assertEqual(Rental.objects.filter(vehicle=self.vehicle).count(), 1)
+
+
+class RentalFieldSelectionTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='consulta', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='view_rental'))
+        self.headers = auth_headers(user)
+        branch = create_branch()
+        start = timezone.now() + timedelta(days=1)
+        for number in range(1, 4):
+            rental = create_rental(create_vehicle(number, branch), create_customer(number), branch, start, start + timedelta(days=2))
+            Payment.objects.create(rental=rental, amount=Decimal("40.00"), payment_type="Efectivo", concept="Anticipo", payment_date=start)
+
+    def get_rentals(self, query=""):
+        return self.client.get(f'/api/v1/rental/{query}', **self.headers)
+
+    def test_without_parameters_returns_every_field(self):
+        row = self.get_rentals().json()["data"][0]
+        self.assertIn("payments", row)
+        self.assertIn("created_by_name", row)
+
+    def test_fields_and_expand(self):
+        rows = self.get_rentals("?fields=status,total_price").json()["data"]
+        self.assertEqual(set(rows[0]), {"id", "status", "total_price"})
+
+        rows = self.get_rentals("?projection=list&expand=payments").json()["data"]
+        self.assertIn("customer_name", rows[0])
+        self.assertEqual(rows[0]["payments"][0]["amount"], "40.00")
+
+    def test_unknown_field_is_rejected(self):
+        self.assertEqual(self.get_rentals("?fields=status,secret").status_code, 400)
+        self.assertEqual(self.get_rentals("?projection=huge").status_code, 400)
+
+    @override_settings(API_STREAM_CHUNK_SIZE=2)
+    def test_stream_returns_every_row_in_chunks(self):
+        response = self.get_rentals("?stream=1&projection=list&expand=payments")
+        self.assertTrue(response.streaming)
+        streamed = json.loads(b"".join(response.streaming_content))["data"]
+        listed = self.get_rentals("?projection=list&expand=payments").json()["data"]
+        self.assertEqual(sorted(streamed, key=lambda row: row["id"]), sorted(listed, key=lambda row: row["id"]))
+
+    def add_rental(self, number):
+        branch = Branch.objects.first()
+        start = timezone.now() + timedelta(days=10 + number)
+        rental = create_rental(create_vehicle(number, branch), create_customer(number), branch, start, start + timedelta(days=2))
+        Payment.objects.create(rental=rental, amount=Decimal("40.00"), payment_type="Efectivo", concept="Anticipo", payment_date=start)
+
+    def test_payments_are_prefetched_in_one_query(self):
+        for query in ("", "?projection=list&expand=payments", "?stream=1&expand=payments"):
+            with self.subTest(query=query):
+                response = self.get_rentals(query)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.get_rentals(query)
+                    if response.streaming:
+                        b"".join(response.streaming_content)
+                self.assertEqual(response.status_code, 200)
+                payment_queries = [entry["sql"] for entry in queries if 'FROM "payment"' in entry["sql"]]
+                self.assertEqual(len(payment_queries), 1)
+
+        # El número de consultas no depende de cuántos alquileres haya.
+        self.get_rentals("?expand=payments")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_rentals("?expand=payments")
+        for number in range(4, 8):
+            self.add_rental(number)
+        with self.assertNumQueries(len(queries)):
+            rows = self.get_rentals("?expand=payments").json()["data"]
+        self.assertEqual(len(rows), 7)
+        self.assertTrue(all(len(row["payments"]) == 1 for row in rows))
+
+    def test_omitting_payments_skips_the_prefetch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_rentals("?fields=status,customer_name")
+        self.assertEqual(response.status_code, 200)
+        sql = " ".join(query["sql"] for query in queries)
+        self.assertNotIn('"payment"', sql)
+        self.assertNotIn('"remarks"', sql)
+
+
+class VehicleOccupancyTests(TestCase):
+
+    def setUp(self):
+        self.branch = create_branch()
+        self.vehicle = create_vehicle(1, self.branch)
+        self.customer = create_customer()
+        self.start = timezone.make_aware(datetime(2025, 7, 10, 9, 0))
+
+    def days(self, rental):
+        return sorted(VehicleOccupancy.objects.filter(rental=rental).values_list('day', flat=True))
+
+    def test_rows_follow_rental_changes(self):
+        rental = create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(days=3))
+        self.assertEqual(self.days(rental), [datetime(2025, 7, d).date() for d in (10, 11, 12)])
+
+        rental.end_date = self.start + timedelta(days=1)
+        rental.save()
+        self.assertEqual(self.days(rental), [datetime(2025, 7, 10).date()])
+
+        rental.status = "Cancelado"
+        rental.save()
+        self.assertEqual(self.days(rental), [])
+
+    def test_return_day_is_free_for_the_next_rental(self):
+        first = create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(days=2))
+        second_start = self.start + timedelta(days=2, hours=3)
+        self.assertTrue(is_vehicle_available(self.vehicle, second_start, second_start + timedelta(days=1)))
+        # Se traslapa por horas el día de devolución del primero.
+        self.assertFalse(is_vehicle_available(self.vehicle, self.start + timedelta(days=2, hours=-1), second_start))
+
+        with reserve_vehicle(self.vehicle.pk, second_start, second_start + timedelta(days=1)):
+            second = create_rental(self.vehicle, self.customer, self.branch, second_start, second_start + timedelta(days=1))
+        self.assertNotEqual(self.days(first)[-1], self.days(second)[0])
+
+    def test_same_day_is_rejected_by_the_unique_key(self):
+        create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(hours=2))
+        later = self.start + timedelta(hours=4)
+        with self.assertRaises(VehicleUnavailable):
+            with reserve_vehicle(self.vehicle.pk, later, later + timedelta(days=1)):
+                create_rental(self.vehicle, self.customer, self.branch, later, later + timedelta(days=1))
+        self.assertEqual(Rental.objects.count(), 1)
+
+    def test_a_rental_takes_the_whole_day_like_the_unique_key(self):
+        create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(hours=2))
+        afternoon = self.start + timedelta(hours=5)
+        self.assertFalse(is_vehicle_available(self.vehicle, afternoon, afternoon + timedelta(hours=3)))
+        self.assertNotIn(self.vehicle, available_vehicles(afternoon, afternoon + timedelta(hours=3)))
+        windows = busy_windows([self.vehicle.id], afternoon, afternoon + timedelta(days=2))
+        self.assertFalse(window_is_free(windows[self.vehicle.id], afternoon, afternoon + timedelta(hours=3)))
+        self.assertTrue(is_vehicle_available(self.vehicle, self.start + timedelta(days=1), self.start + timedelta(days=2)))
+
+    def test_redating_onto_a_taken_day_is_a_conflict(self):
+        user = User.objects.create_user(username='recepcion', password='secreta123')
+        user.user_permissions.add(Permission.objects.get(codename='change_rental'))
+        headers = auth_headers(user)
+        start = timezone.now().replace(second=0, microsecond=0) + timedelta(days=5)
+        create_rental(self.vehicle, self.customer, self.branch, start, start + timedelta(hours=2))
+        rental = create_rental(self.vehicle, create_customer(2), self.branch, start + timedelta(days=3), start + timedelta(days=4))
+
+        # La validación del serializador pasa (otra solicitud tomó el día entre medias): decide la revisión bajo bloqueo.
+        with mock.patch('rental.serializers.is_vehicle_available', return_value=True):
+            response = self.client.put(f'/api/v1/rental/{rental.id}/', {
+                "customer": rental.customer_id,
+                "vehicle": self.vehicle.id,
+                "pickup_branch": self.branch.id,
+                "return_branch": self.branch.id,
+                "start_date": format_local(start + timedelta(hours=5)),
+                "end_date": format_local(start + timedelta(days=1)),
+                "fuel_level_pickup": "Lleno",
+            }, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 409, response.content)
+        rental.refresh_from_db()
+        self.assertEqual(rental.start_date, start + timedelta(days=3))
+
+    def test_reconcile_restores_missing_rows(self):
+        rental = create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(days=2))
+        VehicleOccupancy.objects.all().delete()
+
+        missing, extra, conflicts = reconcile(apply=True)
+        self.assertEqual((len(missing), len(extra), conflicts), (2, 0, []))
+        self.assertEqual(len(self.days(rental)), 2)
+        self.assertEqual(reconcile()[:2], (set(), set()))
@@ -12,6 +12,8 @@ urlpatterns = [
     
     # Acciones personalizadas
     path('rental/calculate-price/', RentalCalculatePriceAPIView.as_view(), name='rental-calculate-price'),
+    path('rental/calculate-price/batch/', RentalBatchCalculatePriceAPIView.as_view(), name='rental-calculate-price-batch'),
+    path('rental/overdue/summary/', RentalOverdueSummaryAPIView.as_view(), name='rental-overdue-summary'),
     path('rental/<int:pk>/finalize/', RentalFinalizeAPIView.as_view(), name='rental-finalize'),
     path('rental/<int:pk>/add-payment/', RentalAddPaymentAPIView.as_view(), name='rental-add-payment'),
 ]
\ No newline at end of file
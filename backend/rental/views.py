@@ -1,29 +1,33 @@
 # rental/views.py
 
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse, StreamingJsonResponse
 from http import HTTPStatus
-import decimal
 from django.db import transaction
 from rest_framework import serializers
 
 # Importa tus modelos
-from rental.models import Rental
+from rental.models import Rental, RentalOverdueSummary
 from customer.models import Customer
 from vehicle.models import Vehicle
 from payment.models import Payment
 
 # Importa tus serializadores
 from rental.serializers import RentalSerializer, RentalFinalizeSerializer
+from rental.availability import BLOCKING_STATUSES, VehicleUnavailable, is_vehicle_available, busy_windows, window_is_free, reserve_vehicle
+from rental import pricing
 from payment.serializers import PaymentSerializer
 
 # Importa tus decoradores y permisos personalizados
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.sparse_fields import InvalidFieldSelection
 
 # Otras importaciones necesarias para tus validaciones y cálculos
 from django.utils import timezone
 from datetime import timedelta
 from django.db.models import Sum
+from django.conf import settings
 
 # --- SERIALIZADOR PARA CALCULAR PRECIO (sin cambios relevantes) ---
 class RentalCalculatePriceInputSerializer(serializers.Serializer):
@@ -39,6 +43,68 @@ class RentalCalculatePriceInputSerializer(serializers.Serializer):
     )
 
 
+class RentalBatchQuoteItemSerializer(serializers.Serializer):
+    vehicle = serializers.IntegerField(required=True)
+    start_date = serializers.DateTimeField(
+        input_formats=['%d-%m-%Y %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'],
+        default_timezone=timezone.get_current_timezone()
+    )
+    end_date = serializers.DateTimeField(
+        input_formats=['%d-%m-%Y %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'],
+        default_timezone=timezone.get_current_timezone()
+    )
+
+
+class RentalBatchQuoteInputSerializer(serializers.Serializer):
+    customer = serializers.IntegerField(required=True)
+    items = RentalBatchQuoteItemSerializer(many=True, allow_empty=False)
+
+    def validate_items(self, value):
+        max_items = getattr(settings, 'RENTAL_BATCH_QUOTE_MAX_ITEMS', 50)
+        if len(value) > max_items:
+            raise serializers.ValidationError(f"No se pueden cotizar más de {max_items} combinaciones por solicitud.")
+        return value
+
+
+def create_rental(request, default_status, message):
+    """
+    Flujo común de creación. Las validaciones (cliente, fechas, precio, pagos)
+    corren fuera de la transacción; solo la revisión final de traslapes y los
+    INSERT se hacen con la fila del vehículo bloqueada.
+    """
+    data = request.data.copy()
+    if 'status' not in data:
+        data['status'] = default_status
+
+    serializer = RentalSerializer(data=data, context={'request': request})
+    try:
+        serializer.is_valid(raise_exception=True)
+
+        user_id = request.user.id if request.user.is_authenticated else None
+        validated_data = serializer.validated_data
+
+        with reserve_vehicle(validated_data['vehicle'].pk, validated_data['start_date'], validated_data['end_date']) as vehicle:
+            validated_data['vehicle'] = vehicle
+            rental = serializer.save(created_by=user_id)
+
+        response_data = {
+            "id": rental.id,
+            "message": message,
+            "rental_details": RentalSerializer(rental).data
+        }
+        return JsonResponse(response_data, status=HTTPStatus.CREATED)
+
+    except VehicleUnavailable as e:
+        return JsonResponse({"vehicle": [str(e)]}, status=HTTPStatus.CONFLICT)
+    except Exception as e:
+        if hasattr(e, 'detail'):
+            return JsonResponse(e.detail, status=HTTPStatus.BAD_REQUEST)
+        return JsonResponse(
+            {"status": "error", "message": f"Ocurrió un error al procesar la solicitud: {e}"},
+            status=HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+
 # --- Vistas de Alquiler ---
 
 class RentalRC(APIView):
@@ -49,18 +115,27 @@ class RentalRC(APIView):
     @authenticate_user(required_permission='rental.view_rental')
     def get(self, request):
         try:
-            # === CORRECCIÓN APLICADA AQUÍ: prefetch_related('payment_set') es CORRECTO ===
-            # Dado que el ForeignKey en Payment se llama 'rental', el related_name por defecto es 'payment_set'.
-            data = Rental.objects.filter(active=True).select_related(
-                'customer',
-                'vehicle',
-                'pickup_branch',
-                'return_branch'
-            ).prefetch_related(
-                'payment_set' # Nombre correcto del RelatedManager para Payment en Rental
+            fields = RentalSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            # select_related / prefetch_related('payment_set') / only() según los campos pedidos:
+            # sin 'payments' no se precargan los pagos.
+            data = RentalSerializer.prepare_queryset(
+                Rental.objects.filter(active=True), fields, extra=('start_date',)
             ).order_by('-start_date')
 
-            serializer = RentalSerializer(data, many=True)
+            paginator = KeysetPagination(ordering=('-start_date', '-id'))
+            if request.GET.get('stream') == '1':
+                # Listado completo por bloques (exportaciones, sincronización sin conexión).
+                chunks = paginator.iterate_chunks(data, getattr(settings, 'API_STREAM_CHUNK_SIZE', 500))
+                return StreamingJsonResponse(chunks, lambda rows: RentalSerializer(rows, many=True, fields=fields).data)
+            response = paginator.respond(request, data, lambda page: RentalSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = RentalSerializer(data, many=True, fields=fields)
             return JsonResponse({
                 "data": serializer.data
             }, status=HTTPStatus.OK)
@@ -76,33 +151,7 @@ class RentalRC(APIView):
         Maneja las solicitudes POST para crear un nuevo alquiler en estado 'Reservado' (por defecto).
         Este endpoint NO espera ni procesa pagos iniciales anidados.
         """
-        with transaction.atomic():
-            data = request.data.copy()
-            if 'status' not in data:
-                data['status'] = 'Reservado'
-
-            serializer = RentalSerializer(data=data, context={'request': request})
-            try:
-                serializer.is_valid(raise_exception=True)
-
-                user_id = request.user.id if request.user.is_authenticated else None
-
-                rental = serializer.save(created_by=user_id)
-
-                response_data = {
-                    "id": rental.id,
-                    "message": "Renta creada en estado 'Reservado'.",
-                    "rental_details": RentalSerializer(rental).data
-                }
-                return JsonResponse(response_data, status=HTTPStatus.CREATED)
-
-            except Exception as e:
-                if hasattr(e, 'detail'):
-                    return JsonResponse(e.detail, status=HTTPStatus.BAD_REQUEST)
-                return JsonResponse(
-                    {"status": "error", "message": f"Ocurrió un error al procesar la solicitud: {e}"},
-                    status=HTTPStatus.INTERNAL_SERVER_ERROR
-                )
+        return create_rental(request, 'Reservado', "Renta creada en estado 'Reservado'.")
 
 # --- VISTA PARA CREAR RENTA CON PAGO INICIAL ATÓMICAMENTE ---
 class RentalCreateWithInitialPaymentAPIView(APIView):
@@ -112,33 +161,7 @@ class RentalCreateWithInitialPaymentAPIView(APIView):
     """
     @authenticate_user(required_permission='rental.add_rental')
     def post(self, request):
-        with transaction.atomic():
-            data = request.data.copy()
-            if 'status' not in data:
-                data['status'] = 'Activo'
-
-            serializer = RentalSerializer(data=data, context={'request': request})
-            try:
-                serializer.is_valid(raise_exception=True)
-
-                user_id = request.user.id if request.user.is_authenticated else None
-
-                rental = serializer.save(created_by=user_id)
-
-                response_data = {
-                    "id": rental.id,
-                    "message": "Renta y pago(s) inicial(es) registrados exitosamente.",
-                    "rental_details": RentalSerializer(rental).data
-                }
-                return JsonResponse(response_data, status=HTTPStatus.CREATED)
-
-            except Exception as e:
-                if hasattr(e, 'detail'):
-                    return JsonResponse(e.detail, status=HTTPStatus.BAD_REQUEST)
-                return JsonResponse(
-                    {"status": "error", "message": f"Ocurrió un error al procesar la solicitud: {e}"},
-                    status=HTTPStatus.INTERNAL_SERVER_ERROR
-                )
+        return create_rental(request, 'Activo', "Renta y pago(s) inicial(es) registrados exitosamente.")
 
 # --- RESTO DE VISTAS ---
 
@@ -146,10 +169,13 @@ class RentalRetrieveUpdateDestroy(APIView):
     @authenticate_user(required_permission='rental.view_rental')
     def get(self, request, pk):
         try:
-            # === CORRECCIÓN APLICADA AQUÍ: prefetch_related('payment_set') es CORRECTO ===
-            # Dado que el ForeignKey en Payment se llama 'rental', el related_name por defecto es 'payment_set'.
-            rental = Rental.objects.prefetch_related('payment_set').get(pk=pk, active=True)
-            serializer = RentalSerializer(rental)
+            fields = RentalSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            rental = RentalSerializer.prepare_queryset(Rental.objects.all(), fields).get(pk=pk, active=True)
+            serializer = RentalSerializer(rental, fields=fields)
             return JsonResponse(serializer.data, status=HTTPStatus.OK)
         except Rental.DoesNotExist:
             return JsonResponse({"detail": "Renta no encontrada o inactiva."}, status=HTTPStatus.NOT_FOUND)
@@ -161,25 +187,34 @@ class RentalRetrieveUpdateDestroy(APIView):
 
     @authenticate_user(required_permission='rental.change_rental')
     def put(self, request, pk):
-        with transaction.atomic():
-            try:
-                rental = Rental.objects.get(pk=pk, active=True)
-                serializer = RentalSerializer(rental, data=request.data, partial=True, context={'request': request})
-                serializer.is_valid(raise_exception=True)
-
-                user_id = request.user.id if request.user.is_authenticated else None
-                rental_updated = serializer.save(modified_by=user_id)
+        try:
+            rental = Rental.objects.get(pk=pk, active=True)
+            serializer = RentalSerializer(rental, data=request.data, partial=True, context={'request': request})
+            serializer.is_valid(raise_exception=True)
 
-                return JsonResponse(RentalSerializer(rental_updated).data, status=HTTPStatus.OK)
-            except Rental.DoesNotExist:
-                return JsonResponse({"detail": "Renta no encontrada o inactiva."}, status=HTTPStatus.NOT_FOUND)
-            except Exception as e:
-                if hasattr(e, 'detail'):
-                    return JsonResponse(e.detail, status=HTTPStatus.BAD_REQUEST)
-                return JsonResponse(
-                    {"status": "error", "message": f"Ocurrió un error al procesar la solicitud: {e}"},
-                    status=HTTPStatus.INTERNAL_SERVER_ERROR
-                )
+            user_id = request.user.id if request.user.is_authenticated else None
+            validated_data = serializer.validated_data
+            if validated_data.get('status', rental.status) in BLOCKING_STATUSES:
+                # Mismo camino que la creación: fila del vehículo bloqueada y traslapes revisados de nuevo.
+                with reserve_vehicle(validated_data['vehicle'].pk, validated_data['start_date'], validated_data['end_date'], exclude_id=rental.id) as vehicle:
+                    validated_data['vehicle'] = vehicle
+                    rental_updated = serializer.save(modified_by=user_id)
+            else:
+                with transaction.atomic():
+                    rental_updated = serializer.save(modified_by=user_id)
+
+            return JsonResponse(RentalSerializer(rental_updated).data, status=HTTPStatus.OK)
+        except Rental.DoesNotExist:
+            return JsonResponse({"detail": "Renta no encontrada o inactiva."}, status=HTTPStatus.NOT_FOUND)
+        except VehicleUnavailable as e:
+            return JsonResponse({"vehicle": [str(e)]}, status=HTTPStatus.CONFLICT)
+        except Exception as e:
+            if hasattr(e, 'detail'):
+                return JsonResponse(e.detail, status=HTTPStatus.BAD_REQUEST)
+            return JsonResponse(
+                {"status": "error", "message": f"Ocurrió un error al procesar la solicitud: {e}"},
+                status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
 
     @authenticate_user(required_permission='rental.delete_rental')
     def delete(self, request, pk):
@@ -188,7 +223,7 @@ class RentalRetrieveUpdateDestroy(APIView):
                 rental = Rental.objects.get(pk=pk, active=True)
 
                 # Lógica para manejar el estado del vehículo al eliminar una renta
-                if rental.status in ['Activo', 'Reservado']:
+                if rental.status in BLOCKING_STATUSES:
                     vehicle = rental.vehicle
                     vehicle.status = 'Disponible'  # Asumimos que se libera el vehículo
                     vehicle.save()
@@ -299,15 +334,7 @@ class RentalCalculatePriceAPIView(APIView):
         if not vehicle.active:
             errors.append("El vehículo no está activo.")
 
-        conflicting_rentals = Rental.objects.filter(
-            vehicle=vehicle,
-            end_date__gt=start_date,
-            start_date__lt=end_date,
-            status__in=['Activo', 'Reservado'],
-            active=True
-        ).exists()
-
-        if conflicting_rentals:
+        if not is_vehicle_available(vehicle, start_date, end_date):
             errors.append("El vehículo no está disponible para las fechas seleccionadas debido a un alquiler existente.")
 
         if vehicle.status != 'Disponible':
@@ -315,14 +342,13 @@ class RentalCalculatePriceAPIView(APIView):
 
         active_rentals_count = Rental.objects.filter(
             customer=customer,
-            status__in=['Activo', 'Reservado'],
+            status__in=BLOCKING_STATUSES,
             active=True
         ).count()
 
-        if customer.customer_type == 'nacional' and active_rentals_count >= 5:
-            errors.append(f"Cliente nacional ya ha alcanzado el límite de {active_rentals_count} de 5 vehículos simultáneos.")
-        elif customer.customer_type == 'extranjero' and active_rentals_count >= 3:
-            errors.append(f"Cliente extranjero ya ha alcanzado el límite de {active_rentals_count} de 3 vehículos simultáneos.")
+        limit_error = pricing.customer_limit_error(customer, active_rentals_count)
+        if limit_error:
+            errors.append(limit_error)
 
         if not errors:
             if vehicle.daily_price is None or vehicle.daily_price <= 0:
@@ -334,91 +360,132 @@ class RentalCalculatePriceAPIView(APIView):
                 errors.append("El tipo de cliente es desconocido.")
 
             if not errors:
-                try:
-                    duration = end_date - start_date
-
-                    duration_days = duration.days
+                rental_quote = pricing.quote(vehicle, customer.customer_type, start_date, end_date)
+                if rental_quote.duration_days <= 0:
+                    errors.append("La duración del alquiler debe ser al menos un día.")
+                else:
+                    response_data['total_price'] = rental_quote.total_price
+                    response_data['required_initial_rental_payment'] = rental_quote.initial_payment
+                    response_data['deposit_required'] = rental_quote.deposit
+                    response_data['total_amount_due_at_start'] = rental_quote.due_at_start
+                    response_data['active_rentals_count'] = active_rentals_count
 
-                    if duration.seconds > 0 or (duration.days == 0 and duration.total_seconds() > 0):
-                        duration_days += 1
-
-                    if duration_days == 0 and duration.total_seconds() > 0:
-                        duration_days = 1
-
-                    if duration_days <= 0:
-                        errors.append("La duración del alquiler debe ser al menos un día.")
-                    else:
-                        daily_price = decimal.Decimal(str(vehicle.daily_price))
-                        total_price = daily_price * decimal.Decimal(str(duration_days))
-                        response_data['total_price'] = total_price.quantize(decimal.Decimal('0.01'))
-
-                        required_initial_payment_percentage = decimal.Decimal('0.50')
-                        if duration_days > 5:
-                            required_initial_payment_percentage = decimal.Decimal('1.00')
-
-                        required_initial_rental_payment = total_price * required_initial_payment_percentage
-                        response_data['required_initial_rental_payment'] = required_initial_rental_payment.quantize(decimal.Decimal('0.01'))
-
-                        deposit_required = decimal.Decimal('0.00')
-                        if customer_type_normalized == 'extranjero':
-                            deposit_required = decimal.Decimal('100.00')
-                        response_data['deposit_required'] = deposit_required.quantize(decimal.Decimal('0.01'))
-
-                        response_data['total_amount_due_at_start'] = (required_initial_rental_payment + deposit_required).quantize(decimal.Decimal('0.01'))
-
-                except Exception as calc_error:
-                    errors.append(f"Error durante el cálculo del precio: {str(calc_error)}")
-
-        if not errors:
-            if vehicle.daily_price is None or vehicle.daily_price <= 0:
-                errors.append("El precio diario del vehículo es inválido o no está configurado.")
-
-            customer_type_normalized = customer.customer_type.lower() if customer.customer_type else ''
-
-            if customer_type_normalized not in ['nacional', 'extranjero']:
-                errors.append("El tipo de cliente es desconocido.")
-
-            if not errors:
-                try:
-                    duration = end_date - start_date
-
-                    duration_days = duration.days
-
-                    if duration.seconds > 0 or (duration.days == 0 and duration.total_seconds() > 0):
-                        duration_days += 1
-
-                    if duration_days == 0 and duration.total_seconds() > 0:
-                        duration_days = 1
-
-                    if duration_days <= 0:
-                        errors.append("La duración del alquiler debe ser al menos un día.")
-                    else:
-                        daily_price = decimal.Decimal(str(vehicle.daily_price))
-                        total_price = daily_price * decimal.Decimal(str(duration_days))
-                        response_data['total_price'] = total_price.quantize(decimal.Decimal('0.01'))
+        if errors:
+            return JsonResponse({"detail": errors}, status=HTTPStatus.BAD_REQUEST)
+        else:
+            return JsonResponse(response_data, status=HTTPStatus.OK)
 
-                        required_initial_payment_percentage = decimal.Decimal('0.50')
-                        if duration_days > 5:
-                            required_initial_payment_percentage = decimal.Decimal('1.00')
+class RentalBatchCalculatePriceAPIView(APIView):
+    """
+    Cotiza varias combinaciones (vehículo, inicio, fin) para un mismo cliente.
+    Las combinaciones son alternativas: no se validan entre sí, solo contra los
+    alquileres existentes. Usa un número fijo de consultas sin importar cuántas
+    combinaciones se envíen.
+    """
+    @authenticate_user(required_permission='rental.view_rental')
+    def post(self, request):
+        serializer = RentalBatchQuoteInputSerializer(data=request.data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=HTTPStatus.BAD_REQUEST)
 
-                        required_initial_rental_payment = total_price * required_initial_payment_percentage
-                        response_data['required_initial_rental_payment'] = required_initial_rental_payment.quantize(decimal.Decimal('0.01'))
+        customer_id = serializer.validated_data['customer']
+        items = serializer.validated_data['items']
 
-                        deposit_required = decimal.Decimal('0.00')
-                        if customer_type_normalized == 'extranjero':
-                            deposit_required = decimal.Decimal('100.00')
-                        response_data['deposit_required'] = deposit_required.quantize(decimal.Decimal('0.01'))
+        customer = Customer.objects.filter(id=customer_id).first()
+        if customer is None:
+            return JsonResponse({"detail": "ID de cliente inválido."}, status=HTTPStatus.BAD_REQUEST)
 
-                        response_data['total_amount_due_at_start'] = (required_initial_rental_payment + deposit_required).quantize(decimal.Decimal('0.01'))
-                        
-                        # --- ¡AÑADE ESTA LÍNEA! ---
-                        response_data['active_rentals_count'] = active_rentals_count 
-                        # --- FIN DEL CAMBIO ---
+        errors = []
+        if customer.status == 'lista_negra':
+            errors.append("El cliente está en la lista negra y no puede alquilar vehículos.")
+        if not customer.active:
+            errors.append("El cliente no está activo.")
+        if customer.customer_type and customer.customer_type.lower() not in ['nacional', 'extranjero']:
+            errors.append("El tipo de cliente es desconocido.")
 
-                except Exception as calc_error:
-                    errors.append(f"Error durante el cálculo del precio: {str(calc_error)}")
+        active_rentals_count = Rental.objects.filter(
+            customer=customer,
+            status__in=BLOCKING_STATUSES,
+            active=True
+        ).count()
+        limit_error = pricing.customer_limit_error(customer, active_rentals_count)
+        if limit_error:
+            errors.append(limit_error)
 
         if errors:
             return JsonResponse({"detail": errors}, status=HTTPStatus.BAD_REQUEST)
-        else:
-            return JsonResponse(response_data, status=HTTPStatus.OK)
\ No newline at end of file
+
+        vehicle_ids = {item['vehicle'] for item in items}
+        vehicles = Vehicle.objects.in_bulk(vehicle_ids)
+        windows = busy_windows(
+            vehicle_ids,
+            min(item['start_date'] for item in items),
+            max(item['end_date'] for item in items),
+        )
+
+        now = timezone.now()
+        results = []
+        for index, item in enumerate(items):
+            start_date = item['start_date']
+            end_date = item['end_date']
+            vehicle = vehicles.get(item['vehicle'])
+            item_errors = []
+
+            if start_date < now - timedelta(minutes=1):
+                item_errors.append("La fecha de inicio no puede ser en el pasado.")
+            if end_date <= start_date:
+                item_errors.append("La fecha de fin debe ser posterior a la fecha de inicio.")
+
+            if vehicle is None:
+                item_errors.append("ID de vehículo inválido.")
+            else:
+                if not vehicle.active:
+                    item_errors.append("El vehículo no está activo.")
+                if vehicle.status != 'Disponible':
+                    item_errors.append(f"El vehículo está actualmente marcado como no disponible en su estado general: {vehicle.status}.")
+                if vehicle.daily_price is None or vehicle.daily_price <= 0:
+                    item_errors.append("El precio diario del vehículo es inválido o no está configurado.")
+                if not window_is_free(windows.get(vehicle.id, []), start_date, end_date):
+                    item_errors.append("El vehículo no está disponible para las fechas seleccionadas debido a un alquiler existente.")
+
+            result = {
+                "index": index,
+                "vehicle": item['vehicle'],
+                "start_date": start_date,
+                "end_date": end_date,
+            }
+            if item_errors:
+                result["errors"] = item_errors
+            else:
+                rental_quote = pricing.quote(vehicle, customer.customer_type, start_date, end_date)
+                result.update({
+                    "duration_days": rental_quote.duration_days,
+                    "total_price": rental_quote.total_price,
+                    "required_initial_rental_payment": rental_quote.initial_payment,
+                    "deposit_required": rental_quote.deposit,
+                    "total_amount_due_at_start": rental_quote.due_at_start,
+                })
+            results.append(result)
+
+        return JsonResponse({"customer": customer.id, "data": results}, status=HTTPStatus.OK)
+
+
+class RentalOverdueSummaryAPIView(APIView):
+    """
+    Resumen de alquileres retrasados calculado por el último barrido
+    (`sweep_overdue_rentals`). No recorre la tabla de alquileres.
+    """
+    @authenticate_user(required_permission='rental.view_rental')
+    def get(self, request):
+        summary = RentalOverdueSummary.objects.filter(pk=1).first() or RentalOverdueSummary()
+        return JsonResponse({
+            "data": {
+                "overdue_rentals": summary.overdue_rentals,
+                "overdue_customers": summary.overdue_customers,
+                "total_overdue_charge": summary.total_overdue_charge,
+                "max_days_overdue": summary.max_days_overdue,
+                "oldest_end_date": summary.oldest_end_date,
+                "marked_last_run": summary.marked_last_run,
+                "computed_at": summary.computed_at,
+            }
+        }, status=HTTPStatus.OK)
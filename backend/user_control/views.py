@@ -1,5 +1,6 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse, Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.contrib.auth.models import User #Django´s Model
 import uuid
@@ -19,7 +20,8 @@ import time
 
 
 from .models import *
-from utilities.utilities import sendMail
+from mail_outbox.utils import enqueue_mail
+from company.profile import mail_signature
 #log_error es el que se encarga de guardar el error en la bitacora
 from error_log.utils import log_error
 #rollback
@@ -165,12 +167,13 @@ class Register(APIView):
                             <p style="font-size: 12px; color: #aaa; text-align: center;">
                                 Si no solicitaste esta cuenta, puedes ignorar este mensaje.
                             </p>
+                            {mail_signature()}
                         </div>
                     </div>
                 """
 
-                # Si falla el envío de correo, se lanzará una excepción y se revertirá la transacción
-                sendMail(
+                # El correo se encola dentro de la transacción: solo se envía si el usuario se crea
+                enqueue_mail(
                     html_content=html,
                     subject="Verificación de Cuenta",
                     recipient_email=email
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UserHelperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user_helper'
+
+    def ready(self):
+        from user_helper import signals  # noqa: F401
@@ -1,3 +1,56 @@
-from django.test import TestCase
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from utilities.auth_cache import PrincipalCache, principal_cache
+from utilities.testing import auth_headers
+
+
+class AuthCacheTests(TestCase):
+
+    def setUp(self):
+        principal_cache.invalidate_all()
+        self.user = User.objects.create_user(username='cajero', password='secreta123', first_name='Caja')
+        self.headers = auth_headers(self.user)
+
+    def get_stats(self):
+        return self.client.get('/api/v1/user/auth-cache/stats', **self.headers)
+
+    def grant(self, codename):
+        self.user.user_permissions.add(Permission.objects.get(codename=codename))
+
+    def test_permissions_are_cached_between_requests(self):
+        self.grant('view_user')
+        self.assertEqual(self.get_stats().status_code, 200)
+
+        with self.assertNumQueries(0):
+            response = self.get_stats()
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.json()["data"]["principal_hits"], 1)
+
+    def test_permission_changes_invalidate_cache(self):
+        self.assertEqual(self.get_stats().status_code, 403)
+        self.grant('view_user')
+        self.assertEqual(self.get_stats().status_code, 200)
+
+        self.user.user_permissions.clear()
+        self.assertEqual(self.get_stats().status_code, 403)
+
+    def test_user_save_invalidates_cache(self):
+        self.grant('view_user')
+        self.assertEqual(self.get_stats().status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_stats().status_code, 403)
+
+    @override_settings(AUTH_CACHE_ALIAS='default')
+    def test_invalidate_all_keeps_other_cache_entries(self):
+        shared = PrincipalCache()
+        shared.store_principal(self.user)
+        cache.set('catalog:version:brand.brand', 42)
+        self.assertIsNotNone(shared.get_principal(self.user.id))
+
+        shared.invalidate_all()
+        self.assertIsNone(shared.get_principal(self.user.id))
+        self.assertEqual(cache.get('catalog:version:brand.brand'), 42)
@@ -8,4 +8,6 @@ urlpatterns = [
     path('user/delete/<int:id>', UserD.as_view()),
     path('user/edit/password', EditPassword.as_view()),
     path('user/permission', UserPermissionsView.as_view()),
+    path('user/auth-cache/stats', AuthCacheStatsView.as_view()),
+    path('user/catalog-cache/stats', CatalogCacheStatsView.as_view()),
 ]
\ No newline at end of file
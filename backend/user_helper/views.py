@@ -1,11 +1,10 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse, Http404
+from django.http import Http404
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.utils.text import slugify
 from django.utils.dateformat import DateFormat
 from dotenv import load_dotenv
-from jose import jwt
-from django.conf import settings
 from django.contrib.auth.models import User, Permission
 from simple_history.utils import update_change_reason
 from django.contrib.auth import authenticate
@@ -20,6 +19,8 @@ from user_helper.serializers import *
 from user_control.models import *
 from error_log.utils import log_error
 from utilities.decorators import authenticate_user
+from utilities.auth_cache import principal_cache
+from utilities.catalog_cache import catalog_cache
 import re
 
 from rest_framework import status as drf_status
@@ -364,25 +365,8 @@ class UserPermissionsView(APIView):
 
     @authenticate_user()
     def get(self, request):
-        auth_header = request.headers.get('Authorization')
-
-        token = auth_header.split(" ")[1]
-        decoded_token = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS512'])
-
-        user_id = decoded_token.get("id")
-        if not user_id:
-            return JsonResponse({
-                "estado": "error",
-                "mensaje": "Acceso no autorizado - ID de usuario no encontrado en el token"
-            }, status=drf_status.HTTP_401_UNAUTHORIZED)
-
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return JsonResponse({
-                "estado": "error",
-                "mensaje": "Acceso no autorizado - Usuario no encontrado"
-            }, status=drf_status.HTTP_401_UNAUTHORIZED)
+        # El decorador ya resolvió el usuario (desde la caché de autenticación).
+        user = request.user
 
         if not user.is_active:
             return JsonResponse({
@@ -397,4 +381,18 @@ class UserPermissionsView(APIView):
 
             permissions_list = sorted(list(user_permissions_set))
             
-            return JsonResponse({"permissions": permissions_list}, status=drf_status.HTTP_200_OK)
\ No newline at end of file
+            return JsonResponse({"permissions": permissions_list}, status=drf_status.HTTP_200_OK)
+
+
+class AuthCacheStatsView(APIView):
+
+    @authenticate_user(required_permission='auth.view_user')
+    def get(self, request):
+        return JsonResponse({"data": principal_cache.stats()}, status=HTTPStatus.OK)
+
+
+class CatalogCacheStatsView(APIView):
+
+    @authenticate_user(required_permission='auth.view_user')
+    def get(self, request):
+        return JsonResponse({"data": catalog_cache.stats()}, status=HTTPStatus.OK)
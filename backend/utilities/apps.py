@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class UtilitiesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'utilities'
+
+    def ready(self):
+        from utilities import checks  # noqa: F401
@@ -0,0 +1,105 @@
+from django.contrib.auth.models import User
+from django.db import models
+from rest_framework import serializers
+
+AUDIT_USER_FIELDS = ('created_by', 'modified_by')
+AUDIT_NAME_FIELDS = {'created_by_name', 'modified_by_name'}
+
+# Columnas que necesitan los nombres de auditoría (ver SparseFieldsMixin).
+AUDIT_FIELD_DEPENDENCIES = {'created_by_name': ('created_by',), 'modified_by_name': ('modified_by',)}
+
+
+class AuditUserResolver:
+    """
+    Resuelve en lote los usuarios de auditoría (created_by / modified_by).
+
+    Los IDs pendientes se consultan con un único query y los resultados
+    (incluidos los IDs inexistentes) quedan en caché mientras viva el resolver.
+    """
+
+    def __init__(self):
+        self._users = {}
+
+    def prime(self, instances):
+        pending = set()
+        for obj in instances:
+            for field in AUDIT_USER_FIELDS:
+                user_id = getattr(obj, field, None)
+                if user_id is not None and user_id not in self._users:
+                    pending.add(user_id)
+
+        if not pending:
+            return
+
+        found = User.objects.filter(id__in=pending).only('id', 'username', 'first_name', 'last_name')
+        users_by_id = {user.id: user for user in found}
+        for user_id in pending:
+            self._users[user_id] = users_by_id.get(user_id)
+
+    def get(self, user_id):
+        return self._users.get(user_id)
+
+
+def get_audit_resolver(context):
+    """
+    Devuelve el resolver asociado a la solicitud (si viene en el contexto) o,
+    en su defecto, al contexto del serializador raíz.
+    """
+    request = context.get('request')
+    if request is not None:
+        resolver = getattr(request, '_audit_user_resolver', None)
+        if resolver is None:
+            resolver = AuditUserResolver()
+            request._audit_user_resolver = resolver
+        return resolver
+
+    resolver = context.get('_audit_user_resolver')
+    if resolver is None:
+        resolver = AuditUserResolver()
+        context['_audit_user_resolver'] = resolver
+    return resolver
+
+
+class AuditUserListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer que precarga todos los usuarios de auditoría de la página
+    antes de serializar cada fila.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        iterable = list(iterable)
+        if AUDIT_NAME_FIELDS & set(self.child.fields):
+            get_audit_resolver(self.context).prime(iterable)
+        return super().to_representation(iterable)
+
+
+class AuditUserSerializerMixin:
+    """
+    Provee created_by_name / modified_by_name sin consultar User por cada fila.
+    Debe combinarse con `list_serializer_class = AuditUserListSerializer` en Meta.
+
+    Las subclases pueden sobrescribir `format_audit_user` para cambiar el nombre
+    mostrado y `audit_unknown_user` para el valor de un ID que ya no existe.
+    """
+
+    audit_unknown_user = None
+
+    def format_audit_user(self, user):
+        return user.first_name
+
+    def get_audit_user_name(self, obj, user_id):
+        if user_id is None:
+            return None
+        resolver = get_audit_resolver(self.context)
+        resolver.prime([obj])
+        user = resolver.get(user_id)
+        if user is None:
+            return self.audit_unknown_user
+        return self.format_audit_user(user)
+
+    def get_created_by_name(self, obj):
+        return self.get_audit_user_name(obj, obj.created_by)
+
+    def get_modified_by_name(self, obj):
+        return self.get_audit_user_name(obj, obj.modified_by)
@@ -0,0 +1,175 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada (LRU) con expiración por entrada. Segura para hilos.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class PrincipalCache:
+    """
+    Caché de tokens decodificados y de principales (usuario + permisos) usada
+    por `authenticate_user`.
+
+    Los payloads de los tokens siempre viven en memoria del proceso. Los
+    principales también, salvo que AUTH_CACHE_ALIAS apunte a un alias de
+    CACHES (por defecto, `default` si hay CACHE_REDIS_URL); en ese caso se
+    comparten entre procesos y la invalidación llega a todos los workers. Las
+    llaves compartidas incluyen un número de generación: invalidar a todos es
+    incrementarlo, sin vaciar el resto de la caché.
+    """
+
+    key_prefix = 'auth:principal:'
+    generation_key = 'auth:principal:generation'
+
+    def __init__(self):
+        maxsize = getattr(settings, 'AUTH_CACHE_MAX_ENTRIES', 1024)
+        self.alias = getattr(settings, 'AUTH_CACHE_ALIAS', None)
+        self.ttl = getattr(settings, 'AUTH_CACHE_TTL', 300 if self.alias else 30)
+        self._tokens = TTLCache(maxsize, self.ttl)
+        self._principals = TTLCache(maxsize, self.ttl)
+        self._counter_lock = threading.Lock()
+        self.counters = {"token_hits": 0, "token_misses": 0, "principal_hits": 0, "principal_misses": 0}
+
+    def _count(self, name):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def _token_key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def _shared_key(self, user_id):
+        shared = caches[self.alias]
+        generation = shared.get(self.generation_key)
+        if generation is None:
+            # Arranca desde la hora actual para no reutilizar llaves de una generación anterior.
+            shared.add(self.generation_key, int(time.time() * 1000), None)
+            generation = shared.get(self.generation_key)
+        return f"{self.key_prefix}{generation}:{user_id}"
+
+    def get_token_payload(self, token):
+        payload = self._tokens.get(self._token_key(token))
+        self._count("token_hits" if payload is not None else "token_misses")
+        return payload
+
+    def set_token_payload(self, token, payload):
+        # Nunca se guarda un payload más allá de su propia expiración.
+        remaining = int(payload.get("exp", 0)) - int(time.time())
+        self._tokens.set(self._token_key(token), payload, ttl=remaining)
+
+    def get_principal(self, user_id):
+        """
+        Devuelve (usuario, permisos) o None. El usuario es siempre una copia,
+        así cada solicitud puede modificarlo sin afectar al resto.
+        """
+        if self.alias:
+            principal = caches[self.alias].get(self._shared_key(user_id))
+        else:
+            principal = self._principals.get(user_id)
+
+        if principal is None:
+            self._count("principal_misses")
+            return None
+
+        self._count("principal_hits")
+        user, permissions = principal
+        user = copy.copy(user)
+        user._perm_cache = set(permissions)
+        return user, permissions
+
+    def store_principal(self, user):
+        permissions = frozenset(user.get_all_permissions()) if user.is_active else frozenset()
+        principal = (copy.copy(user), permissions)
+        if self.alias:
+            caches[self.alias].set(self._shared_key(user.id), principal, self.ttl)
+        else:
+            self._principals.set(user.id, principal)
+        return user, permissions
+
+    def invalidate_user(self, user_id):
+        self._delete_principal(user_id)
+        # Si la escritura ocurre dentro de una transacción, otra solicitud podría
+        # volver a cachear los datos viejos antes del commit.
+        transaction.on_commit(lambda: self._delete_principal(user_id))
+
+    def _delete_principal(self, user_id):
+        if self.alias:
+            caches[self.alias].delete(self._shared_key(user_id))
+        else:
+            self._principals.delete(user_id)
+
+    def invalidate_all(self):
+        self._clear_principals()
+        transaction.on_commit(self._clear_principals)
+
+    def _clear_principals(self):
+        self._principals.clear()
+        if self.alias:
+            shared = caches[self.alias]
+            try:
+                shared.incr(self.generation_key)
+            except ValueError:
+                shared.add(self.generation_key, int(time.time() * 1000), None)
+
+    def stats(self):
+        with self._counter_lock:
+            counters = dict(self.counters)
+        token_total = counters["token_hits"] + counters["token_misses"]
+        principal_total = counters["principal_hits"] + counters["principal_misses"]
+        counters["token_hit_rate"] = round(counters["token_hits"] / token_total, 4) if token_total else 0.0
+        counters["principal_hit_rate"] = round(counters["principal_hits"] / principal_total, 4) if principal_total else 0.0
+        counters["cached_tokens"] = len(self._tokens)
+        counters["cached_principals"] = None if self.alias else len(self._principals)
+        return counters
+
+
+principal_cache = PrincipalCache()
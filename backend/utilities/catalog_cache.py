@@ -0,0 +1,159 @@
+"""
+Caché de lectura para los catálogos (marcas, categorías, modelos, geografía y
+sucursales) con ETag y respuestas 304. Los contadores de versión también
+invalidan el perfil de la empresa en memoria (company/profile.py) y las
+facetas de la búsqueda de vehículos (vehicle/search.py).
+
+Cada tabla tiene un contador de versión en la caché de Django que se
+incrementa al crear, editar o desactivar un registro (señales post_save y
+post_delete de ese modelo, conectadas con `connect_catalog` en el ready() de
+cada app). La llave de cada respuesta incluye las versiones de todas las
+tablas de las que depende (por ejemplo, los modelos muestran el nombre de la
+marca), así que invalidar es un solo `incr` y las entradas viejas
+simplemente expiran.
+
+Versiones, cuerpos y ETags viven en la caché `default`. Los contadores de
+`stats` son siempre del proceso que atiende la solicitud.
+
+Se guarda el cuerpo JSON ya codificado junto a su ETag fuerte (hash del
+cuerpo). Los nombres de usuario de auditoría no invalidan la caché: pueden
+quedar desactualizados hasta CATALOG_CACHE_TTL segundos.
+"""
+import hashlib
+import threading
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from utilities.fast_json import JsonResponse, dumps
+
+def body_etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request, etag):
+    """
+    Comparación débil de If-None-Match (RFC 9110 13.1.2): la compresión
+    convierte el ETag en W/"...", y el cliente lo devuelve así.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+class CatalogCache:
+    key_prefix = 'catalog:'
+
+    def __init__(self):
+        self._counter_lock = threading.Lock()
+        self.counters = {}
+
+    def _count(self, name, outcome):
+        with self._counter_lock:
+            counters = self.counters.setdefault(name, {"hits": 0, "misses": 0, "not_modified": 0})
+            counters[outcome] += 1
+
+    def _version_key(self, label):
+        return f"{self.key_prefix}version:{label}"
+
+    def version(self, label):
+        key = self._version_key(label)
+        version = cache.get(key)
+        if version is None:
+            # Arranca desde la hora actual para no reutilizar versiones de una caché anterior.
+            cache.add(key, int(time.time() * 1000), None)
+            version = cache.get(key)
+        return version
+
+    def bump(self, label):
+        key = self._version_key(label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), None)
+
+    def invalidate(self, label):
+        self.bump(label)
+        # Otra solicitud podría cachear datos viejos antes de que la transacción confirme.
+        transaction.on_commit(lambda: self.bump(label))
+
+    def response(self, request, name, models, build, variant=''):
+        """
+        Respuesta JSON de un catálogo desde la caché. `build()` devuelve
+        (datos, estado HTTP) y solo se llama ante un fallo; únicamente se
+        guardan las respuestas 200. Si el cliente ya tiene la versión actual
+        (If-None-Match) se responde 304 sin cuerpo.
+        """
+        versions = '.'.join(str(self.version(model._meta.label_lower)) for model in models)
+        key = f"{self.key_prefix}{name}:{variant}:{versions}"
+        entry = cache.get(key)
+        if entry is None:
+            self._count(name, "misses")
+            data, status = build()
+            if status != HTTPStatus.OK:
+                return JsonResponse(data, status=status)
+            body = dumps(data)
+            entry = (body, body_etag(body))
+            cache.set(key, entry, getattr(settings, 'CATALOG_CACHE_TTL', 3600))
+        else:
+            self._count(name, "hits")
+        return self.send(request, name, *entry)
+
+    def send(self, request, name, body, etag):
+        """
+        Respuesta para un cuerpo JSON ya codificado: 304 si el cliente ya
+        tiene ese ETag.
+        """
+        if etag_matches(request, etag):
+            self._count(name, "not_modified")
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        # El navegador guarda la respuesta pero debe revalidarla siempre (304 si no cambió).
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def record(self, name, hit):
+        """
+        Registra un acierto o fallo de una caché externa (ver branch/geo.py)
+        para que aparezca en `stats`.
+        """
+        self._count(name, "hits" if hit else "misses")
+
+    def stats(self):
+        with self._counter_lock:
+            counters = {name: dict(values) for name, values in self.counters.items()}
+        for values in counters.values():
+            total = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / total, 4) if total else 0.0
+        return counters
+
+
+catalog_cache = CatalogCache()
+
+
+def invalidate_catalog(sender, raw=False, **kwargs):
+    if raw:
+        return
+    catalog_cache.invalidate(sender._meta.label_lower)
+
+
+def connect_catalog(model):
+    """
+    Incrementa la versión de `model` en cada guardado o borrado. Se llama
+    desde el ready() de la app dueña del modelo.
+    """
+    label = model._meta.label_lower
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_cache_post_save:{label}')
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_cache_post_delete:{label}')
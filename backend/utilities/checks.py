@@ -0,0 +1,28 @@
+"""
+Chequeos de sistema (`manage.py check`, también al arrancar runserver).
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCMEM_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Las versiones de catálogos, la línea de tiempo, las facetas, el avance de
+    las exportaciones y los principales de autenticación viven en la caché
+    `default`. En memoria local cada worker invalida solo su copia y los demás
+    siguen sirviendo datos viejos, así que fuera de DEBUG debe ser compartida.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    if settings.DEBUG or backend != LOCMEM_BACKEND:
+        return []
+    return [
+        Warning(
+            'La caché default está en memoria local: con más de un worker las invalidaciones '
+            'solo llegan al proceso que las hace.',
+            hint='Configure CACHE_REDIS_URL para usar una caché compartida.',
+            id='utilities.W001',
+        )
+    ]
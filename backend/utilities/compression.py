@@ -0,0 +1,184 @@
+"""
+Compresión de respuestas (gzip y, si el módulo `brotli` está instalado, br).
+
+A diferencia de django.middleware.gzip.GZipMiddleware:
+- negocia la codificación según Accept-Encoding, con sus valores q;
+- solo comprime tipos de texto (JSON, HTML, CSS, JS, SVG...), nunca PDFs,
+  imágenes ni archivos ZIP, que ya vienen comprimidos;
+- omite cuerpos menores que COMPRESSION_MIN_SIZE;
+- en respuestas por bloques (StreamingHttpResponse) comprime y vacía el
+  compresor por cada bloque, así el cliente recibe los datos sin esperar
+  al final.
+"""
+import gzip
+from io import BytesIO
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+}
+
+
+def is_compressible(content_type):
+    media_type = content_type.split(';')[0].strip().lower()
+    return (
+        media_type.startswith('text/')
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith('+json')
+        or media_type.endswith('+xml')
+    )
+
+
+def accepted_encodings(header):
+    """
+    {codificación: q} a partir de Accept-Encoding. `gzip;q=0` rechaza gzip.
+    """
+    accepted = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    'br', 'gzip' o None. Ante la misma preferencia del cliente gana br.
+    """
+    accepted = accepted_encodings(header)
+    supported = ('br', 'gzip') if brotli is not None else ('gzip',)
+    best, best_quality = None, 0.0
+    for encoding in supported:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def brotli_quality():
+    return getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+
+def compress_content(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=brotli_quality())
+    return compress_string(content, max_random_bytes=CompressionMiddleware.max_random_bytes)
+
+
+class _GzipStream:
+    def __init__(self):
+        self.buffer = BytesIO()
+        self.file = gzip.GzipFile(mode='wb', compresslevel=6, fileobj=self.buffer, mtime=0)
+
+    def _drain(self):
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def process(self, chunk):
+        self.file.write(chunk)
+        self.file.flush()
+        return self._drain()
+
+    def finish(self):
+        self.file.close()
+        return self._drain()
+
+
+class _BrotliStream:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=brotli_quality())
+
+    def process(self, chunk):
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def compressor_for(encoding):
+    return _BrotliStream() if encoding == 'br' else _GzipStream()
+
+
+def compress_stream(chunks, encoding):
+    compressor = compressor_for(encoding)
+    for chunk in chunks:
+        if chunk:
+            yield compressor.process(chunk)
+    yield compressor.finish()
+
+
+async def compress_async_stream(chunks, encoding):
+    compressor = compressor_for(encoding)
+    async for chunk in chunks:
+        if chunk:
+            yield compressor.process(chunk)
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Comprime las respuestas de texto con br o gzip según lo que acepte el
+    cliente. Debe ir arriba en MIDDLEWARE, antes de las capas que leen o
+    modifican el cuerpo.
+    """
+
+    # Relleno aleatorio en la cabecera gzip, igual que GZipMiddleware (BREACH).
+    max_random_bytes = 100
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code == 206:
+            return response
+        if not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, encoding)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding)
+            # El tamaño comprimido no se conoce hasta terminar.
+            del response.headers['Content-Length']
+        else:
+            compressed = compress_content(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Un ETag fuerte debe volverse débil al cambiar la representación (RFC 9110 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
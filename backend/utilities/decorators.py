@@ -1,9 +1,10 @@
 from functools import wraps
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from jose import jwt
 from django.conf import settings
 from django.contrib.auth.models import User
+from utilities.auth_cache import principal_cache
 import time
 
 def authenticate_user(required_permission=None):
@@ -51,7 +52,10 @@ def authenticate_user(required_permission=None):
                     }, status=HTTPStatus.UNAUTHORIZED)
                 
                 token = auth_header.split(" ")[1]
-                decoded = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS512'])
+                decoded = principal_cache.get_token_payload(token)
+                if decoded is None:
+                    decoded = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS512'])
+                    principal_cache.set_token_payload(token, decoded)
             except jwt.ExpiredSignatureError:
                 return JsonResponse({
                     "status": "error",
@@ -87,8 +91,11 @@ def authenticate_user(required_permission=None):
                 }, status=HTTPStatus.UNAUTHORIZED)
 
             try:
-                user = User.objects.get(id=user_id)
-                
+                principal = principal_cache.get_principal(user_id)
+                if principal is None:
+                    principal = principal_cache.store_principal(User.objects.get(id=user_id))
+                user, permissions = principal
+
                 actual_request.user = user
 
                 if user.is_superuser:
@@ -98,7 +105,7 @@ def authenticate_user(required_permission=None):
                         return func(actual_request, *args, **kwargs)
 
                 if required_permission:
-                    if not user.has_perm(required_permission):
+                    if required_permission not in permissions:
                         return JsonResponse({
                             "status": "error",
                             "message": f"Acceso denegado - No tienes el permiso requerido: '{required_permission}'."
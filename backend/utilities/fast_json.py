@@ -0,0 +1,109 @@
+"""
+Codificación JSON rápida para las respuestas de la API.
+
+Usa orjson si está instalado y, si no, la biblioteca estándar con
+DjangoJSONEncoder. La salida es equivalente en ambos casos: Decimal como
+texto y fechas en ISO 8601 con el formato de DjangoJSONEncoder (orjson
+delega en él las fechas para no cambiar la precisión ni el sufijo 'Z').
+
+`JsonResponse` reemplaza a django.http.JsonResponse con la misma firma, y
+`FastJSONRenderer` al JSONRenderer de DRF (ver REST_FRAMEWORK en settings).
+`StreamingJsonResponse` envía listados completos por bloques.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def _default(value):
+    # orjson no serializa subclases de tuple (namedtuple); json sí, como lista.
+    if isinstance(value, tuple):
+        return list(value)
+    return _django_encoder.default(value)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data):
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(data):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+class JsonResponse(HttpResponse):
+    """
+    Igual que django.http.JsonResponse, pero codifica con `dumps`. Si se pasa
+    un `encoder` o `json_dumps_params` se usa la biblioteca estándar.
+    """
+
+    def __init__(self, data, encoder=None, safe=True, json_dumps_params=None, **kwargs):
+        if safe and not isinstance(data, dict):
+            raise TypeError(
+                "In order to allow non-dict objects to be serialized set the "
+                "safe parameter to False."
+            )
+        kwargs.setdefault('content_type', 'application/json')
+        if encoder is None and not json_dumps_params:
+            content = dumps(data)
+        else:
+            content = json.dumps(data, cls=encoder or DjangoJSONEncoder, **(json_dumps_params or {}))
+        super().__init__(content=content, **kwargs)
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    Respuesta {"data": [...]} que se escribe por bloques: cada bloque de filas
+    (por ejemplo, de KeysetPagination.iterate_chunks) se serializa con
+    `serialize(rows)` y se envía antes de leer el siguiente, así la memoria
+    no crece con el tamaño de la tabla.
+
+    Un error a mitad de la respuesta ya no puede cambiar el estado HTTP: se
+    registra y el arreglo queda sin cerrar, para que el cliente lo detecte.
+    """
+
+    def __init__(self, chunks, serialize, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(self._render(chunks, serialize), **kwargs)
+
+    @staticmethod
+    def _render(chunks, serialize):
+        yield b'{"data":['
+        first = True
+        try:
+            for rows in chunks:
+                encoded = dumps(list(serialize(rows)))
+                if len(encoded) <= 2:
+                    continue
+                if not first:
+                    yield b','
+                yield encoded[1:-1]
+                first = False
+        except Exception as e:
+            print(f"Error al generar la respuesta JSON por bloques: {e}")
+            return
+        yield b']}'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF que usa `dumps`. Con indentación pedida (API
+    navegable, `indent=` en el Accept) recurre al renderer original.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,76 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+
+from utilities.management.commands.json_encode_benchmark import rental_rows
+from utilities import compression, fast_json
+
+
+def vehicle_rows(count):
+    return [
+        {
+            "id": number + 1, "plate": f"P{number:05d}", "brand": "Toyota", "vehiclemodel": "Corolla",
+            "vehiclecategory": "Sedán", "branch": "Centro", "color": "Blanco", "year": 2020 + number % 5,
+            "daily_price": "40.00", "status": "Disponible",
+            "images": [f"http://127.0.0.1:8000/uploads/vehicle/{number}_{image}.jpg" for image in range(4)],
+        }
+        for number in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el costo de CPU frente a los bytes ahorrados al comprimir respuestas JSON "
+        "representativas con gzip y brotli (si está instalado)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rentals, _ = rental_rows(10000)
+        payloads = [
+            ("detalle de alquiler", fast_json.dumps({"data": rentals[0]})),
+            ("50 alquileres", fast_json.dumps({"data": rentals[:50]})),
+            ("10000 alquileres", fast_json.dumps({"data": rentals})),
+            ("500 vehículos con imágenes", fast_json.dumps({"data": vehicle_rows(500)})),
+        ]
+
+        methods = [(f"gzip-{level}", lambda data, level=level: gzip.compress(data, compresslevel=level, mtime=0)) for level in (1, 6, 9)]
+        if compression.brotli is not None:
+            methods += [(f"br-{quality}", lambda data, quality=quality: compression.brotli.compress(data, quality=quality)) for quality in (1, 4, 11)]
+        else:
+            self.stdout.write("brotli no está instalado: solo se mide gzip.")
+
+        for label, payload in payloads:
+            self.stdout.write(f"{label}: {len(payload):,} bytes")
+            for name, compress in methods:
+                elapsed, compressed = self.best_of(options['repeat'], lambda: compress(payload))
+                self.report(name, len(payload), compressed, elapsed)
+
+        # Respuesta por bloques de 500 filas, como ?stream=1.
+        chunks = [fast_json.dumps(rentals[offset:offset + 500]) for offset in range(0, len(rentals), 500)]
+        total = sum(len(chunk) for chunk in chunks)
+        self.stdout.write(f"10000 alquileres por bloques de 500: {total:,} bytes")
+        for encoding in ('gzip', 'br') if compression.brotli is not None else ('gzip',):
+            elapsed, compressed = self.best_of(options['repeat'], lambda: b"".join(compression.compress_stream(chunks, encoding)))
+            self.report(f"{encoding} (stream)", total, compressed, elapsed)
+
+    def report(self, name, size, compressed, elapsed):
+        saved = 1 - len(compressed) / size
+        throughput = size / elapsed / 1024 / 1024
+        self.stdout.write(
+            f"  {name:<14} {len(compressed):>12,} bytes  ahorro {saved:6.1%}  "
+            f"{elapsed * 1000:8.2f} ms  ({throughput:,.0f} MB/s)"
+        )
+
+    @staticmethod
+    def best_of(repeat, func):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,80 @@
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from utilities import fast_json
+
+
+def rental_rows(count):
+    """
+    Filas con la forma de RentalSerializer (fechas y montos ya formateados,
+    pagos anidados) y su equivalente crudo, con Decimal y datetime nativos.
+    """
+    base = timezone.make_aware(datetime(2025, 1, 1, 8, 0))
+    formatted, raw = [], []
+    for number in range(count):
+        start = base + timedelta(hours=number)
+        end = start + timedelta(days=3)
+        total = Decimal('120.00') + number % 50
+        payments = [
+            {"amount": Decimal('60.00'), "payment_type": "Efectivo", "concept": "Anticipo", "reference": None},
+            {"amount": Decimal('100.00'), "payment_type": "Tarjeta", "concept": "Deposito", "reference": f"REF-{number}"},
+        ]
+        common = {
+            "id": number + 1, "customer": number % 900 + 1, "customer_name": f"Cliente {number % 900}",
+            "vehicle": number % 120 + 1, "vehicle_plate": f"P{number % 120:05d}", "pickup_branch": 1,
+            "pickup_branch_name": "Centro", "return_branch": 1, "return_branch_name": "Centro",
+            "status": "Activo", "fuel_level_pickup": "Lleno", "fuel_level_return": None,
+            "remarks": "Entrega en mostrador", "active": True, "created_by": 1, "created_by_name": "admin",
+        }
+        formatted.append({
+            **common,
+            "start_date": start.strftime("%d-%m-%Y %H:%M"), "end_date": end.strftime("%d-%m-%Y %H:%M"),
+            "total_price": str(total), "overdue_charge": "0.00",
+            "payments": [{**payment, "amount": str(payment["amount"])} for payment in payments],
+        })
+        raw.append({**common, "start_date": start, "end_date": end, "total_price": total,
+                    "overdue_charge": Decimal('0.00'), "payments": payments})
+    return formatted, raw
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el tiempo de codificación JSON de la biblioteca estándar (DjangoJSONEncoder) "
+        "con utilities.fast_json sobre un listado sintético de alquileres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        encoder = "orjson" if fast_json.orjson is not None else "biblioteca estándar (orjson no instalado)"
+        self.stdout.write(f"utilities.fast_json usa: {encoder}")
+        formatted, raw = rental_rows(options['rows'])
+
+        for label, rows in (("serializado", formatted), ("Decimal/datetime", raw)):
+            payload = {"data": rows}
+            stdlib = self.best_of(options['repeat'], lambda: json.dumps(payload, cls=DjangoJSONEncoder).encode('utf-8'))
+            fast = self.best_of(options['repeat'], lambda: fast_json.dumps(payload))
+            if json.loads(fast_json.dumps(payload)) != json.loads(json.dumps(payload, cls=DjangoJSONEncoder)):
+                self.stderr.write(f"{label}: las salidas no coinciden.")
+            self.stdout.write(
+                f"{options['rows']} alquileres ({label}): estándar {stdlib * 1000:.1f} ms, "
+                f"fast_json {fast * 1000:.1f} ms ({stdlib / fast:.1f}x)"
+            )
+
+    @staticmethod
+    def best_of(repeat, func):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -0,0 +1,197 @@
+import base64
+import datetime
+import decimal
+import json
+
+from django.db.models import Q
+from utilities.fast_json import JsonResponse
+from http import HTTPStatus
+from rest_framework.utils.urls import replace_query_param
+
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPagination:
+    """
+    Paginación por llave (keyset) opcional para los endpoints de listado.
+
+    Solo se activa si la solicitud trae `cursor` o `limit`; de lo contrario la
+    vista devuelve la lista completa como siempre. El orden debe terminar en un
+    campo único (normalmente `id`) para que los cursores sean estables, y los
+    campos del orden no deben admitir nulos. Los campos relacionados
+    (`brand__name`) deben venir precargados con select_related.
+
+    Uso:
+        paginator = KeysetPagination(ordering=('-start_date', '-id'))
+        response = paginator.respond(request, queryset, lambda page: RentalSerializer(page, many=True).data)
+        if response is not None:
+            return response
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+
+    def __init__(self, ordering, default_limit=DEFAULT_PAGE_LIMIT, max_limit=MAX_PAGE_LIMIT):
+        self.ordering = tuple(ordering)
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.next_cursor = None
+        self.request = None
+        self.limit = default_limit
+
+    def is_requested(self, request):
+        params = request.GET
+        return self.cursor_query_param in params or self.limit_query_param in params
+
+    def respond(self, request, queryset, serialize):
+        """
+        Respuesta paginada si la solicitud la pide, 400 si el cursor o el límite
+        no son válidos, o None para que la vista devuelva la lista completa.
+        `serialize(page)` recibe las filas de la página y devuelve sus datos.
+        """
+        if not self.is_requested(request):
+            return None
+        try:
+            page = self.paginate_queryset(queryset, request)
+        except InvalidCursor as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+        return self.get_paginated_response(serialize(page))
+
+    def get_limit(self, request):
+        raw_limit = request.GET.get(self.limit_query_param)
+        if raw_limit in (None, ''):
+            return self.default_limit
+        try:
+            limit = int(raw_limit)
+        except (TypeError, ValueError):
+            raise InvalidCursor(f"El parámetro '{self.limit_query_param}' debe ser un número entero.")
+        if limit <= 0:
+            raise InvalidCursor(f"El parámetro '{self.limit_query_param}' debe ser mayor que cero.")
+        return min(limit, self.max_limit)
+
+    def paginate_queryset(self, queryset, request):
+        self.request = request
+        self.limit = self.get_limit(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        raw_cursor = request.GET.get(self.cursor_query_param)
+        if raw_cursor:
+            values = self.decode_cursor(raw_cursor, queryset.model)
+            queryset = queryset.filter(self.build_keyset_filter(values))
+
+        # Se pide un registro extra para saber si existe una página siguiente.
+        rows = list(queryset[:self.limit + 1])
+        if len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.next_cursor = self.encode_cursor(rows[-1])
+        else:
+            self.next_cursor = None
+        return rows
+
+    def iterate_chunks(self, queryset, chunk_size):
+        """
+        Recorre todo el queryset en bloques de `chunk_size` filas con el mismo
+        filtro por llave que los cursores. A diferencia de .iterator(), no
+        depende de cursores del lado del servidor: con MySQL, .iterator() carga
+        el resultado completo en memoria del cliente.
+        """
+        queryset = queryset.order_by(*self.ordering)
+        chunk_queryset = queryset
+        while True:
+            rows = list(chunk_queryset[:chunk_size])
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            values = [self._get_value(rows[-1], field.lstrip('-')) for field in self.ordering]
+            chunk_queryset = queryset.filter(self.build_keyset_filter(values))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_payload(self, data):
+        return {
+            "data": data,
+            "next": self.get_next_link(),
+            "next_cursor": self.next_cursor,
+            "limit": self.limit,
+        }
+
+    def get_paginated_response(self, data):
+        return JsonResponse(self.get_paginated_payload(data), status=HTTPStatus.OK)
+
+    def build_keyset_filter(self, values):
+        """
+        Construye (a > x) OR (a = x AND b > y) OR ... respetando la dirección
+        de cada campo del orden.
+        """
+        condition = Q()
+        equal_prefix = Q()
+        for ordering_field, value in zip(self.ordering, values):
+            descending = ordering_field.startswith('-')
+            field_name = ordering_field.lstrip('-')
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal_prefix & Q(**{f"{field_name}__{lookup}": value})
+            equal_prefix &= Q(**{field_name: value})
+        return condition
+
+    def encode_cursor(self, instance):
+        values = [self._to_primitive(self._get_value(instance, field.lstrip('-'))) for field in self.ordering]
+        payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def decode_cursor(self, raw_cursor, model):
+        try:
+            payload = base64.urlsafe_b64decode(raw_cursor.encode('ascii'))
+            values = json.loads(payload.decode('utf-8'))
+        except (ValueError, UnicodeError):
+            raise InvalidCursor("Cursor inválido.")
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor inválido.")
+
+        decoded = []
+        for ordering_field, value in zip(self.ordering, values):
+            field = self._get_field(model, ordering_field.lstrip('-'))
+            try:
+                decoded.append(field.to_python(value))
+            except Exception:
+                raise InvalidCursor("Cursor inválido.")
+        return decoded
+
+    @staticmethod
+    def _get_value(instance, path):
+        # Filas de .values(): la llave ya es la ruta completa (`brand__name`).
+        if isinstance(instance, dict):
+            return instance[path]
+        value = instance
+        for attr in path.split('__'):
+            value = getattr(value, attr)
+        return value
+
+    @staticmethod
+    def _get_field(model, path):
+        parts = path.split('__')
+        for relation in parts[:-1]:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.get_field(parts[-1])
+
+    @staticmethod
+    def _to_primitive(value):
+        if isinstance(value, (datetime.datetime, datetime.date)):
+            return value.isoformat()
+        if isinstance(value, decimal.Decimal):
+            return str(value)
+        return value
+
@@ -0,0 +1,155 @@
+from django.core.exceptions import FieldDoesNotExist
+
+
+class InvalidFieldSelection(ValueError):
+    pass
+
+
+def parse_field_list(raw):
+    if not raw:
+        return []
+    return [name.strip() for name in raw.split(',') if name.strip()]
+
+
+def get_model_field(model, name):
+    """
+    Campo del modelo por nombre, incluidas las relaciones inversas sin
+    `related_name`, que se recorren por su accesor (`payment_set`) y no por
+    el nombre de la consulta (`payment`).
+    """
+    try:
+        return model._meta.get_field(name)
+    except FieldDoesNotExist:
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == name:
+                return relation
+        raise
+
+
+class SparseFieldsMixin:
+    """
+    Selección de campos (sparse fieldsets) y proyecciones con nombre para los
+    serializadores de modelo.
+
+    Parámetros de la solicitud:
+        ?fields=status,total_price      campos a devolver (el `id` siempre va)
+        ?projection=list                conjunto con nombre definido en Meta.projections
+        ?expand=payments                agrega campos costosos (Meta.expandable)
+
+    Sin parámetros se devuelven todos los campos, como siempre. Con `fields`
+    o `projection` los campos expandibles se omiten salvo que se pidan.
+
+    Opciones de Meta:
+        projections = {'list': (...), 'detail': (...)}
+        expandable = ('payments',)
+        field_dependencies = {'created_by_name': ('created_by',)}
+            columnas (con notación `a__b`) que necesita un campo calculado;
+            una relación inversa (`payment_set`, `images`) se precarga.
+
+    Uso en una vista:
+        fields = RentalSerializer.select_fields(request.GET)
+        queryset = RentalSerializer.prepare_queryset(queryset, fields)
+        RentalSerializer(queryset, many=True, fields=fields).data
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, params):
+        """
+        Campos pedidos en la solicitud, en el orden de Meta.fields, o None si
+        no se pidió ninguna selección. Lanza InvalidFieldSelection ante
+        nombres desconocidos.
+        """
+        meta = cls.Meta
+        available = tuple(meta.fields)
+        expandable = tuple(getattr(meta, 'expandable', ()))
+        requested = parse_field_list(params.get('fields'))
+        projection = params.get('projection')
+        expand = parse_field_list(params.get('expand'))
+
+        if not requested and not projection:
+            if not expand:
+                return None
+            requested = [name for name in available if name not in expandable]
+        elif projection:
+            projections = getattr(meta, 'projections', {})
+            if projection not in projections:
+                options = ', '.join(projections) or 'ninguna'
+                raise InvalidFieldSelection(f"Proyección desconocida '{projection}'. Opciones: {options}.")
+            requested = list(projections[projection]) + requested
+
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            raise InvalidFieldSelection(f"Campos desconocidos en 'fields': {', '.join(unknown)}.")
+        not_expandable = [name for name in expand if name not in expandable]
+        if not_expandable:
+            options = ', '.join(expandable) or 'ninguno'
+            raise InvalidFieldSelection(f"No se pueden expandir: {', '.join(not_expandable)}. Opciones: {options}.")
+
+        selected = {'id', *requested, *expand}
+        return tuple(name for name in available if name in selected)
+
+    @classmethod
+    def field_paths(cls, name):
+        """
+        Rutas de modelo que necesita el campo `name`, como tuplas de nombres
+        (`('vehicle', 'plate')`), o None si no se pueden deducir (campo
+        calculado sin dependencias declaradas).
+        """
+        dependencies = getattr(cls.Meta, 'field_dependencies', {})
+        if name in dependencies:
+            return tuple(tuple(path.split('__')) for path in dependencies[name])
+        field = cls._declared_fields.get(name)
+        source = field.source if field is not None and field.source else name
+        if source == '*':
+            return None
+        return (tuple(source.split('.')),)
+
+    @classmethod
+    def prepare_queryset(cls, queryset, fields=None, extra=()):
+        """
+        Ajusta el queryset a los campos seleccionados: select_related de las
+        relaciones recorridas, prefetch_related de las relaciones inversas y
+        `.only()` con las columnas necesarias. `extra` agrega columnas que usa
+        la vista (por ejemplo, las del orden de la paginación).
+        """
+        model = queryset.model
+        names = fields if fields is not None else tuple(cls.Meta.fields)
+        columns, related, prefetch = set(extra), set(), set()
+        complete = fields is not None
+
+        for name in names:
+            paths = cls.field_paths(name)
+            if paths is None:
+                complete = False
+                continue
+            for parts in paths:
+                current = model
+                prefix = []
+                for index, part in enumerate(parts):
+                    try:
+                        model_field = get_model_field(current, part)
+                    except FieldDoesNotExist:
+                        # `customer.__str__` y similares: la relación se carga completa.
+                        break
+                    if model_field.one_to_many or model_field.many_to_many or not model_field.concrete:
+                        prefetch.add('__'.join(prefix + [part]))
+                        break
+                    prefix.append(part)
+                    columns.add('__'.join(prefix))
+                    if model_field.is_relation and index < len(parts) - 1:
+                        related.add('__'.join(prefix))
+                        current = model_field.related_model
+
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        if complete:
+            queryset = queryset.only(*sorted(columns))
+        return queryset
@@ -0,0 +1,211 @@
+"""
+Escritura de CSV y XLSX por bloques con memoria constante.
+
+`stream_csv` y `stream_xlsx` reciben los encabezados y un iterable de bloques
+de filas (listas de str, int, Decimal, date, datetime o None) y entregan
+bytes a medida que consumen los bloques, para usarse con
+StreamingHttpResponse.
+
+El XLSX se escribe a mano (SpreadsheetML mínimo con cadenas en línea) dentro
+de un ZIP por flujo: openpyxl, incluso en modo write_only, guarda la hoja en
+un archivo temporal y solo arma el ZIP al llamar a save(), así que el
+cliente no recibiría nada hasta el final.
+"""
+import csv
+import datetime
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Excel interpreta como fórmula una celda de texto que empieza con estos caracteres.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Índices de cellXfs en styles.xml.
+STYLE_HEADER, STYLE_DATETIME, STYLE_DATE, STYLE_MONEY = 1, 2, 3, 4
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+DOC_RELS_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+CONTENT_TYPES_XML = XML_DECLARATION + (
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+ROOT_RELS_XML = XML_DECLARATION + (
+    f'<Relationships xmlns="{RELS_NS}">'
+    f'<Relationship Id="rId1" Type="{DOC_RELS_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK_RELS_XML = XML_DECLARATION + (
+    f'<Relationships xmlns="{RELS_NS}">'
+    f'<Relationship Id="rId1" Type="{DOC_RELS_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+    f'<Relationship Id="rId2" Type="{DOC_RELS_NS}/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+STYLES_XML = XML_DECLARATION + (
+    f'<styleSheet xmlns="{MAIN_NS}">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="dd-mm-yyyy hh:mm"/><numFmt numFmtId="165" formatCode="dd-mm-yyyy"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="5">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="4" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+# La primera fila (encabezados) queda fija al desplazarse.
+SHEET_START = XML_DECLARATION + (
+    f'<worksheet xmlns="{MAIN_NS}">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews>'
+    '<sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+class ZipStreamBuffer:
+    """
+    Destino no posicionable para ZipFile: acumula lo escrito hasta que el
+    generador lo entrega al cliente.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def local_naive(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.replace(tzinfo=None)
+
+
+class _Echo:
+    """
+    Pseudo-archivo para csv.writer: writerow devuelve la línea en vez de guardarla.
+    """
+
+    def write(self, value):
+        return value
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        return local_naive(value).strftime('%d-%m-%Y %H:%M')
+    if isinstance(value, datetime.date):
+        return value.strftime('%d-%m-%Y')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(headers, chunks):
+    writer = csv.writer(_Echo())
+    # El BOM hace que Excel abra el archivo como UTF-8.
+    yield ('\ufeff' + writer.writerow(headers)).encode('utf-8')
+    for rows in chunks:
+        yield ''.join(writer.writerow([csv_value(value) for value in row]) for row in rows).encode('utf-8')
+
+
+def column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_cell(ref, value, style=0):
+    if isinstance(value, datetime.datetime):
+        serial = (local_naive(value) - EXCEL_EPOCH) / datetime.timedelta(days=1)
+        return f'<c r="{ref}" s="{STYLE_DATETIME}"><v>{serial!r}</v></c>'
+    if isinstance(value, datetime.date):
+        return f'<c r="{ref}" s="{STYLE_DATE}"><v>{(value - EXCEL_EPOCH.date()).days}</v></c>'
+    if isinstance(value, bool):
+        value = 'Sí' if value else 'No'
+    elif isinstance(value, int):
+        return f'<c r="{ref}"><v>{value}</v></c>'
+    elif not isinstance(value, str):
+        # Decimal: montos con dos decimales y separador de miles.
+        return f'<c r="{ref}" s="{STYLE_MONEY}"><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML_CHARS.sub('', value))
+    style_attr = f' s="{style}"' if style else ''
+    return f'<c r="{ref}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(number, refs, values, style=0):
+    cells = ''.join(
+        xlsx_cell(f"{ref}{number}", value, style)
+        for ref, value in zip(refs, values) if value is not None and value != ''
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+def stream_xlsx(headers, chunks, sheet_name='Datos'):
+    refs = [column_letter(index) for index in range(len(headers))]
+    workbook_xml = XML_DECLARATION + (
+        f'<workbook xmlns="{MAIN_NS}" xmlns:r="{DOC_RELS_NS}">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+    buffer = ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', workbook_xml)
+        archive.writestr('xl/_rels/workbook.xml.rels', WORKBOOK_RELS_XML)
+        archive.writestr('xl/styles.xml', STYLES_XML)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write((SHEET_START + xlsx_row(1, refs, headers, STYLE_HEADER)).encode('utf-8'))
+            number = 1
+            for rows in chunks:
+                lines = []
+                for row in rows:
+                    number += 1
+                    lines.append(xlsx_row(number, refs, row))
+                sheet.write(''.join(lines).encode('utf-8'))
+                yield buffer.drain()
+            sheet.write(SHEET_END.encode('utf-8'))
+    yield buffer.drain()
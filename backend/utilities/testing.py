@@ -0,0 +1,74 @@
+"""
+Ayudas compartidas por las pruebas de las apps: encabezado de autenticación
+y registros mínimos válidos de sucursal, vehículo, cliente y alquiler.
+"""
+import time
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+from jose import jwt
+
+from branch.models import Branch
+from brand.models import Brand
+from customer.models import Customer
+from department.models import Department
+from district.models import District
+from municipality.models import Municipality
+from rental.models import Rental
+from vehicle.models import Vehicle
+from vehiclecategory.models import VehicleCategory
+from vehiclemodel.models import VehicleModel
+
+
+def auth_headers(user, expires_in=3600):
+    """
+    Encabezado `Authorization: Bearer` con un token válido para `user`, listo
+    para pasarlo a `self.client.get(url, **headers)`.
+    """
+    now = int(time.time())
+    payload = {"id": user.id, "iat": now, "exp": now + expires_in}
+    return {"HTTP_AUTHORIZATION": f"Bearer {jwt.encode(payload, settings.SECRET_KEY, algorithm='HS512')}"}
+
+
+def format_local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+
+
+def create_branch(name="Centro"):
+    department, _ = Department.objects.get_or_create(code="SM", defaults={"department": "San Miguel"})
+    municipality, _ = Municipality.objects.get_or_create(code="SM01", defaults={"municipality": "San Miguel", "department": department})
+    district, _ = District.objects.get_or_create(code="SM0101", defaults={"district": "San Miguel", "municipality": municipality})
+    return Branch.objects.create(
+        name=name, phone="26610000", address="Centro", district=district,
+        email=f"{name.lower().replace(' ', '')}@autorent.com",
+    )
+
+
+def create_vehicle(number, branch, category=None, daily_price="40.00", status="Disponible"):
+    brand, _ = Brand.objects.get_or_create(name="Toyota")
+    model, _ = VehicleModel.objects.get_or_create(brand=brand, name="Corolla")
+    category = category or VehicleCategory.objects.get_or_create(name="Sedan")[0]
+    return Vehicle.objects.create(
+        plate=f"P{number:06d}", vehiclemodel=model, vehiclecategory=category, branch=branch,
+        color="Rojo", year=2022, engine="1.8L", engine_type="Gasolina",
+        engine_number=f"EN{number:06d}", vin=f"1HGCM82633A{number:06d}", seat_count=5,
+        daily_price=Decimal(daily_price), status=status,
+    )
+
+
+def create_customer(number=1, customer_type="Nacional"):
+    return Customer.objects.create(
+        first_name="Ana", last_name="Pérez", document_type="DUI", document_number=f"0000000{number}-1",
+        address="San Miguel", phone="77778888", email=f"cliente{number}@example.com",
+        customer_type=customer_type, birth_date=datetime(1990, 1, 1).date(),
+    )
+
+
+def create_rental(vehicle, customer, branch, start, end, status="Reservado", total_price="80.00"):
+    return Rental.objects.create(
+        customer=customer, vehicle=vehicle, pickup_branch=branch, return_branch=branch,
+        start_date=start, end_date=end, status=status, total_price=Decimal(total_price),
+        fuel_level_pickup="Lleno",
+    )
@@ -0,0 +1,85 @@
+import gzip
+import json
+import unittest
+from collections import namedtuple
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from utilities.checks import check_shared_cache
+from utilities.compression import CompressionMiddleware, brotli
+from utilities.fast_json import JsonResponse, dumps
+
+
+class FastJsonTests(TestCase):
+
+    def test_matches_django_encoder(self):
+        Balance = namedtuple('Balance', 'total paid')
+        data = {
+            "total": Decimal("120.50"),
+            "start": timezone.now(),
+            "day": timezone.localdate(),
+            "balance": Balance(Decimal("1.00"), Decimal("0.50")),
+            "note": "Señor",
+        }
+        expected = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+        self.assertEqual(json.loads(dumps(data)), expected)
+        self.assertEqual(json.loads(JsonResponse(data).content), expected)
+        with self.assertRaises(TypeError):
+            JsonResponse([1, 2])
+
+
+class CompressionMiddlewareTests(TestCase):
+
+    def process(self, response, accept="gzip, deflate, br;q=0"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response).process_response(request, response)
+
+    def json_body(self):
+        return json.dumps({"data": [{"plate": f"P{number:05d}", "status": "Disponible"} for number in range(200)]}).encode()
+
+    def test_compresses_large_json_and_skips_small_or_binary_bodies(self):
+        body = self.json_body()
+        response = self.process(HttpResponse(body, content_type="application/json"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), body)
+
+        self.assertFalse(self.process(HttpResponse(b"{}", content_type="application/json")).has_header("Content-Encoding"))
+        self.assertFalse(self.process(HttpResponse(body, content_type="application/pdf")).has_header("Content-Encoding"))
+        self.assertFalse(self.process(HttpResponse(body, content_type="application/json"), accept="gzip;q=0").has_header("Content-Encoding"))
+
+    def test_compresses_streaming_bodies_per_chunk(self):
+        chunks = [json.dumps([{"id": number}] * 100).encode() for number in range(3)]
+        response = self.process(StreamingHttpResponse(iter(chunks), content_type="application/json"))
+        parts = list(response.streaming_content)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertGreaterEqual(len(parts), len(chunks))
+        self.assertEqual(gzip.decompress(b"".join(parts)), b"".join(chunks))
+
+    @unittest.skipUnless(brotli, "brotli no está instalado")
+    def test_brotli_round_trip(self):
+        body = self.json_body()
+        response = self.process(HttpResponse(body, content_type="application/json"), accept="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), body)
+
+        chunks = [json.dumps([{"id": number}] * 100).encode() for number in range(3)]
+        response = self.process(StreamingHttpResponse(iter(chunks), content_type="application/json"), accept="br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(b"".join(response.streaming_content)), b"".join(chunks))
+
+
+class SharedCacheCheckTests(TestCase):
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    dummy = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+    def test_warns_about_a_local_cache_only_outside_debug(self):
+        with override_settings(DEBUG=False, CACHES=self.locmem):
+            self.assertEqual([w.id for w in check_shared_cache(None)], ['utilities.W001'])
+        with override_settings(DEBUG=True, CACHES=self.locmem):
+            self.assertEqual(check_shared_cache(None), [])
+        with override_settings(DEBUG=False, CACHES=self.dummy):
+            self.assertEqual(check_shared_cache(None), [])
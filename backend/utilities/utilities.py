@@ -7,14 +7,25 @@ from email.mime.application import MIMEApplication
 
 load_dotenv()
 
-def sendMail(html_content: str, subject: str, recipient_email: str, attachment_data=None, attachment_filename=None):
+def get_smtp_settings():
+    """
+    Lee y valida la configuración SMTP desde las variables de entorno.
+
+    SMTP_USER / SMTP_PASSWORD pueden omitirse junto con SMTP_USE_TLS=False para
+    apuntar a un servidor SMTP local de depuración (por ejemplo aiosmtpd).
+    """
     smtp_server_host = os.getenv("SMTP_SERVER")
     smtp_port_str = os.getenv("SMTP_PORT")
     smtp_auth_user = os.getenv("SMTP_USER")
     smtp_auth_password = os.getenv("SMTP_PASSWORD")
     sender_email_address = os.getenv("SMTP_BY")
+    use_tls = os.getenv("SMTP_USE_TLS", "True").lower() not in ("false", "0", "no")
 
-    if not all([smtp_server_host, smtp_port_str, smtp_auth_user, smtp_auth_password, sender_email_address]):
+    required = [smtp_server_host, smtp_port_str, sender_email_address]
+    if use_tls:
+        required += [smtp_auth_user, smtp_auth_password]
+
+    if not all(required):
         raise Exception(
             "Error de configuración: Faltan una o más variables de entorno SMTP. "
             "Se requieren: SMTP_SERVER, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SMTP_BY."
@@ -25,9 +36,19 @@ def sendMail(html_content: str, subject: str, recipient_email: str, attachment_d
     except ValueError:
         raise Exception(f"Error de configuración: El puerto SMTP '{smtp_port_str}' no es un número válido.")
 
+    return {
+        "host": smtp_server_host,
+        "port": smtp_port,
+        "user": smtp_auth_user,
+        "password": smtp_auth_password,
+        "sender": sender_email_address,
+        "use_tls": use_tls,
+    }
+
+def build_mail_message(html_content: str, subject: str, sender: str, recipient_email: str, attachment_data=None, attachment_filename=None):
     message = MIMEMultipart('alternative')
     message['Subject'] = subject
-    message['From'] = sender_email_address
+    message['From'] = sender
     message['To'] = recipient_email
     message.attach(MIMEText(html_content, 'html', 'utf-8'))
 
@@ -36,18 +57,39 @@ def sendMail(html_content: str, subject: str, recipient_email: str, attachment_d
         part['Content-Disposition'] = f'attachment; filename="{attachment_filename}"'
         message.attach(part)
 
-    smtp_connection = None
-    try:
-        if smtp_port == 465:
-            smtp_connection = smtplib.SMTP_SSL(smtp_server_host, smtp_port, timeout=10)
-        else:
-            smtp_connection = smtplib.SMTP(smtp_server_host, smtp_port, timeout=10)
-            smtp_connection.ehlo()
+    return message
+
+def open_smtp_connection(config, timeout=10):
+    """
+    Abre y autentica una conexión SMTP (SSL en el puerto 465, STARTTLS en el resto).
+    """
+    if config["use_tls"] and config["port"] == 465:
+        smtp_connection = smtplib.SMTP_SSL(config["host"], config["port"], timeout=timeout)
+    else:
+        smtp_connection = smtplib.SMTP(config["host"], config["port"], timeout=timeout)
+        smtp_connection.ehlo()
+        if config["use_tls"]:
             smtp_connection.starttls()
             smtp_connection.ehlo()
 
-        smtp_connection.login(smtp_auth_user, smtp_auth_password)
-        smtp_connection.sendmail(sender_email_address, recipient_email, message.as_string())
+    if config["user"] and config["password"]:
+        smtp_connection.login(config["user"], config["password"])
+    return smtp_connection
+
+def sendMail(html_content: str, subject: str, recipient_email: str, attachment_data=None, attachment_filename=None):
+    """
+    Envío síncrono de un correo. Las vistas deben usar mail_outbox.utils.enqueue_mail,
+    que no bloquea la solicitud; esta función queda para scripts y casos puntuales.
+    """
+    config = get_smtp_settings()
+    message = build_mail_message(
+        html_content, subject, config["sender"], recipient_email, attachment_data, attachment_filename
+    )
+
+    smtp_connection = None
+    try:
+        smtp_connection = open_smtp_connection(config)
+        smtp_connection.sendmail(config["sender"], recipient_email, message.as_string())
 
     except Exception as e:
         original_error_type = type(e).__name__
@@ -60,4 +102,4 @@ def sendMail(html_content: str, subject: str, recipient_email: str, attachment_d
             except Exception:
                 # Ignorar errores al intentar cerrar la conexión,
                 # ya que el error principal ya fue lanzado.
-                pass
\ No newline at end of file
+                pass
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class VehicleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vehicle'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from vehicle import signals  # noqa: F401
+        from .models import Vehicle
+
+        # Versión usada por las facetas de vehicle/search.
+        connect_catalog(Vehicle)
@@ -0,0 +1,210 @@
+"""
+Búsqueda facetada de vehículos (`vehicle/search`): resultados paginados y,
+en la misma respuesta, cuántos vehículos hay por marca, modelo, categoría,
+sucursal, estado, tipo de motor y asientos, más el rango de precios.
+
+Los conteos salen de una sola consulta agrupada sobre la flota activa
+(`fleet_groups`): una fila por combinación distinta de dimensiones y precio
+con su COUNT. Las facetas de cualquier combinación de filtros se calculan
+en memoria a partir de esas filas, sin un COUNT por valor ni por dimensión.
+
+Cada faceta aplica todos los filtros menos el suyo (facetas disyuntivas):
+con `brand=1` la faceta de marcas sigue mostrando las demás marcas con los
+vehículos que se sumarían al elegirlas. Los valores sin coincidencias se
+devuelven con conteo 0.
+
+Las filas agrupadas y las facetas de cada combinación de filtros se guardan
+en la caché con las versiones de vehículos y catálogos relacionados
+(utilities/catalog_cache.py), así que cualquier escritura las invalida.
+"""
+import hashlib
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from utilities.catalog_cache import catalog_cache
+from vehicle.models import Vehicle
+
+# `path` filtra y agrupa; `label` (opcional) es el nombre que se muestra.
+Dimension = namedtuple('Dimension', 'name path label')
+
+DIMENSIONS = (
+    Dimension('brand', 'vehiclemodel__brand_id', 'vehiclemodel__brand__name'),
+    Dimension('vehiclemodel', 'vehiclemodel_id', 'vehiclemodel__name'),
+    Dimension('vehiclecategory', 'vehiclecategory_id', 'vehiclecategory__name'),
+    Dimension('branch', 'branch_id', 'branch__name'),
+    Dimension('status', 'status', None),
+    Dimension('engine_type', 'engine_type', None),
+    Dimension('seat_count', 'seat_count', None),
+)
+CHOICE_DIMENSIONS = {
+    'status': dict(Vehicle.STATUS_CHOICES),
+    'engine_type': dict(Vehicle.ENGINE_TYPE_CHOICES),
+}
+PRICE_PARAMS = ('daily_price_min', 'daily_price_max')
+
+# Fila agrupada: valores en el orden de DIMENSIONS, nombres, precio y conteo.
+FleetGroup = namedtuple('FleetGroup', 'values labels daily_price count')
+# `values`: {dimensión: frozenset}; `price`: (mínimo, máximo), cada uno o None.
+SearchFilters = namedtuple('SearchFilters', 'values price')
+
+CACHE_MODELS = (
+    'vehicle.vehicle', 'vehiclemodel.vehiclemodel', 'brand.brand', 'vehiclecategory.vehiclecategory', 'branch.branch',
+)
+
+
+def parse_price(value, name):
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"El parámetro '{name}' debe ser un número decimal.")
+    if not price.is_finite() or price < 0:
+        raise ValueError(f"El parámetro '{name}' debe ser un número positivo.")
+    return price
+
+
+def parse_filters(params):
+    """
+    Filtros de la consulta: valores separados por coma por dimensión (IDs
+    para las relaciones) y el rango `daily_price_min`/`daily_price_max`
+    (inclusivo). Lanza ValueError si alguno no es válido.
+    """
+    values = {}
+    for dimension in DIMENSIONS:
+        raw = [value.strip() for value in params.get(dimension.name, '').split(',') if value.strip()]
+        if not raw:
+            continue
+        if dimension.name in CHOICE_DIMENSIONS:
+            invalid = [value for value in raw if value not in CHOICE_DIMENSIONS[dimension.name]]
+            if invalid:
+                raise ValueError(f"Valor(es) inválido(s) para '{dimension.name}': {', '.join(invalid)}.")
+            values[dimension.name] = frozenset(raw)
+        else:
+            if not all(value.isdigit() for value in raw):
+                raise ValueError(f"El parámetro '{dimension.name}' debe ser una lista de números separados por coma.")
+            values[dimension.name] = frozenset(int(value) for value in raw)
+
+    price_min, price_max = (parse_price(params[name], name) if params.get(name) else None for name in PRICE_PARAMS)
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise ValueError("El precio mínimo no puede ser mayor que el precio máximo.")
+    return SearchFilters(values, (price_min, price_max))
+
+
+def filter_queryset(queryset, filters):
+    for dimension in DIMENSIONS:
+        if dimension.name in filters.values:
+            queryset = queryset.filter(**{f"{dimension.path}__in": filters.values[dimension.name]})
+    price_min, price_max = filters.price
+    if price_min is not None:
+        queryset = queryset.filter(daily_price__gte=price_min)
+    if price_max is not None:
+        queryset = queryset.filter(daily_price__lte=price_max)
+    return queryset
+
+
+def cache_version():
+    return '.'.join(str(catalog_cache.version(label)) for label in CACHE_MODELS)
+
+
+def fleet_groups(version=None):
+    """
+    Conteo de vehículos activos por combinación de dimensiones y precio, en
+    una consulta con GROUP BY. Hay a lo sumo una fila por vehículo.
+    """
+    key = f"vehicle_search:groups:{version or cache_version()}"
+    groups = cache.get(key)
+    catalog_cache.record('vehicle_search_groups', groups is not None)
+    if groups is None:
+        paths = [dimension.path for dimension in DIMENSIONS]
+        labels = [dimension.label for dimension in DIMENSIONS if dimension.label]
+        rows = (
+            Vehicle.objects.filter(active=True)
+            .values_list(*paths, *labels, 'daily_price')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        groups = []
+        for row in rows:
+            row_labels = iter(row[len(paths):-2])
+            groups.append(FleetGroup(
+                values=row[:len(paths)],
+                labels=tuple(next(row_labels) if dimension.label else None for dimension in DIMENSIONS),
+                daily_price=row[-2],
+                count=row[-1],
+            ))
+        cache.set(key, groups, getattr(settings, 'VEHICLE_SEARCH_CACHE_TTL', 300))
+    return groups
+
+
+def compute_facets(groups, filters):
+    """
+    Facetas y total de resultados para `filters` a partir de las filas
+    agrupadas. Devuelve (facetas, total).
+    """
+    selected = [filters.values.get(dimension.name) for dimension in DIMENSIONS]
+    price_min, price_max = filters.price
+    counts = [{} for _ in DIMENSIONS]
+    price_range = [None, None]
+    total = 0
+
+    for group in groups:
+        # Dimensiones cuyo filtro descarta la fila; el precio cuenta como una más.
+        misses = [index for index, values in enumerate(selected) if values and group.values[index] not in values]
+        price_miss = (
+            (price_min is not None and group.daily_price < price_min)
+            or (price_max is not None and group.daily_price > price_max)
+        )
+        failed = len(misses) + price_miss
+
+        for index, value in enumerate(group.values):
+            entry = counts[index].setdefault(value, [group.labels[index], 0])
+            # La fila suma en esta faceta si el único filtro que falla es el de la propia dimensión.
+            if failed == 0 or (failed == 1 and misses == [index]):
+                entry[1] += group.count
+        if failed == 0:
+            total += group.count
+        if not misses:
+            if price_range[0] is None or group.daily_price < price_range[0]:
+                price_range[0] = group.daily_price
+            if price_range[1] is None or group.daily_price > price_range[1]:
+                price_range[1] = group.daily_price
+
+    facets = {}
+    for index, dimension in enumerate(DIMENSIONS):
+        if dimension.label:
+            entries = [{"id": value, "name": label, "count": count} for value, (label, count) in counts[index].items()]
+            entries.sort(key=lambda entry: (entry["name"] or '', entry["id"]))
+        else:
+            entries = [{"value": value, "count": count} for value, (_, count) in counts[index].items()]
+            entries.sort(key=lambda entry: entry["value"])
+        facets[dimension.name] = entries
+    facets["daily_price"] = {"min": price_range[0], "max": price_range[1]}
+    return facets, total
+
+
+def filters_key(filters):
+    parts = [
+        f"{name}={','.join(sorted(str(value) for value in values))}"
+        for name, values in sorted(filters.values.items())
+    ]
+    parts.extend(f"{name}={value}" for name, value in zip(PRICE_PARAMS, filters.price) if value is not None)
+    return '&'.join(parts)
+
+
+def get_facets(filters):
+    """
+    (facetas, total) para `filters`, desde la caché si esa combinación ya se
+    calculó con la versión actual de la flota.
+    """
+    version = cache_version()
+    digest = hashlib.sha256(filters_key(filters).encode()).hexdigest()[:32]
+    key = f"vehicle_search:facets:{version}:{digest}"
+    entry = cache.get(key)
+    catalog_cache.record('vehicle_search_facets', entry is not None)
+    if entry is None:
+        entry = compute_facets(fleet_groups(version), filters)
+        cache.set(key, entry, getattr(settings, 'VEHICLE_SEARCH_CACHE_TTL', 300))
+    return entry
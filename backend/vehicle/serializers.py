@@ -2,7 +2,8 @@ from rest_framework import serializers
 from vehicle.models import Vehicle
 from dotenv import load_dotenv
 import os
-from django.contrib.auth.models import User
+from utilities.audit import AUDIT_FIELD_DEPENDENCIES, AuditUserSerializerMixin, AuditUserListSerializer
+from utilities.sparse_fields import SparseFieldsMixin
 
 
 def get_base_url():
@@ -13,7 +14,7 @@ def get_base_url():
         return base_url
 
 
-class VehicleSerializer(serializers.ModelSerializer):
+class VehicleSerializer(SparseFieldsMixin, AuditUserSerializerMixin, serializers.ModelSerializer):
     
     brand = serializers.CharField(source='vehiclemodel.brand.name')
     vehiclemodel = serializers.CharField(source='vehiclemodel.name')
@@ -27,6 +28,7 @@ class VehicleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Vehicle
+        list_serializer_class = AuditUserListSerializer
         fields = ("id",
                   "plate",
                   "brand",
@@ -52,6 +54,12 @@ class VehicleSerializer(serializers.ModelSerializer):
                   "modified_by_name",
                   "updated_at"
                   )
+        projections = {
+            'list': ("id", "plate", "brand", "vehiclemodel", "vehiclecategory", "branch", "daily_price", "status"),
+            'detail': fields,
+        }
+        expandable = ("images",)
+        field_dependencies = {**AUDIT_FIELD_DEPENDENCIES, 'images': ('images',)}
 
     def get_images(self, obj):
         base_url = get_base_url()
@@ -60,21 +68,3 @@ class VehicleSerializer(serializers.ModelSerializer):
             f"{base}{img.vehicle_image}"
             for img in obj.images.all()
         ]
-    
-    def get_created_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
-        
-    def get_modified_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
\ No newline at end of file
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rental.models import Rental
+from vehicle.models import Vehicle
+from vehicle.timeline import invalidate_timeline_on_commit
+
+
+@receiver(post_save, sender=Rental)
+@receiver(post_delete, sender=Rental)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+def invalidate_vehicle_timeline(sender, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_timeline_on_commit()
@@ -1,3 +1,117 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from utilities.testing import auth_headers, create_branch, create_customer, create_rental, create_vehicle
+from vehicle.search import get_facets, parse_filters
+from vehicle.timeline import TIMELINE_STATUSES, build_timeline, get_timeline
+from vehiclecategory.models import VehicleCategory
+
+
+class VehicleTimelineTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.branch = create_branch()
+        self.vehicle = create_vehicle(1, self.branch)
+        self.idle = create_vehicle(2, self.branch)
+        self.customer = create_customer()
+        self.start = timezone.make_aware(datetime(2025, 7, 1))
+        self.end = self.start + timedelta(days=7)
+
+    def test_intervals_are_clipped_and_relative_to_the_window(self):
+        rental = create_rental(self.vehicle, self.customer, self.branch, self.start - timedelta(days=1), self.start + timedelta(hours=6))
+        create_rental(self.vehicle, self.customer, self.branch, self.start + timedelta(days=2), self.start + timedelta(days=3), status="Cancelado")
+
+        timeline = get_timeline(self.start, self.end)
+        rows = {row["id"]: row["intervals"] for row in timeline["vehicles"]}
+        self.assertEqual(rows[self.vehicle.id], [[0, 360, TIMELINE_STATUSES.index("Reservado"), rental.id]])
+        self.assertEqual(rows[self.idle.id], [])
+
+    def test_intervals_end_at_the_actual_return_or_now_while_overdue(self):
+        now = self.start + timedelta(days=4)
+        overdue = create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(days=1), status="Retrasado")
+        returned = create_rental(
+            self.idle, self.customer, self.branch, self.start + timedelta(days=1), self.start + timedelta(days=3), status="Finalizado",
+        )
+        returned.actual_return_date = self.start + timedelta(days=2)
+        returned.save()
+
+        timeline = build_timeline(self.start, self.end, now=now)
+        rows = {row["id"]: row["intervals"] for row in timeline["vehicles"]}
+        # Sigue en manos del cliente: ocupa el vehículo hasta ahora, no hasta la fecha pactada.
+        self.assertEqual(rows[self.vehicle.id], [[0, 4 * 24 * 60, TIMELINE_STATUSES.index("Retrasado"), overdue.id]])
+        self.assertEqual(rows[self.idle.id], [[24 * 60, 24 * 60, TIMELINE_STATUSES.index("Finalizado"), returned.id]])
+
+        # Vencido hace tiempo y todavía sin devolver: aparece aunque la fecha pactada sea anterior a la ventana.
+        later = build_timeline(self.end, self.end + timedelta(days=7), now=self.end + timedelta(days=1))
+        rows = {row["id"]: row["intervals"] for row in later["vehicles"]}
+        self.assertEqual(rows[self.vehicle.id], [[0, 24 * 60, TIMELINE_STATUSES.index("Retrasado"), overdue.id]])
+
+    def test_cached_until_a_rental_is_written(self):
+        get_timeline(self.start, self.end)
+        with self.assertNumQueries(0):
+            get_timeline(self.start, self.end)
+
+        create_rental(self.vehicle, self.customer, self.branch, self.start, self.start + timedelta(days=1))
+        timeline = get_timeline(self.start, self.end)
+        self.assertEqual(len(timeline["vehicles"][0]["intervals"]), 1)
+
+
+class VehicleSearchTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.centro = create_branch()
+        self.norte = create_branch("Norte")
+        self.suv = VehicleCategory.objects.create(name="SUV")
+        self.cheap = create_vehicle(1, self.centro, daily_price="30.00")
+        self.rented = create_vehicle(2, self.centro, daily_price="45.00", status="Alquilado")
+        self.big = create_vehicle(3, self.norte, category=self.suv, daily_price="80.00")
+
+    def counts(self, facets, name):
+        return {entry.get("id", entry.get("value")): entry["count"] for entry in facets[name]}
+
+    def test_facets_exclude_their_own_filter(self):
+        facets, total = get_facets(parse_filters({"branch": str(self.centro.id), "daily_price_max": "50"}))
+        self.assertEqual(total, 2)
+        # La faceta de sucursales ignora el filtro de sucursal, no el de precio.
+        self.assertEqual(self.counts(facets, "branch"), {self.centro.id: 2, self.norte.id: 0})
+        self.assertEqual(self.counts(facets, "status"), {"Disponible": 1, "Alquilado": 1})
+        self.assertEqual(self.counts(facets, "vehiclecategory"), {self.cheap.vehiclecategory_id: 2, self.suv.id: 0})
+        self.assertEqual(facets["daily_price"], {"min": Decimal("30.00"), "max": Decimal("45.00")})
+
+        with self.assertRaises(ValueError):
+            parse_filters({"status": "Volando"})
+        with self.assertRaises(ValueError):
+            parse_filters({"daily_price_min": "90", "daily_price_max": "10"})
+
+    def test_facets_are_cached_until_a_vehicle_is_written(self):
+        filters = parse_filters({"status": "Disponible"})
+        get_facets(filters)
+        with self.assertNumQueries(0):
+            get_facets(filters)
+
+        self.rented.status = "Disponible"
+        self.rented.save()
+        facets, total = get_facets(filters)
+        self.assertEqual(total, 3)
+        self.assertEqual(self.counts(facets, "status"), {"Disponible": 3})
+
+    def test_endpoint_returns_page_and_facets(self):
+        user = User.objects.create_superuser(username='flota', password='secreta123')
+        headers = auth_headers(user)
+
+        response = self.client.get(f'/api/v1/vehicle/search?vehiclecategory={self.suv.id},{self.cheap.vehiclecategory_id}&limit=2', **headers)
+        body = response.json()
+        self.assertEqual([row["id"] for row in body["data"]], [self.cheap.id, self.rented.id])
+        self.assertEqual(body["total"], 3)
+        self.assertIsNotNone(body["next_cursor"])
+        self.assertEqual(self.counts(body["facets"], "seat_count"), {5: 3})
 
-# Create your tests here.
+        response = self.client.get('/api/v1/vehicle/search?seat_count=cinco', **headers)
+        self.assertEqual(response.status_code, 400)
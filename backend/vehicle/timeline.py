@@ -0,0 +1,95 @@
+"""
+Línea de tiempo de la flota (diagrama de Gantt) con codificación compacta.
+
+Cada intervalo se envía como [inicio, duración, estado, alquiler]: inicio y
+duración en minutos relativos al inicio de la ventana (recortados a ella) y
+el estado como índice en la lista `statuses` de la respuesta. Cada intervalo
+termina en el fin real del alquiler (`rental.availability.effective_end`, la
+misma regla del reporte de utilización): la devolución si existe o, si sigue
+en manos del cliente, la fecha pactada extendida hasta ahora.
+
+Las respuestas se guardan en la caché por (sucursal, ventana). La llave
+incluye una versión que cambia con cada escritura de alquileres o vehículos
+(vehicle/signals.py), así que invalidar es un solo `cache.set`.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from rental.availability import effective_end, may_end_after
+from rental.models import Rental
+from vehicle.models import Vehicle
+
+TIMELINE_STATUSES = ('Reservado', 'Activo', 'Retrasado', 'Finalizado')
+_STATUS_INDEX = {status: index for index, status in enumerate(TIMELINE_STATUSES)}
+
+VERSION_KEY = 'vehicle_timeline:version'
+
+
+def timeline_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_timeline():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def invalidate_timeline_on_commit():
+    invalidate_timeline()
+    # Otra solicitud podría cachear datos viejos antes de que la transacción confirme.
+    transaction.on_commit(invalidate_timeline)
+
+
+def build_timeline(start, end, branch=None, now=None):
+    now = now or timezone.now()
+    vehicles = Vehicle.objects.filter(active=True)
+    rentals = Rental.objects.filter(
+        may_end_after(start),
+        active=True,
+        status__in=TIMELINE_STATUSES,
+        start_date__lt=end,
+        vehicle__active=True,
+    )
+    if branch is not None:
+        vehicles = vehicles.filter(branch_id=branch)
+        rentals = rentals.filter(vehicle__branch_id=branch)
+
+    intervals = {}
+    rows = rentals.order_by('vehicle_id', 'start_date').values_list(
+        'vehicle_id', 'id', 'start_date', 'end_date', 'actual_return_date', 'status',
+    )
+    for vehicle_id, rental_id, rental_start, end_date, actual_return_date, status in rows:
+        rental_end = effective_end(end_date, actual_return_date, status, now)
+        if rental_end <= start:
+            continue
+        offset = int((max(rental_start, start) - start).total_seconds() // 60)
+        length = int((min(rental_end, end) - start).total_seconds() // 60) - offset
+        intervals.setdefault(vehicle_id, []).append([offset, length, _STATUS_INDEX[status], rental_id])
+
+    return {
+        "from": start,
+        "to": end,
+        "branch": branch,
+        "unit": "minutes",
+        "statuses": TIMELINE_STATUSES,
+        "vehicles": [
+            {"id": vehicle_id, "plate": plate, "intervals": intervals.get(vehicle_id, [])}
+            for vehicle_id, plate in vehicles.order_by('id').values_list('id', 'plate')
+        ],
+    }
+
+
+def get_timeline(start, end, branch=None):
+    key = f"vehicle_timeline:{timeline_version()}:{branch or 'all'}:{int(start.timestamp())}:{int(end.timestamp())}"
+    timeline = cache.get(key)
+    if timeline is None:
+        timeline = build_timeline(start, end, branch=branch)
+        cache.set(key, timeline, getattr(settings, 'VEHICLE_TIMELINE_CACHE_TTL', 300))
+    return timeline
@@ -3,6 +3,9 @@ from .views import *
 
 urlpatterns = [
     path('vehicle', VehicleRC.as_view()),
+    path('vehicle/available', VehicleAvailableR.as_view()),
+    path('vehicle/timeline', VehicleTimelineR.as_view()),
+    path('vehicle/search', VehicleSearchR.as_view()),
     path('vehicle/<int:id>', VehicleRU.as_view()),
     path('vehicle/delete/<int:id>', VehicleD.as_view()),
     path('vehicle/models/<int:id>', ModelsByBrandR.as_view()),
@@ -1,14 +1,21 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
-from django.utils.timezone import now
 from decimal import Decimal, InvalidOperation
+from datetime import timedelta
 
 from vehicle.models import Vehicle
 from vehiclemodel.models import VehicleModel
 from vehicleimage.models import VehicleImage
 from vehicle.serializers import VehicleSerializer
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination, InvalidCursor
+from utilities.sparse_fields import InvalidFieldSelection
+from rental.availability import available_vehicles
+from vehicle.timeline import get_timeline
+from vehicle.search import filter_queryset, get_facets, parse_filters
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from django.core.files.storage import FileSystemStorage
 import os
@@ -33,8 +40,18 @@ class VehicleRC(APIView):
     @authenticate_user(required_permission='vehicle.view_vehicle')
     def get(self, request):
         try:
-            data = Vehicle.objects.filter(active=True).order_by('id')
-            serializer = VehicleSerializer(data, many=True)
+            fields = VehicleSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            data = VehicleSerializer.prepare_queryset(Vehicle.objects.filter(active=True), fields).order_by('id')
+            paginator = KeysetPagination(ordering=('id',))
+            response = paginator.respond(request, data, lambda page: VehicleSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = VehicleSerializer(data, many=True, fields=fields)
             return JsonResponse({
                 "data": serializer.data
             }, status=HTTPStatus.OK)
@@ -352,11 +369,9 @@ class VehicleD(APIView):
             }, status=HTTPStatus.NOT_FOUND)
             
         try:
-            Vehicle.objects.filter(pk=id).update(
-                active=False,
-                modified_by=user_id,
-                updated_at=now()
-            )
+            vehicle.active = False
+            vehicle.modified_by = user_id
+            vehicle.save(update_fields=['active', 'modified_by', 'updated_at'])
             
             return JsonResponse({
                 "status": "ok",
@@ -391,4 +406,139 @@ class ModelsByBrandR(APIView):
         return JsonResponse(
             {"data": data},
             status=HTTPStatus.OK
-        )
\ No newline at end of file
+        )
+
+
+def parse_window_datetime(value):
+    """
+    Acepta 'AAAA-MM-DDTHH:MM[:SS]' o 'AAAA-MM-DD' (inicio del día). Las fechas
+    sin zona horaria se interpretan en la zona del proyecto.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        parsed_date = parse_date(value)
+        if parsed_date is None:
+            raise ValueError(value)
+        parsed = datetime.combine(parsed_date, datetime.min.time())
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class VehicleAvailableR(APIView):
+
+    @authenticate_user(required_permission='vehicle.view_vehicle')
+    def get(self, request):
+        try:
+            start = parse_window_datetime(request.GET.get('start'))
+            end = parse_window_datetime(request.GET.get('end'))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Las fechas deben tener el formato AAAA-MM-DD o AAAA-MM-DDTHH:MM."}, status=HTTPStatus.BAD_REQUEST)
+
+        if start is None or end is None:
+            return JsonResponse({"status": "error", "message": "Los parámetros 'start' y 'end' son obligatorios."}, status=HTTPStatus.BAD_REQUEST)
+        if end <= start:
+            return JsonResponse({"status": "error", "message": "La fecha de fin debe ser posterior a la fecha de inicio."}, status=HTTPStatus.BAD_REQUEST)
+
+        filters = {}
+        for param in ('category', 'branch'):
+            value = request.GET.get(param)
+            if value:
+                if not value.isdigit():
+                    return JsonResponse({"status": "error", "message": f"El parámetro '{param}' debe ser un ID numérico."}, status=HTTPStatus.BAD_REQUEST)
+                filters[param] = int(value)
+
+        try:
+            fields = VehicleSerializer.select_fields(request.GET)
+        except InvalidFieldSelection as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            data = VehicleSerializer.prepare_queryset(available_vehicles(start, end, **filters), fields).order_by('id')
+
+            paginator = KeysetPagination(ordering=('id',))
+            response = paginator.respond(request, data, lambda page: VehicleSerializer(page, many=True, fields=fields).data)
+            if response is not None:
+                return response
+
+            serializer = VehicleSerializer(data, many=True, fields=fields)
+            return JsonResponse({
+                "data": serializer.data
+            }, status=HTTPStatus.OK)
+        except Exception as e:
+            error_log_utils.log_error(user=request.user, exception=e)
+            return JsonResponse(
+                {"status": "error", "message": f"Ocurrió un error al procesar la solicitud. {e}"},
+                status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+
+
+# Ventana máxima de la línea de tiempo, para acotar el tamaño de la respuesta.
+MAX_TIMELINE_DAYS = 366
+
+
+class VehicleTimelineR(APIView):
+
+    @authenticate_user(required_permission='vehicle.view_vehicle')
+    def get(self, request):
+        try:
+            start = parse_window_datetime(request.GET.get('from'))
+            end = parse_window_datetime(request.GET.get('to'))
+        except ValueError:
+            return JsonResponse({"status": "error", "message": "Las fechas deben tener el formato AAAA-MM-DD o AAAA-MM-DDTHH:MM."}, status=HTTPStatus.BAD_REQUEST)
+
+        if start is None or end is None:
+            return JsonResponse({"status": "error", "message": "Los parámetros 'from' y 'to' son obligatorios."}, status=HTTPStatus.BAD_REQUEST)
+        if end <= start:
+            return JsonResponse({"status": "error", "message": "La fecha de fin debe ser posterior a la fecha de inicio."}, status=HTTPStatus.BAD_REQUEST)
+        if end - start > timedelta(days=MAX_TIMELINE_DAYS):
+            return JsonResponse({"status": "error", "message": f"La ventana no puede superar {MAX_TIMELINE_DAYS} días."}, status=HTTPStatus.BAD_REQUEST)
+
+        branch = request.GET.get('branch')
+        if branch:
+            if not branch.isdigit():
+                return JsonResponse({"status": "error", "message": "El parámetro 'branch' debe ser un ID numérico."}, status=HTTPStatus.BAD_REQUEST)
+            branch = int(branch)
+        else:
+            branch = None
+
+        try:
+            return JsonResponse({"data": get_timeline(start, end, branch=branch)}, status=HTTPStatus.OK)
+        except Exception as e:
+            error_log_utils.log_error(user=request.user, exception=e)
+            return JsonResponse(
+                {"status": "error", "message": f"Ocurrió un error al procesar la solicitud. {e}"},
+                status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+
+
+class VehicleSearchR(APIView):
+
+    @authenticate_user(required_permission='vehicle.view_vehicle')
+    def get(self, request):
+        try:
+            filters = parse_filters(request.GET)
+            fields = VehicleSerializer.select_fields(request.GET) or VehicleSerializer.select_fields({'projection': 'list'})
+        except (ValueError, InvalidFieldSelection) as e:
+            return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+        try:
+            data = VehicleSerializer.prepare_queryset(filter_queryset(Vehicle.objects.filter(active=True), filters), fields)
+            paginator = KeysetPagination(ordering=('id',))
+            try:
+                page = paginator.paginate_queryset(data, request)
+            except InvalidCursor as e:
+                return JsonResponse({"status": "error", "message": str(e)}, status=HTTPStatus.BAD_REQUEST)
+
+            facets, total = get_facets(filters)
+            payload = paginator.get_paginated_payload(VehicleSerializer(page, many=True, fields=fields).data)
+            payload.update(total=total, facets=facets)
+            return JsonResponse(payload, status=HTTPStatus.OK)
+        except Exception as e:
+            error_log_utils.log_error(user=request.user, exception=e)
+            return JsonResponse(
+                {"status": "error", "message": f"Ocurrió un error al procesar la solicitud. {e}"},
+                status=HTTPStatus.INTERNAL_SERVER_ERROR
+            )
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class VehiclecategoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vehiclecategory'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import VehicleCategory
+
+        connect_catalog(VehicleCategory)
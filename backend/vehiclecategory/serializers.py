@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from vehiclecategory.models import VehicleCategory
-from django.contrib.auth.models import User
+from utilities.audit import AuditUserSerializerMixin, AuditUserListSerializer
 
-class VehicleCategorySerializer(serializers.ModelSerializer):
+class VehicleCategorySerializer(AuditUserSerializerMixin, serializers.ModelSerializer):
 
     created_by_name = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(format="%d-%m-%Y") #13/12/2025
@@ -11,6 +11,7 @@ class VehicleCategorySerializer(serializers.ModelSerializer):
 
     class Meta:
         model = VehicleCategory
+        list_serializer_class = AuditUserListSerializer
         fields = (
             "id",
             "name",
@@ -24,21 +25,3 @@ class VehicleCategorySerializer(serializers.ModelSerializer):
         )
         #fields = '__all__'
         #fields = ('__all__')
-
-    def get_created_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
-        
-    def get_modified_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
\ No newline at end of file
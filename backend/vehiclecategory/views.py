@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.db import transaction
 import json
@@ -8,6 +8,8 @@ from .models import VehicleCategory
 from .serializers import VehicleCategorySerializer
 from .forms import VehicleCategoryForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.catalog_cache import catalog_cache
 from error_log import utils as error_log_utils
 
 
@@ -20,8 +22,15 @@ class VehicleCategoryRC(APIView):
     def get(self, request):
         try:
             categories = VehicleCategory.objects.filter(active=True).order_by('name')
-            serializer = VehicleCategorySerializer(categories, many=True)
-            return JsonResponse({"data": serializer.data}, status=HTTPStatus.OK)
+            paginator = KeysetPagination(ordering=('name', 'id'))
+            response = paginator.respond(request, categories, lambda page: VehicleCategorySerializer(page, many=True).data)
+            if response is not None:
+                return response
+
+            return catalog_cache.response(
+                request, 'vehiclecategory', (VehicleCategory,),
+                lambda: ({"data": VehicleCategorySerializer(categories, many=True).data}, HTTPStatus.OK),
+            )
         except Exception as e:
             error_log_utils.log_error(user=request.user, exception=e)
             return JsonResponse(
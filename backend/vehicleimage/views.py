@@ -1,5 +1,6 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse, Http404
+from django.http import Http404
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.utils.timezone import now
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class VehiclemodelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vehiclemodel'
+
+    def ready(self):
+        from utilities.catalog_cache import connect_catalog
+        from .models import VehicleModel
+
+        connect_catalog(VehicleModel)
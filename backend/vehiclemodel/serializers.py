@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from vehiclemodel.models import VehicleModel
-from django.contrib.auth.models import User
+from utilities.audit import AuditUserSerializerMixin, AuditUserListSerializer
 
-class VehicleModelSerializer(serializers.ModelSerializer):
+class VehicleModelSerializer(AuditUserSerializerMixin, serializers.ModelSerializer):
     
     brand = serializers.CharField(source='brand.name')
     created_by_name = serializers.SerializerMethodField()
@@ -12,6 +12,7 @@ class VehicleModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = VehicleModel
+        list_serializer_class = AuditUserListSerializer
         fields = ("id",
                   "name",
                   "brand_id",
@@ -24,21 +25,3 @@ class VehicleModelSerializer(serializers.ModelSerializer):
                   "modified_by_name",
                   "updated_at"
                   )
-
-    def get_created_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.created_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
-        
-    def get_modified_by_name(self, obj):
-        try:
-            user = User.objects.get(id=obj.modified_by)
-            return user.first_name
-        except User.DoesNotExist:
-            return None
-        except ValueError:
-            return None
\ No newline at end of file
@@ -1,5 +1,5 @@
 from rest_framework.views import APIView
-from django.http import JsonResponse
+from utilities.fast_json import JsonResponse
 from http import HTTPStatus
 from django.db import transaction
 
@@ -9,6 +9,8 @@ from brand.models import Brand
 from .serializers import VehicleModelSerializer
 from .forms import VehicleModelForm
 from utilities.decorators import authenticate_user
+from utilities.pagination import KeysetPagination
+from utilities.catalog_cache import catalog_cache
 from error_log import utils as error_log_utils
 
 import json
@@ -20,10 +22,16 @@ class VehicleModelRC(APIView):
     def get(self, request):
         try:
             data = VehicleModel.objects.select_related('brand').filter(active=True).order_by('brand__name', 'name')
-            serializer = VehicleModelSerializer(data, many=True)
-            return JsonResponse({
-                "data": serializer.data
-            }, status=HTTPStatus.OK)
+            paginator = KeysetPagination(ordering=('brand__name', 'name', 'id'))
+            response = paginator.respond(request, data, lambda page: VehicleModelSerializer(page, many=True).data)
+            if response is not None:
+                return response
+
+            # El listado muestra el nombre de la marca: depende también de esa tabla.
+            return catalog_cache.response(
+                request, 'vehiclemodel', (VehicleModel, Brand),
+                lambda: ({"data": VehicleModelSerializer(data, many=True).data}, HTTPStatus.OK),
+            )
         except Exception as e:
             error_log_utils.log_error(user=request.user, exception=e)
             return JsonResponse(
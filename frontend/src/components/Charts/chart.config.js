@@ -52,3 +52,28 @@ export const sampleChartData = (points = 9) => {
     ],
   }
 }
+
+const summaryDataset = (color, data) => ({
+  ...datasetObject(color, 0),
+  data,
+})
+
+// Convierte la respuesta de /dashboard/summary en datos para LineChart
+export const summaryChartData = (summary) => {
+  const revenueByDay = Object.fromEntries(
+    (summary?.revenue?.by_day || []).map((row) => [row.date, Number(row.amount)])
+  )
+  const rentalsByDay = Object.fromEntries(
+    (summary?.rentals?.by_day || []).map((row) => [row.date, row])
+  )
+  const labels = [...new Set([...Object.keys(revenueByDay), ...Object.keys(rentalsByDay)])].sort()
+
+  return {
+    labels,
+    datasets: [
+      summaryDataset('primary', labels.map((day) => revenueByDay[day] || 0)),
+      summaryDataset('info', labels.map((day) => rentalsByDay[day]?.started || 0)),
+      summaryDataset('danger', labels.map((day) => rentalsByDay[day]?.finished || 0)),
+    ],
+  }
+}
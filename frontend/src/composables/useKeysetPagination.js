@@ -0,0 +1,43 @@
+import axios from "axios";
+
+// Composable para consumir los listados paginados por cursor (?cursor=&limit=)
+export function keysetPaginationComposable(endpoint, { limit = 100 } = {}) {
+  const fetchPage = async (config, cursor = null) => {
+    const params = { limit };
+    if (cursor) {
+      params.cursor = cursor;
+    }
+
+    const response = await axios.get(
+      `${import.meta.env.VITE_API_URL}${endpoint}`,
+      { ...config, params: { ...(config?.params || {}), ...params } }
+    );
+
+    return {
+      data: response.data?.data || [],
+      nextCursor: response.data?.next_cursor || null,
+    };
+  };
+
+  // Recorre todas las páginas; onPage permite ir pintando la tabla mientras llegan.
+  const fetchAllPages = async (config, onPage = null) => {
+    const rows = [];
+    let cursor = null;
+
+    do {
+      const page = await fetchPage(config, cursor);
+      rows.push(...page.data);
+      if (onPage) {
+        onPage(rows);
+      }
+      cursor = page.nextCursor;
+    } while (cursor);
+
+    return rows;
+  };
+
+  return {
+    fetchPage,
+    fetchAllPages,
+  };
+}